@@ -0,0 +1,108 @@
+"""
+Persistência de uma proposta (um projeto com suas tarefas) no Postgres: caminho por
+linha antigo (commit e refresh a cada registro), caminho por linha com flush em uma
+transação, e `ProjectRepository.create_with_tasks` (INSERT ... RETURNING em lote).
+
+Uso (no diretório backend/):
+    python benchmarks/bench_create_with_tasks.py --database-url postgresql://... [--projects 200] [--tasks 8]
+
+Use um banco descartável: os projetos criados são removidos ao final.
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, delete, event, select
+from sqlalchemy.orm import Session
+
+from db_client import Base
+from models import Project, ProjectType, Task, User
+from repositories import ProjectRepository, TaskRepository
+
+def project_data(owner_id: int) -> dict:
+    return {
+        "title": "Plataforma de Cursos",
+        "description": "Plataforma para publicação e acompanhamento de cursos online.",
+        "project_type": ProjectType.FULLSTACK,
+        "technologies": ["Python", "FastAPI", "PostgreSQL", "React"],
+        "owner_id": owner_id,
+    }
+
+def task_data(count: int):
+    return [{"title": f"Tarefa {i}", "description": "Descrição da tarefa " * 5} for i in range(count)]
+
+def per_row_commit(session: Session, owner_id: int, tasks: int):
+    """Como antes da unidade de trabalho: add, commit e refresh para cada registro."""
+    project = Project(**project_data(owner_id))
+    session.add(project)
+    session.commit()
+    session.refresh(project)
+    for data in task_data(tasks):
+        task = Task(**data, project_id=project.id)
+        session.add(task)
+        session.commit()
+        session.refresh(task)
+
+def per_row_flush(session: Session, owner_id: int, tasks: int):
+    project = ProjectRepository(session).create(project_data(owner_id))
+    task_repository = TaskRepository(session)
+    for data in task_data(tasks):
+        task_repository.create({**data, "project_id": project.id})
+    session.commit()
+
+def bulk(session: Session, owner_id: int, tasks: int):
+    ProjectRepository(session).create_with_tasks(project_data(owner_id), task_data(tasks))
+    session.commit()
+
+def owner(engine) -> int:
+    with Session(engine) as session:
+        user = session.scalars(select(User).where(User.email == "bench-owner@example.com")).first()
+        if user is None:
+            user = User(email="bench-owner@example.com", name="Benchmark", password_hash="x")
+            session.add(user)
+            session.commit()
+        return user.id
+
+def main(database_url: str, projects: int, tasks: int):
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine, tables=[User.__table__, Project.__table__, Task.__table__])
+    owner_id = owner(engine)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    print(f"{projects} projetos com {tasks} tarefas cada")
+    for name, persist in (("por linha (commit)", per_row_commit), ("por linha (flush)", per_row_flush), ("em lote", bulk)):
+        samples = []
+        statements.clear()
+        for _ in range(projects):
+            with Session(engine) as session:
+                start = time.perf_counter()
+                persist(session, owner_id, tasks)
+                samples.append(time.perf_counter() - start)
+        samples.sort()
+        p99 = samples[int(len(samples) * 0.99) - 1]
+        print(
+            f"{name:<20} média {statistics.mean(samples) * 1000:>7.2f} ms   p99 {p99 * 1000:>7.2f} ms   "
+            f"{len(statements) / projects:>5.1f} comandos por projeto"
+        )
+
+    with Session(engine) as session:
+        project_ids = select(Project.id).where(Project.owner_id == owner_id)
+        session.execute(delete(Task).where(Task.project_id.in_(project_ids)))
+        session.execute(delete(Project).where(Project.owner_id == owner_id))
+        session.commit()
+    engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--projects", type=int, default=200)
+    parser.add_argument("--tasks", type=int, default=8)
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error("informe --database-url ou DATABASE_URL")
+    main(args.database_url, args.projects, args.tasks)
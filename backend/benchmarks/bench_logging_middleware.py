@@ -0,0 +1,97 @@
+"""
+Custo por requisição do RequestResponseLoggingMiddleware sobre uma aplicação ASGI
+mínima: sem middleware, sem amostragem, com a fila de logs (padrão) e com os handlers
+síncronos de antes (escrita no stdout e no arquivo dentro do event loop).
+
+Uso (no diretório backend/):
+    python benchmarks/bench_logging_middleware.py [--requests 20000]
+
+Os logs vão para um diretório temporário e o stdout dos logs para /dev/null.
+"""
+import os
+import sys
+import time
+import asyncio
+import logging
+import argparse
+import tempfile
+from logging.handlers import RotatingFileHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# O arquivo de log é relativo ao diretório atual
+os.chdir(tempfile.mkdtemp(prefix="codespark-bench-"))
+
+import logger
+from logger import JsonFormatter, RequestResponseLoggingMiddleware, app_logger, get_logging_stats, queue_listener
+
+SCOPE = {
+    "type": "http",
+    "method": "GET",
+    "path": "/api/projects/",
+    "client": ("127.0.0.1", 50000),
+    "headers": [
+        (b"host", b"localhost:8000"),
+        (b"user-agent", b"Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36"),
+        (b"accept", b"application/json"),
+        (b"authorization", b"Bearer token"),
+        (b"cookie", b"session=abc"),
+    ],
+}
+
+async def app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": b"[]"})
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+async def send(message):
+    pass
+
+async def measure(asgi_app, requests: int) -> float:
+    for _ in range(100):
+        await asgi_app(dict(SCOPE), receive, send)
+    start = time.perf_counter()
+    for _ in range(requests):
+        await asgi_app(dict(SCOPE), receive, send)
+    return (time.perf_counter() - start) / requests
+
+def synchronous_handlers():
+    """Handlers de antes: cada registro é formatado e escrito na thread que registrou."""
+    formatter = JsonFormatter()
+    console_handler = logging.StreamHandler(open(os.devnull, "w"))
+    file_handler = RotatingFileHandler("logs/sync.log", maxBytes=10 * 1024 * 1024, backupCount=1)
+    for handler in (console_handler, file_handler):
+        handler.setFormatter(formatter)
+    return [console_handler, file_handler]
+
+def report(name: str, seconds: float, baseline: float):
+    print(f"{name:<30} {seconds * 1e6:>8.2f} µs por requisição   (+{(seconds - baseline) * 1e6:>7.2f} µs)")
+
+async def main(requests: int):
+    queue_listener.handlers[0].setStream(open(os.devnull, "w"))
+    middleware = RequestResponseLoggingMiddleware(app)
+
+    baseline = await measure(app, requests)
+    report("sem middleware", baseline, baseline)
+
+    logger.LOG_SAMPLE_RATE = 0.0
+    report("middleware, amostragem 0", await measure(middleware, requests), baseline)
+
+    logger.LOG_SAMPLE_RATE = 1.0
+    report("middleware, fila de logs", await measure(middleware, requests), baseline)
+    await asyncio.to_thread(queue_listener.queue.join)
+    stats = get_logging_stats()
+
+    queued_handlers = app_logger.handlers
+    app_logger.handlers = synchronous_handlers()
+    report("middleware, escrita síncrona", await measure(middleware, requests), baseline)
+    app_logger.handlers = queued_handlers
+
+    print(f"Fila de logs: {stats['enqueued']} enfileirados, {stats['dropped']} descartados, {stats['batches']} lotes")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,90 @@
+"""
+Latência por página na listagem de usuários do Postgres: paginação por offset (modo
+legado, `list_all`) contra keyset em (created_at, id) (`list_page`), em várias
+profundidades de uma tabela com 1M de registros.
+
+Uso (no diretório backend/):
+    python benchmarks/bench_pagination.py --database-url postgresql://... [--rows 1000000] [--page-size 100]
+
+Use um banco descartável: a tabela `users` recebe os registros de teste (e-mails
+`bench-*@example.com`), que são mantidos entre execuções para evitar uma nova carga.
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.orm import Session
+
+from db_client import Base
+from models import User
+from repositories import UserRepository, encode_cursor
+
+def seed(engine, rows: int):
+    with engine.begin() as connection:
+        existing = connection.execute(select(func.count()).select_from(User)).scalar_one()
+        if existing >= rows:
+            return existing
+        print(f"Inserindo {rows - existing} usuários...")
+        # created_at crescente com o id, como em inserções reais
+        connection.execute(text(
+            "INSERT INTO users (email, name, password_hash, is_active, created_at) "
+            "SELECT 'bench-' || g || '@example.com', 'Usuário ' || g, 'x', true, "
+            "TIMESTAMP '2024-01-01' + g * INTERVAL '1 second' "
+            "FROM generate_series(:start, :end) AS g"
+        ), {"start": existing + 1, "end": rows})
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("ANALYZE users"))
+    return rows
+
+def cursor_at(session: Session, depth: int):
+    """Cursor equivalente a pular `depth` registros (obtido fora da medição)."""
+    if depth == 0:
+        return None
+    created_at, id = session.execute(
+        select(User.created_at, User.id).order_by(User.created_at, User.id).offset(depth - 1).limit(1)
+    ).one()
+    return encode_cursor(SimpleNamespace(created_at=created_at, id=id))
+
+def measure(operation, repeat: int) -> float:
+    operation()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        operation()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+def main(database_url: str, rows: int, page_size: int, repeat: int):
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine, tables=[User.__table__])
+    rows = seed(engine, rows)
+    depths = sorted({0, rows // 1000, rows // 100, rows // 10, rows // 2, rows - page_size})
+
+    print(f"{rows} usuários, páginas de {page_size}, mediana de {repeat} execuções")
+    print(f"{'profundidade':>12} {'offset':>12} {'keyset':>12}")
+    with Session(engine) as session:
+        repository = UserRepository(session)
+        for depth in depths:
+            cursor = cursor_at(session, depth)
+            offset = measure(lambda: repository.list_all(skip=depth, limit=page_size), repeat)
+            keyset = measure(lambda: repository.list_page(limit=page_size, cursor=cursor), repeat)
+            print(f"{depth:>12} {offset * 1000:>9.2f} ms {keyset * 1000:>9.2f} ms")
+            session.expunge_all()
+    engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error("informe --database-url ou DATABASE_URL")
+    main(args.database_url, args.rows, args.page_size, args.repeat)
@@ -0,0 +1,113 @@
+"""
+Teste de carga das rotas: handler síncrono com o cliente Xata síncrono (executado no
+threadpool do FastAPI, limitado a 40 threads) contra a rota assíncrona de
+`routers/users.py` com o cliente assíncrono, contra um servidor Xata falso local
+com latência.
+
+Uso (no diretório backend/):
+    python benchmarks/bench_router_concurrency.py [--requests 2000] [--concurrency 200] [--latency 0.05]
+
+As solicitações são feitas em processo (httpx.ASGITransport), sem o custo do uvicorn, e o
+servidor falso roda em outro processo. Com poucos núcleos, o custo de CPU por solicitação
+(inclusive o do pool de conexões do httpx) pode limitar a rota assíncrona antes da latência.
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_xata import FakeXataProcess, point_async_client, point_sync_client
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--pool-size", type=int, default=None, help="XATA_POOL_MAXSIZE (padrão: o configurado)")
+    return parser.parse_args()
+
+args = parse_args() if __name__ == "__main__" else None
+if args is not None and args.pool_size:
+    os.environ["XATA_POOL_MAXSIZE"] = str(args.pool_size)
+
+import httpx
+from fastapi import FastAPI
+
+import schemas
+from routers import users
+from xata_client import AsyncXataClient, create_xata_client, get_async_db, reverse_link
+
+def user_query(user_id: str) -> dict:
+    return {
+        "columns": ["*", reverse_link("projects", "ownerId", "projects")],
+        "filter": {"id": user_id},
+        "page": {"size": 1},
+    }
+
+def build_sync_app(url: str) -> FastAPI:
+    """Rota no formato anterior: `def` com o cliente síncrono, executada no threadpool."""
+    client = point_sync_client(create_xata_client(), url)
+    app = FastAPI()
+
+    @app.get("/api/users/{user_id}", response_model=schemas.UserWithProjects)
+    def read_user(user_id: str):
+        record = client.data().query("users", user_query(user_id))["records"][0]
+        return {
+            "id": record["id"],
+            "email": record["email"],
+            "name": record["name"],
+            "isActive": record.get("isActive", True),
+            "createdAt": record["xata"]["createdAt"],
+            "projects": [],
+        }
+
+    return app
+
+def build_async_app(url: str) -> FastAPI:
+    client = point_async_client(AsyncXataClient(create_xata_client()), url)
+    app = FastAPI()
+    app.include_router(users.router, prefix="/api/users")
+    app.dependency_overrides[get_async_db] = lambda: client
+    return app
+
+async def load(app: FastAPI, total: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    samples = []
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://backend") as client:
+        async def one(i: int):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(f"/api/users/rec_{i}")
+                samples.append(time.perf_counter() - start)
+                response.raise_for_status()
+
+        await one(-1)
+        samples.clear()
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        return samples, time.perf_counter() - start
+
+def report(name: str, samples, elapsed: float):
+    samples = sorted(samples)
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    print(
+        f"{name:<22} {len(samples) / elapsed:>8.0f} req/s   mediana {statistics.median(samples) * 1000:>8.1f} ms   "
+        f"p99 {p99 * 1000:>8.1f} ms"
+    )
+
+def main(total: int, concurrency: int, latency: float):
+    server = FakeXataProcess(latency=latency)
+    try:
+        print(f"{total} solicitações, {concurrency} simultâneas, latência do Xata {latency * 1000:.0f} ms")
+        report("síncrono (threadpool)", *asyncio.run(load(build_sync_app(server.url), total, concurrency)))
+        report("assíncrono", *asyncio.run(load(build_async_app(server.url), total, concurrency)))
+    finally:
+        server.stop()
+
+if __name__ == "__main__":
+    main(args.requests, args.concurrency, args.latency)
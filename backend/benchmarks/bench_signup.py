@@ -0,0 +1,75 @@
+"""
+Vazão de cadastros (hash bcrypt) sob concorrência e atraso do event loop: hash na
+própria rota (como antes) contra o pool de processos do PasswordHasher.
+
+Uso (no diretório backend/):
+    python benchmarks/bench_signup.py [--signups 64] [--concurrency 32] [--workers N] [--rounds 12]
+
+O atraso do event loop é medido por uma tarefa que acorda a cada 10 ms: enquanto um
+hash roda no loop, nenhuma outra solicitação é atendida.
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--signups", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=None, help="PASSWORD_HASH_WORKERS (padrão: o configurado)")
+    parser.add_argument("--rounds", type=int, default=None, help="BCRYPT_ROUNDS (padrão: o configurado)")
+    return parser.parse_args()
+
+args = parse_args() if __name__ == "__main__" else None
+if args is not None and args.rounds:
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from password_hasher import BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS, PasswordHasher, hash_password
+
+async def loop_lag(stop: asyncio.Event, interval: float = 0.01):
+    """Maior atraso observado entre o horário previsto e o real de cada despertar."""
+    worst = 0.0
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - expected)
+    return worst
+
+async def run(signup, total: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            await signup(f"senha-do-usuario-{i}")
+
+    stop = asyncio.Event()
+    lag = asyncio.create_task(loop_lag(stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    return elapsed, await lag
+
+def report(name: str, total: int, elapsed: float, lag: float):
+    print(f"{name:<26} {total / elapsed:>7.1f} cadastros/s   atraso máximo do loop {lag * 1000:>8.1f} ms")
+
+async def main(total: int, concurrency: int, workers: int):
+    print(f"{total} cadastros, {concurrency} simultâneos, custo bcrypt {BCRYPT_ROUNDS}, {workers} processos")
+
+    async def inline(password):
+        hash_password(password)
+    report("no event loop (antes)", total, *await run(inline, total, concurrency))
+
+    hasher = PasswordHasher(workers=workers, max_concurrency=workers * 4, queue_timeout=300)
+    hasher.start()
+    # Aquecer os processos do pool antes da medição
+    await asyncio.gather(*(hasher.hash("aquecimento") for _ in range(workers)))
+    report("pool de processos", total, *await run(hasher.hash, total, concurrency))
+    await asyncio.to_thread(hasher.shutdown)
+
+if __name__ == "__main__":
+    asyncio.run(main(args.signups, args.concurrency, args.workers or PASSWORD_HASH_WORKERS))
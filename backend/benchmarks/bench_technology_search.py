@@ -0,0 +1,98 @@
+"""
+Busca de projetos por tecnologia no Postgres: contenção JSONB atendida pelo índice GIN
+(`ProjectRepository.find_by_technologies`) contra a busca por texto anterior, que
+percorria a tabela inteira (`technologies::text LIKE '%"React"%'`).
+
+Uso (no diretório backend/):
+    python benchmarks/bench_technology_search.py --database-url postgresql://... [--projects 500000]
+
+Use um banco descartável: a tabela `projects` recebe os registros de teste, mantidos
+entre execuções para evitar uma nova carga.
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import String, and_, cast, create_engine, func, select, text
+from sqlalchemy.orm import Session
+
+from db_client import Base
+from models import Project, Task, User
+from repositories import ProjectRepository, keyset_query, page_result
+
+# Tecnologias raras e comuns: a seletividade muda o plano escolhido pelo Postgres
+TECHNOLOGIES = ["Python", "FastAPI", "React", "Node", "PostgreSQL", "Redis", "Go", "Rust", "Elixir", "Kotlin"]
+SEARCHES = [["Elixir", "Kotlin"], ["Rust"], ["React", "Node"], ["Python"]]
+
+def seed(engine, projects: int):
+    with engine.begin() as connection:
+        existing = connection.execute(select(func.count()).select_from(Project)).scalar_one()
+        if existing >= projects:
+            return existing
+        owner_id = connection.execute(text(
+            "INSERT INTO users (email, name, password_hash, is_active, created_at) "
+            "VALUES ('bench-owner@example.com', 'Benchmark', 'x', true, now()) "
+            "ON CONFLICT (email) DO UPDATE SET name = EXCLUDED.name RETURNING id"
+        )).scalar_one()
+        print(f"Inserindo {projects - existing} projetos...")
+        # Cada projeto usa de 1 a 4 tecnologias sorteadas, com pesos desiguais
+        connection.execute(text(
+            "INSERT INTO projects (title, description, project_type, technologies, owner_id, is_active, created_at) "
+            "SELECT 'Projeto ' || g, 'Descrição', 'BACKEND', "
+            "(SELECT jsonb_agg(DISTINCT t) FROM ("
+            "  SELECT (:technologies)[1 + floor(power(random(), 2) * :count)::int] AS t "
+            "  FROM generate_series(1, 1 + (g % 4))"
+            ") AS picked), "
+            ":owner_id, true, TIMESTAMP '2024-01-01' + g * INTERVAL '1 second' "
+            "FROM generate_series(:start, :end) AS g"
+        ), {"technologies": TECHNOLOGIES, "count": len(TECHNOLOGIES), "owner_id": owner_id, "start": existing + 1, "end": projects})
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("ANALYZE projects"))
+    return projects
+
+def text_search(session: Session, technologies, limit: int):
+    """Busca anterior: correspondência de texto sobre o JSON serializado."""
+    serialized = cast(Project.technologies, String)
+    query = keyset_query(Project).where(and_(*[serialized.like(f'%"{technology}"%') for technology in technologies]))
+    return page_result(session.execute(query.limit(limit + 1)).scalars().all(), limit)
+
+def measure(operation, repeat: int):
+    result = operation()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        operation()
+        samples.append(time.perf_counter() - start)
+    return result, statistics.median(samples)
+
+def main(database_url: str, projects: int, limit: int, repeat: int):
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine, tables=[User.__table__, Project.__table__, Task.__table__])
+    projects = seed(engine, projects)
+
+    print(f"{projects} projetos, páginas de {limit}, mediana de {repeat} execuções")
+    print(f"{'tecnologias':<20} {'texto (LIKE)':>14} {'JSONB + GIN':>14}")
+    with Session(engine) as session:
+        repository = ProjectRepository(session)
+        for technologies in SEARCHES:
+            (expected, _), like = measure(lambda: text_search(session, technologies, limit), repeat)
+            (found, _), contains = measure(lambda: repository.find_by_technologies(technologies, limit=limit), repeat)
+            assert [project.id for project in found] == [project.id for project in expected]
+            print(f"{' + '.join(technologies):<20} {like * 1000:>11.2f} ms {contains * 1000:>11.2f} ms")
+            session.expunge_all()
+    engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--projects", type=int, default=500_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error("informe --database-url ou DATABASE_URL")
+    main(args.database_url, args.projects, args.limit, args.repeat)
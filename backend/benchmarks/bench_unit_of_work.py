@@ -0,0 +1,140 @@
+"""
+Custo por solicitação da persistência no Postgres através da API: commit e refresh a
+cada chamada de repositório (antes) contra a unidade de trabalho, em que os
+repositórios apenas fazem flush e o UnitOfWorkMiddleware faz um único commit.
+
+Uso (no diretório backend/):
+    python benchmarks/bench_unit_of_work.py --database-url postgresql://... [--requests 200] [--tasks 8]
+
+Cada solicitação cria um projeto com suas tarefas e conclui duas delas. Use um banco
+descartável: os projetos criados são removidos ao final.
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, delete, event, select
+from sqlalchemy.orm import Session, sessionmaker
+
+import db_client
+from db_client import Base, UnitOfWorkMiddleware, get_db
+from models import Project, Task, TaskStatus, User
+from repositories import ProjectRepository, TaskRepository
+from bench_create_with_tasks import owner, project_data, task_data
+
+def create_app(owner_id: int, tasks: int) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(UnitOfWorkMiddleware)
+
+    @app.post("/commit-per-call")
+    def commit_per_call(db: Session = Depends(get_db)):
+        """Como antes da unidade de trabalho: commit e refresh em cada operação."""
+        project = Project(**project_data(owner_id))
+        db.add(project)
+        db.commit()
+        db.refresh(project)
+        created = []
+        for data in task_data(tasks):
+            task = Task(**data, project_id=project.id)
+            db.add(task)
+            db.commit()
+            db.refresh(task)
+            created.append(task)
+        for task in created[:2]:
+            task = db.get(Task, task.id)
+            task.status = TaskStatus.COMPLETED
+            task.completed_at = datetime.utcnow()
+            db.commit()
+            db.refresh(task)
+        return {"id": project.id}
+
+    @app.post("/unit-of-work")
+    def unit_of_work(db: Session = Depends(get_db)):
+        project = ProjectRepository(db).create(project_data(owner_id))
+        task_repository = TaskRepository(db)
+        created = [task_repository.create({**data, "project_id": project.id}) for data in task_data(tasks)]
+        for task in created[:2]:
+            task_repository.complete_task(task.id)
+        return {"id": project.id}
+
+    return app
+
+class Recorder:
+    """Conta comandos e commits enviados ao banco e mede a duração de cada commit."""
+    def __init__(self, engine, session_factory):
+        self.statements = 0
+        self.commit_seconds = []
+        event.listen(engine, "before_cursor_execute", self.statement)
+        event.listen(session_factory, "before_commit", self.before_commit)
+        event.listen(session_factory, "after_commit", self.after_commit)
+
+    def statement(self, *args):
+        self.statements += 1
+
+    def before_commit(self, session):
+        session.info["commit_started"] = time.perf_counter()
+
+    def after_commit(self, session):
+        self.commit_seconds.append(time.perf_counter() - session.info.pop("commit_started"))
+
+    def reset(self):
+        self.statements = 0
+        self.commit_seconds = []
+
+async def run(app: FastAPI, path: str, requests: int):
+    samples = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = await client.post(path)
+            samples.append(time.perf_counter() - start)
+            response.raise_for_status()
+    return samples
+
+def main(database_url: str, requests: int, tasks: int):
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine, tables=[User.__table__, Project.__table__, Task.__table__])
+    owner_id = owner(engine)
+    # As rotas usam get_db, como as da aplicação; apenas o banco é substituído
+    db_client.SessionLocal = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    recorder = Recorder(engine, db_client.SessionLocal)
+    app = create_app(owner_id, tasks)
+
+    print(f"{requests} solicitações, cada uma cria um projeto com {tasks} tarefas e conclui 2")
+    for name, path in (("commit por chamada", "/commit-per-call"), ("unidade de trabalho", "/unit-of-work")):
+        asyncio.run(run(app, path, 5))
+        recorder.reset()
+        samples = asyncio.run(run(app, path, requests))
+        samples.sort()
+        p99 = samples[int(len(samples) * 0.99) - 1]
+        print(
+            f"{name:<20} média {statistics.mean(samples) * 1000:>7.2f} ms   p99 {p99 * 1000:>7.2f} ms   "
+            f"{recorder.statements / requests:>5.1f} comandos   {len(recorder.commit_seconds) / requests:>4.1f} commits   "
+            f"{sum(recorder.commit_seconds) * 1000 / requests:>6.2f} ms em commits por solicitação"
+        )
+
+    with Session(engine) as session:
+        project_ids = select(Project.id).where(Project.owner_id == owner_id)
+        session.execute(delete(Task).where(Task.project_id.in_(project_ids)))
+        session.execute(delete(Project).where(Project.owner_id == owner_id))
+        session.commit()
+    engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--tasks", type=int, default=8)
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error("informe --database-url ou DATABASE_URL")
+    main(args.database_url, args.requests, args.tasks)
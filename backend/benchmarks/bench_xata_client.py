@@ -0,0 +1,79 @@
+"""
+Custo de um cliente Xata construído a cada solicitação (sessão HTTP fria, nova conexão)
+contra o cliente compartilhado com pool de conexões keep-alive, contra um servidor
+Xata falso local.
+
+Uso (no diretório backend/):
+    python benchmarks/bench_xata_client.py [--iterations 500] [--concurrency 40] [--latency 0.005]
+
+O servidor local usa HTTP sem TLS: com o Xata real, cada conexão nova também paga o
+handshake TLS, e a diferença entre os dois modos é maior.
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_xata import FakeXataServer, point_sync_client
+from xata.client import XataClient
+from xata_client import XATA_API_KEY, XATA_DATABASE_URL, _namespace_sessions, create_xata_client
+
+QUERY = {"filter": {"email": "ana@example.com"}, "page": {"size": 1}}
+
+def per_request_client(url: str):
+    """Como no `get_db` antigo: um cliente (e suas sessões HTTP) por solicitação."""
+    def operation():
+        client = point_sync_client(XataClient(api_key=XATA_API_KEY, db_url=XATA_DATABASE_URL), url)
+        try:
+            client.data().query("users", QUERY)
+        finally:
+            for session in _namespace_sessions(client):
+                session.close()
+    return operation
+
+def shared_client(url: str):
+    client = point_sync_client(create_xata_client(), url)
+    return lambda: client.data().query("users", QUERY)
+
+def measure(operation, iterations: int, concurrency: int):
+    def timed(_):
+        start = time.perf_counter()
+        operation()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        samples = list(executor.map(timed, range(iterations)))
+    return samples, time.perf_counter() - start
+
+def report(name: str, samples, elapsed: float, server: FakeXataServer):
+    samples = sorted(samples)
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    print(
+        f"{name:<24} média {statistics.mean(samples) * 1000:>7.2f} ms   p99 {p99 * 1000:>7.2f} ms   "
+        f"{len(samples) / elapsed:>8.0f} req/s   {server.connections:>5} conexões"
+    )
+
+def main(iterations: int, concurrency: int, latency: float):
+    server = FakeXataServer(latency=latency).start()
+    try:
+        print(f"{iterations} consultas, {concurrency} simultâneas, latência do servidor {latency * 1000:.1f} ms")
+        for name, operation in (("cliente por solicitação", per_request_client(server.url)), ("cliente compartilhado", shared_client(server.url))):
+            operation()
+            server.reset_counters()
+            samples, elapsed = measure(operation, iterations, concurrency)
+            report(name, samples, elapsed, server)
+    finally:
+        server.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.005)
+    args = parser.parse_args()
+    main(args.iterations, args.concurrency, args.latency)
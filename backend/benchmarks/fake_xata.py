@@ -0,0 +1,151 @@
+"""
+Servidor HTTP local que imita as rotas do Xata usadas pelos routers, com latência
+configurável, para os benchmarks do backend (sem rede nem credenciais reais).
+"""
+import os
+import sys
+import json
+import time
+import threading
+import multiprocessing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+# Pacote compartilhado entre os serviços (`codespark_common`), na raiz do repositório
+sys.path.insert(0, os.path.dirname(SERVICE_DIR))
+
+# O módulo xata_client exige as credenciais; o banco apontado é substituído pelo servidor local
+os.environ.setdefault("XATA_API_KEY", "xau_benchmark")
+os.environ.setdefault("XATA_DATABASE_URL", "https://benchmark.local.xata.sh/db/codespark:main")
+
+CREATED_AT = "2024-01-01T00:00:00.000Z"
+
+def fake_record(table_name: str, record_id: str) -> dict:
+    record = {"id": record_id, "xata": {"createdAt": CREATED_AT, "updatedAt": CREATED_AT, "version": 0}}
+    if table_name == "users":
+        record.update({"email": f"{record_id}@example.com", "name": "Usuário", "isActive": True})
+    elif table_name == "projects":
+        record.update({
+            "title": "Projeto", "description": "Descrição", "projectType": "BACKEND",
+            "technologies": "Python,FastAPI", "ownerId": {"id": "rec_user"}, "isActive": True,
+        })
+    else:
+        record.update({"title": "Tarefa", "description": "Descrição", "status": "PENDING", "projectId": {"id": "rec_project"}})
+    return record
+
+class FakeXataHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 mantém as conexões abertas entre solicitações (keep-alive)
+    protocol_version = "HTTP/1.1"
+    # Cabeçalhos e corpo saem em escritas separadas; sem isso o ACK atrasado domina a latência
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.record_connection()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _respond(self, status: int, body: dict):
+        self.server.record_request()
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_body(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length)) if length else {}
+
+    def _table(self) -> str:
+        # /db/{banco}:{branch}/tables/{tabela}/...
+        parts = self.path.split("?")[0].strip("/").split("/")
+        return parts[3] if len(parts) > 3 else ""
+
+    def do_GET(self):
+        record_id = self.path.split("?")[0].rstrip("/").rsplit("/", 1)[-1]
+        self._respond(200, fake_record(self._table(), record_id))
+
+    def do_POST(self):
+        table_name = self._table()
+        body = self._read_body()
+        if self.path.split("?")[0].endswith("/query"):
+            size = (body.get("page") or {}).get("size", 20)
+            records = [fake_record(table_name, f"rec_{i}") for i in range(min(size, self.server.page_size))]
+            self._respond(200, {"records": records, "meta": {"page": {"cursor": "cursor", "more": False}}})
+        else:
+            self._respond(201, {**fake_record(table_name, "rec_new"), **body})
+
+class FakeXataServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, latency: float = 0.0, page_size: int = 5):
+        super().__init__(("127.0.0.1", 0), FakeXataHandler)
+        self.latency = latency
+        self.page_size = page_size
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def record_connection(self):
+        with self._lock:
+            self.connections += 1
+
+    def reset_counters(self):
+        with self._lock:
+            self.requests = 0
+            self.connections = 0
+
+    def start(self) -> "FakeXataServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+def _serve(latency: float, page_size: int, urls):
+    server = FakeXataServer(latency=latency, page_size=page_size)
+    urls.put(server.url)
+    server.serve_forever()
+
+class FakeXataProcess:
+    """
+    Servidor falso em um processo separado, para que as threads do servidor não
+    disputem o GIL com o event loop medido.
+    """
+    def __init__(self, latency: float = 0.0, page_size: int = 5):
+        urls = multiprocessing.Queue()
+        self.process = multiprocessing.Process(target=_serve, args=(latency, page_size, urls), daemon=True)
+        self.process.start()
+        self.url = urls.get(timeout=10)
+
+    def stop(self):
+        self.process.terminate()
+        self.process.join()
+
+def point_sync_client(client, url: str):
+    """Direciona as sessões de todos os namespaces do SDK para o servidor local."""
+    for namespace in vars(client).values():
+        if hasattr(namespace, "session"):
+            namespace.get_base_url = lambda: url
+    return client
+
+def point_async_client(client, url: str):
+    """Direciona o cliente assíncrono para o servidor local, mantendo o caminho do banco."""
+    client._http.base_url = url + client._http.base_url.path
+    return client
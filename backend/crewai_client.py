@@ -0,0 +1,234 @@
+import os
+import time
+import random
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+
+import httpx
+
+from logger import get_logger
+from codespark_common.tracing import client_span, set_span_attributes
+
+logger = get_logger(__name__)
+
+# Configurações do cliente HTTP do serviço CrewAI
+CREWAI_SERVICE_URL = os.getenv("CREWAI_SERVICE_URL", "http://crewai:8001")
+# O tempo de leitura acompanha o prazo das gerações no serviço CrewAI (CREW_REQUEST_TIMEOUT)
+# com uma margem, para que o serviço responda (inclusive com 504) antes de o backend desistir
+CREW_REQUEST_TIMEOUT = float(os.getenv("CREW_REQUEST_TIMEOUT", "120"))
+CREWAI_TIMEOUT_MARGIN = float(os.getenv("CREWAI_TIMEOUT_MARGIN", "10"))
+CREWAI_TIMEOUT = float(os.getenv("CREWAI_TIMEOUT", str(CREW_REQUEST_TIMEOUT + CREWAI_TIMEOUT_MARGIN)))
+CREWAI_CONNECT_TIMEOUT = float(os.getenv("CREWAI_CONNECT_TIMEOUT", "5"))
+CREWAI_POOL_TIMEOUT = float(os.getenv("CREWAI_POOL_TIMEOUT", "5"))
+CREWAI_MAX_CONNECTIONS = int(os.getenv("CREWAI_MAX_CONNECTIONS", "100"))
+CREWAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("CREWAI_MAX_KEEPALIVE_CONNECTIONS", "20"))
+CREWAI_KEEPALIVE_EXPIRY = float(os.getenv("CREWAI_KEEPALIVE_EXPIRY", "30"))
+
+# Configurações de novas tentativas
+CREWAI_MAX_RETRIES = int(os.getenv("CREWAI_MAX_RETRIES", "2"))
+CREWAI_RETRY_BACKOFF = float(os.getenv("CREWAI_RETRY_BACKOFF", "0.5"))
+CREWAI_RETRY_MAX_BACKOFF = float(os.getenv("CREWAI_RETRY_MAX_BACKOFF", "10"))
+
+# Configurações do circuit breaker
+CREWAI_BREAKER_FAILURE_THRESHOLD = int(os.getenv("CREWAI_BREAKER_FAILURE_THRESHOLD", "5"))
+CREWAI_BREAKER_RESET_TIMEOUT = float(os.getenv("CREWAI_BREAKER_RESET_TIMEOUT", "30"))
+
+# Respostas em que o serviço CrewAI recusou a solicitação antes de processá-la,
+# portanto seguras para uma nova tentativa
+RETRYABLE_STATUS_CODES = {429, 502, 503}
+
+# Falhas de conexão em que a solicitação não chegou a ser enviada
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+# Gerações que excederam o prazo (504 do serviço ou tempo de leitura esgotado) indicam
+# uma geração lenta, não um serviço indisponível: não contam como falha no circuit breaker
+DEADLINE_STATUS_CODES = {504}
+
+class CircuitOpenError(Exception):
+    """Lançada quando o circuit breaker está aberto e as chamadas falham imediatamente."""
+    def __init__(self, retry_after: float):
+        super().__init__("Serviço CrewAI indisponível no momento")
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """
+    Circuit breaker simples: abre após `failure_threshold` falhas consecutivas, rejeita
+    chamadas por `reset_timeout` segundos e então libera uma chamada de teste (meio aberto).
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = CREWAI_BREAKER_FAILURE_THRESHOLD, reset_timeout: float = CREWAI_BREAKER_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.stats = {"opened": 0, "rejected": 0}
+
+    def before_request(self):
+        if self.state == self.OPEN:
+            elapsed = time.monotonic() - self.opened_at
+            if elapsed < self.reset_timeout:
+                self.stats["rejected"] += 1
+                raise CircuitOpenError(retry_after=self.reset_timeout - elapsed)
+            self.state = self.HALF_OPEN
+            self.opened_at = time.monotonic()
+        elif self.state == self.HALF_OPEN:
+            # Apenas uma chamada de teste por vez enquanto meio aberto; se a chamada de
+            # teste não concluir (ex: cancelada), outra é liberada após `reset_timeout`
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.stats["rejected"] += 1
+                raise CircuitOpenError(retry_after=1)
+            self.opened_at = time.monotonic()
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.stats["opened"] += 1
+                logger.warning("Circuit breaker do serviço CrewAI aberto")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "state": self.state, "consecutive_failures": self.consecutive_failures}
+
+def backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """
+    Espera antes da próxima tentativa: respeita o `Retry-After` do serviço quando
+    presente; caso contrário, usa backoff exponencial com jitter completo.
+    """
+    if retry_after:
+        try:
+            return min(float(retry_after), CREWAI_RETRY_MAX_BACKOFF)
+        except ValueError:
+            pass
+    return random.uniform(0, min(CREWAI_RETRY_BACKOFF * (2 ** attempt), CREWAI_RETRY_MAX_BACKOFF))
+
+class CrewAIClient:
+    """
+    Cliente HTTP do serviço CrewAI com pool de conexões keep-alive compartilhado
+    durante o ciclo de vida da aplicação, novas tentativas e circuit breaker.
+    """
+    def __init__(self, base_url: str = CREWAI_SERVICE_URL, max_retries: int = CREWAI_MAX_RETRIES):
+        self.base_url = base_url
+        self.max_retries = max_retries
+        self.breaker = CircuitBreaker()
+        self._client: Optional[httpx.AsyncClient] = None
+        self.in_flight = 0
+        self.stats = {"requests": 0, "retries": 0, "failures": 0, "timeouts": 0}
+
+    async def start(self):
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=httpx.Timeout(CREWAI_TIMEOUT, connect=CREWAI_CONNECT_TIMEOUT, pool=CREWAI_POOL_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=CREWAI_MAX_CONNECTIONS,
+                max_keepalive_connections=CREWAI_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=CREWAI_KEEPALIVE_EXPIRY,
+            ),
+        )
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def post(self, path: str, payload: Dict[str, Any]) -> httpx.Response:
+        """
+        Envia um POST ao serviço CrewAI. Falhas de conexão e recusas por sobrecarga
+        (429/502/503) são repetidas até `max_retries` vezes com backoff.
+
+        Raises:
+            CircuitOpenError: se o circuit breaker estiver aberto
+        """
+        attempt = 0
+        while True:
+            self.breaker.before_request()
+            self.stats["requests"] += 1
+            self.in_flight += 1
+            try:
+                # O contexto do trace segue no cabeçalho `traceparent` até o serviço CrewAI
+                with client_span(f"POST {path}", **{"http.method": "POST", "http.url": self.base_url + path, "retry.attempt": attempt}) as (trace_span, headers):
+                    response = await self._client.post(path, json=payload, headers=headers)
+                    set_span_attributes(trace_span, **{"http.status_code": response.status_code})
+            except RETRYABLE_ERRORS as e:
+                self._record_failure()
+                if attempt >= self.max_retries:
+                    raise
+                delay = backoff_delay(attempt)
+                logger.warning(f"Falha de conexão com o serviço CrewAI ({e!r}), nova tentativa em {delay:.2f}s")
+            except httpx.ReadTimeout:
+                self.stats["timeouts"] += 1
+                raise
+            except httpx.HTTPError:
+                self._record_failure()
+                raise
+            else:
+                if response.status_code in DEADLINE_STATUS_CODES:
+                    self.stats["timeouts"] += 1
+                    return response
+                if response.status_code not in RETRYABLE_STATUS_CODES and response.status_code < 500:
+                    self.breaker.record_success()
+                    return response
+                self._record_failure()
+                if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= self.max_retries:
+                    return response
+                delay = backoff_delay(attempt, response.headers.get("Retry-After"))
+                logger.warning(f"Serviço CrewAI respondeu {response.status_code}, nova tentativa em {delay:.2f}s")
+            finally:
+                self.in_flight -= 1
+
+            attempt += 1
+            self.stats["retries"] += 1
+            await asyncio.sleep(delay)
+
+    @asynccontextmanager
+    async def stream(self, path: str, payload: Dict[str, Any]):
+        """
+        Abre uma resposta em streaming do serviço CrewAI, sem novas tentativas. O tempo
+        máximo entre eventos é o mesmo das chamadas comuns: o serviço encerra o stream
+        com um evento de erro ao atingir o prazo da geração.
+        """
+        self.breaker.before_request()
+        self.stats["requests"] += 1
+        self.in_flight += 1
+        try:
+            with client_span(f"POST {path}", **{"http.method": "POST", "http.url": self.base_url + path}) as (trace_span, headers):
+                async with self._client.stream("POST", path, json=payload, headers=headers) as response:
+                    set_span_attributes(trace_span, **{"http.status_code": response.status_code})
+                    if response.status_code in DEADLINE_STATUS_CODES:
+                        self.stats["timeouts"] += 1
+                    elif response.status_code >= 500 or response.status_code in RETRYABLE_STATUS_CODES:
+                        self._record_failure()
+                    else:
+                        self.breaker.record_success()
+                    yield response
+        except httpx.ReadTimeout:
+            self.stats["timeouts"] += 1
+            raise
+        except httpx.HTTPError:
+            self._record_failure()
+            raise
+        finally:
+            self.in_flight -= 1
+
+    def _record_failure(self):
+        self.stats["failures"] += 1
+        self.breaker.record_failure()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "in_flight": self.in_flight,
+            "max_connections": CREWAI_MAX_CONNECTIONS,
+            "read_timeout": CREWAI_TIMEOUT,
+            "breaker": self.breaker.get_stats(),
+        }
@@ -0,0 +1,265 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from logger import get_logger
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # Redis é opcional: sem ele, o armazenamento em memória é utilizado
+    aioredis = None
+
+logger = get_logger(__name__)
+
+# Configurações da fila de jobs de geração
+JOB_STORE_BACKEND = os.getenv("JOB_STORE_BACKEND", "redis" if os.getenv("REDIS_URL") else "memory")
+JOB_TTL_SECONDS = int(os.getenv("JOB_TTL_SECONDS", "3600"))
+JOB_QUEUE_MAX_SIZE = int(os.getenv("JOB_QUEUE_MAX_SIZE", "100"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_CALLBACK_TIMEOUT = float(os.getenv("JOB_CALLBACK_TIMEOUT", "10"))
+# Destinos permitidos para a callback_url: hosts exatos ou sufixos como "*.exemplo.com".
+# Sem hosts configurados, callbacks não são aceitas (o servidor faria POST para qualquer
+# endereço informado pelo cliente, inclusive serviços internos)
+JOB_CALLBACK_ALLOWED_SCHEMES = [item.strip().lower() for item in os.getenv("JOB_CALLBACK_ALLOWED_SCHEMES", "https").split(",") if item.strip()]
+JOB_CALLBACK_ALLOWED_HOSTS = [item.strip().lower() for item in os.getenv("JOB_CALLBACK_ALLOWED_HOSTS", "").split(",") if item.strip()]
+JOB_KEY_PREFIX = "codespark:job:"
+REDIS_URL = os.getenv("REDIS_URL")
+
+# Estados possíveis de um job
+JOB_PENDING = "PENDING"
+JOB_RUNNING = "RUNNING"
+JOB_COMPLETED = "COMPLETED"
+JOB_FAILED = "FAILED"
+
+class JobQueueFull(Exception):
+    """Lançada quando a fila de jobs atingiu sua capacidade máxima."""
+
+class CallbackNotAllowed(ValueError):
+    """Lançada quando a callback_url não está entre os destinos permitidos."""
+
+def validate_callback_url(
+    url: str,
+    allowed_schemes: List[str] = JOB_CALLBACK_ALLOWED_SCHEMES,
+    allowed_hosts: List[str] = JOB_CALLBACK_ALLOWED_HOSTS,
+) -> str:
+    """
+    Verifica se a callback_url usa um esquema e um host permitidos.
+
+    Raises:
+        CallbackNotAllowed: Se o destino não estiver na lista de permitidos
+    """
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if parts.scheme.lower() not in allowed_schemes or not host or parts.username or parts.password:
+        raise CallbackNotAllowed("callback_url não permitida")
+    for allowed in allowed_hosts:
+        if host == allowed or (allowed.startswith("*.") and host.endswith(allowed[1:])):
+            return url
+    raise CallbackNotAllowed("callback_url não permitida")
+
+class MemoryJobStore:
+    """
+    Armazenamento de jobs em memória, com expiração. Indicado para testes e desenvolvimento.
+    """
+    def __init__(self, ttl: int = JOB_TTL_SECONDS):
+        self.ttl = ttl
+        self._jobs: Dict[str, tuple] = {}
+
+    async def save(self, job: Dict[str, Any]):
+        self._purge_expired()
+        self._jobs[job["id"]] = (time.monotonic() + self.ttl, job)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._jobs.get(job_id)
+        if entry is None:
+            return None
+        expires_at, job = entry
+        if expires_at <= time.monotonic():
+            del self._jobs[job_id]
+            return None
+        return job
+
+    async def delete(self, job_id: str):
+        self._jobs.pop(job_id, None)
+
+    async def close(self):
+        pass
+
+    def _purge_expired(self):
+        now = time.monotonic()
+        for job_id in [job_id for job_id, (expires_at, _) in self._jobs.items() if expires_at <= now]:
+            del self._jobs[job_id]
+
+class RedisJobStore:
+    """
+    Armazenamento de jobs no Redis, compartilhado entre as instâncias da API.
+    """
+    def __init__(self, client, ttl: int = JOB_TTL_SECONDS, key_prefix: str = JOB_KEY_PREFIX):
+        self.client = client
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+
+    async def save(self, job: Dict[str, Any]):
+        await self.client.set(self.key_prefix + job["id"], json.dumps(job), ex=self.ttl)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raw = await self.client.get(self.key_prefix + job_id)
+        return json.loads(raw) if raw is not None else None
+
+    async def delete(self, job_id: str):
+        await self.client.delete(self.key_prefix + job_id)
+
+    async def close(self):
+        await self.client.close()
+
+def create_job_store():
+    """
+    Cria o armazenamento de jobs configurado em `JOB_STORE_BACKEND` ("memory" ou "redis").
+    """
+    if JOB_STORE_BACKEND == "redis":
+        if aioredis is None or not REDIS_URL:
+            raise RuntimeError("JOB_STORE_BACKEND=redis requer o pacote 'redis' e a variável REDIS_URL")
+        return RedisJobStore(aioredis.from_url(REDIS_URL))
+    return MemoryJobStore()
+
+class JobQueue:
+    """
+    Fila limitada de jobs de geração, processada por um número fixo de workers.
+
+    Args:
+        store: Armazenamento onde o estado dos jobs é mantido
+        handler: Corrotina que recebe a solicitação e retorna o resultado do job
+        max_size: Quantidade máxima de jobs aguardando processamento
+        workers: Quantidade de workers processando jobs simultaneamente
+    """
+    def __init__(
+        self,
+        store,
+        handler: Callable[[Any], Awaitable[Dict[str, Any]]],
+        max_size: int = JOB_QUEUE_MAX_SIZE,
+        workers: int = JOB_WORKERS,
+    ):
+        self.store = store
+        self.handler = handler
+        self.workers = workers
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self._tasks: List[asyncio.Task] = []
+        self._running: Dict[str, Dict[str, Any]] = {}
+
+    def start(self):
+        for index in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._worker(), name=f"job-worker-{index}"))
+
+    async def stop(self):
+        # Jobs interrompidos ou ainda na fila não serão retomados: marcá-los como falhos
+        # para que não fiquem indefinidamente PENDING/RUNNING no armazenamento. Os jobs em
+        # execução são lidos antes do cancelamento, que os remove de `_running`
+        interrupted = list(self._running.values())
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._running.clear()
+        while not self._queue.empty():
+            interrupted.append(self._queue.get_nowait()[0])
+        for job in interrupted:
+            try:
+                if job["status"] in (JOB_COMPLETED, JOB_FAILED):
+                    # Concluído, mas interrompido enquanto o estado final era salvo
+                    await self.store.save(job)
+                else:
+                    await self._update(job, status=JOB_FAILED, error="Job interrompido pelo encerramento do serviço")
+            except Exception as e:
+                logger.error(f"Erro ao marcar job {job['id']} como interrompido: {str(e)}")
+        if interrupted:
+            logger.warning(f"{len(interrupted)} job(s) de geração interrompido(s) pelo encerramento")
+        await self.store.close()
+
+    async def submit(self, request, callback_url: Optional[str] = None) -> Dict[str, Any]:
+        if callback_url:
+            validate_callback_url(callback_url)
+        if self._queue.full():
+            raise JobQueueFull("A fila de geração de projetos está cheia")
+
+        now = datetime.utcnow().isoformat()
+        job = {
+            "id": uuid.uuid4().hex,
+            "status": JOB_PENDING,
+            "created_at": now,
+            "updated_at": now,
+            "callback_url": callback_url,
+            "result": None,
+            "error": None,
+        }
+        await self.store.save(job)
+        try:
+            self._queue.put_nowait((job, request))
+        except asyncio.QueueFull:
+            # Outras submissões ocuparam a fila enquanto o job era salvo
+            await self.store.delete(job["id"])
+            raise JobQueueFull("A fila de geração de projetos está cheia")
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self.store.get(job_id)
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+    async def _worker(self):
+        while True:
+            job, request = await self._queue.get()
+            try:
+                await self._run(job, request)
+            except Exception as e:
+                logger.exception(f"Erro inesperado ao processar job {job['id']}: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Dict[str, Any], request):
+        self._running[job["id"]] = job
+        try:
+            await self._record(job, status=JOB_RUNNING)
+            try:
+                result = await self.handler(request)
+            except Exception as e:
+                logger.error(f"Job {job['id']} falhou: {str(e)}")
+                await self._record(job, status=JOB_FAILED, error=str(e))
+            else:
+                await self._record(job, status=JOB_COMPLETED, result=result)
+        finally:
+            self._running.pop(job["id"], None)
+
+        if job.get("callback_url"):
+            await self._notify(job)
+
+    async def _update(self, job: Dict[str, Any], **changes):
+        job.update(changes, updated_at=datetime.utcnow().isoformat())
+        await self.store.save(job)
+
+    async def _record(self, job: Dict[str, Any], **changes):
+        """
+        Atualiza o job como `_update`, mas uma falha do armazenamento (ex: Redis
+        indisponível) é registrada no log sem interromper o processamento do job.
+        """
+        try:
+            await self._update(job, **changes)
+        except Exception as e:
+            logger.error(f"Erro ao salvar o estado do job {job['id']}: {str(e)}")
+
+    async def _notify(self, job: Dict[str, Any]):
+        payload = {key: value for key, value in job.items() if key != "callback_url"}
+        try:
+            async with httpx.AsyncClient(timeout=JOB_CALLBACK_TIMEOUT) as client:
+                response = await client.post(job["callback_url"], json=payload)
+            if response.status_code >= 400:
+                logger.warning(f"Callback do job {job['id']} retornou {response.status_code}")
+        except httpx.HTTPError as e:
+            logger.warning(f"Falha ao notificar callback do job {job['id']}: {str(e)}")
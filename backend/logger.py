@@ -2,9 +2,22 @@ import logging
 import sys
 import os
 import json
-from datetime import datetime
+import queue
+import atexit
+import threading
+import random
+import time
+import uuid
+import contextvars
+from datetime import datetime, timezone
 import traceback
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+
+# orjson é opcional; quando instalado, acelera a serialização dos logs em JSON
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Configurações de logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -12,10 +25,230 @@ LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 LOG_FILE = "logs/codespark_backend.log"
 LOG_MAX_SIZE = 10 * 1024 * 1024  # 10 MB
 LOG_BACKUP_COUNT = 5
+# LOG_JSON: um objeto JSON por linha (padrão) ou texto no formato LOG_FORMAT
+LOG_JSON = os.getenv("LOG_JSON", "true").lower() == "true"
+
+# Configurações da fila de logs
+# LOG_QUEUE_POLICY: "drop" descarta registros com a fila cheia; "block" espera até
+# LOG_QUEUE_BLOCK_TIMEOUT segundos por espaço (bloqueando quem registrou) antes de descartar
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_QUEUE_POLICY = os.getenv("LOG_QUEUE_POLICY", "drop").lower()
+LOG_QUEUE_BLOCK_TIMEOUT = float(os.getenv("LOG_QUEUE_BLOCK_TIMEOUT", "0.05"))
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "256"))
+
+def _csv_env(name, default):
+    return [item.strip() for item in os.getenv(name, default).split(",") if item.strip()]
+
+# Configurações do log de requisições
+# LOG_SAMPLE_RATE: fração das requisições registradas (0.0 a 1.0)
+# LOG_ROUTE_SAMPLE_RATES: taxas por prefixo de rota, ex: "/api/users=0.1,/api/generate-project=1"
+# LOG_EXCLUDED_PATHS: prefixos de rota nunca registrados, ex: health checks
+# LOG_HEADER_ALLOWLIST: únicos cabeçalhos registrados; os de LOG_REDACTED_HEADERS têm o valor ocultado
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+LOG_ROUTE_SAMPLE_RATES = sorted(
+    ((prefix.strip(), float(rate)) for prefix, rate in (item.split("=", 1) for item in _csv_env("LOG_ROUTE_SAMPLE_RATES", ""))),
+    key=lambda item: len(item[0]),
+    reverse=True,
+)
+LOG_EXCLUDED_PATHS = tuple(_csv_env("LOG_EXCLUDED_PATHS", "/health,/metrics"))
+LOG_HEADER_ALLOWLIST = frozenset(header.lower() for header in _csv_env(
+    "LOG_HEADER_ALLOWLIST",
+    "user-agent,content-type,content-length,referer,x-forwarded-for,x-request-id,authorization,cookie,set-cookie",
+))
+LOG_REDACTED_HEADERS = frozenset(header.lower() for header in _csv_env("LOG_REDACTED_HEADERS", "authorization,cookie,set-cookie,x-api-key"))
+LOG_MAX_HEADER_LENGTH = int(os.getenv("LOG_MAX_HEADER_LENGTH", "256"))
+REQUEST_ID_HEADER = b"x-request-id"
+REQUEST_ID_MAX_LENGTH = 128
 
 # Criar diretório de logs se não existir
 os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
 
+# Contexto da requisição atual, anexado a todos os registros feitos durante ela
+request_id_var = contextvars.ContextVar("request_id", default=None)
+log_context_var = contextvars.ContextVar("log_context", default=None)
+
+def bind_log_context(**fields):
+    """
+    Adiciona campos ao contexto de log da tarefa atual (ex: job_id), incluídos em
+    todos os registros seguintes feitos no mesmo contexto.
+
+    Returns:
+        Token para restaurar o contexto anterior com `log_context_var.reset`
+    """
+    return log_context_var.set({**(log_context_var.get() or {}), **fields})
+
+def dumps(data) -> str:
+    if orjson is not None:
+        return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(data, default=str, ensure_ascii=False)
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formata cada registro como um objeto JSON em uma linha, com os campos padrão
+    (timestamp, level, logger, message, request_id, event_type) e, quando presentes,
+    os dados estruturados passados em `extra={"data": ...}` e o contexto da requisição.
+    """
+    def format(self, record):
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        event_type = getattr(record, "event_type", None)
+        if event_type:
+            entry["event_type"] = event_type
+        context = getattr(record, "context", None)
+        if context:
+            entry.update(context)
+        data = getattr(record, "data", None)
+        if data is not None:
+            entry["data"] = data
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return dumps(entry)
+
+class TextFormatter(logging.Formatter):
+    """
+    Formato de texto LOG_FORMAT, com os dados estruturados anexados em JSON à mensagem.
+    """
+    def formatMessage(self, record):
+        message = super().formatMessage(record)
+        data = getattr(record, "data", None)
+        if data is not None:
+            message = f"{message}: {dumps(data)}"
+        return message
+
+class BatchFlushMixin:
+    """
+    Adia o flush que os handlers de stream fazem a cada registro; a thread de escrita
+    chama `flush_batch` uma vez por lote.
+    """
+    def flush(self):
+        pass
+
+    def flush_batch(self):
+        super().flush()
+
+class BatchStreamHandler(BatchFlushMixin, logging.StreamHandler):
+    pass
+
+class BatchRotatingFileHandler(BatchFlushMixin, RotatingFileHandler):
+    pass
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Enfileira registros em uma fila limitada sem fazer I/O na thread que registrou,
+    contando os registros descartados quando a fila está cheia.
+    """
+    def __init__(self, log_queue: queue.Queue, policy: str = LOG_QUEUE_POLICY, block_timeout: float = LOG_QUEUE_BLOCK_TIMEOUT):
+        super().__init__(log_queue)
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self._lock = threading.Lock()
+        self.stats = {"enqueued": 0, "dropped": 0, "blocked": 0}
+
+    def prepare(self, record):
+        # Não formatar aqui: a mensagem e os dados estruturados são serializados na
+        # thread de escrita. Apenas o contexto da requisição (que só existe na thread
+        # atual), o traceback e uma cópia dos dados (que quem registrou pode alterar
+        # depois) precisam ser capturados agora
+        record.request_id = request_id_var.get()
+        record.context = log_context_var.get()
+        if isinstance(getattr(record, "data", None), dict):
+            record.data = dict(record.data)
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if self.policy != "block":
+                self._count("dropped")
+                return
+            self._count("blocked")
+            try:
+                self.queue.put(record, timeout=self.block_timeout)
+            except queue.Full:
+                self._count("dropped")
+                return
+        self._count("enqueued")
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+class BatchingQueueListener(QueueListener):
+    """
+    Consome a fila em lotes de até `batch_size` registros e faz um único flush por
+    handler ao fim de cada lote.
+    """
+    def __init__(self, log_queue, *handlers, batch_size: int = LOG_BATCH_SIZE):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.batch_size = batch_size
+        self.batches = 0
+
+    def enqueue_sentinel(self):
+        # Com a fila cheia, esperar por espaço em vez de falhar ao encerrar
+        self.queue.put(self._sentinel)
+
+    def _monitor(self):
+        q = self.queue
+        stopping = False
+        while not stopping:
+            batch = [q.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            for record in batch:
+                if record is self._sentinel:
+                    stopping = True
+                    continue
+                self.handle(record)
+            for handler in self.handlers:
+                try:
+                    handler.flush_batch()
+                except Exception:
+                    traceback.print_exc(file=sys.stderr)
+            self.batches += 1
+            for _ in batch:
+                q.task_done()
+
+def _create_log_pipeline():
+    formatter = JsonFormatter() if LOG_JSON else TextFormatter(LOG_FORMAT)
+    
+    # Handler para console
+    console_handler = BatchStreamHandler(sys.stdout)
+    console_handler.setFormatter(formatter)
+    
+    # Handler para arquivo com rotação
+    file_handler = BatchRotatingFileHandler(
+        LOG_FILE, maxBytes=LOG_MAX_SIZE, backupCount=LOG_BACKUP_COUNT
+    )
+    file_handler.setFormatter(formatter)
+    
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    listener = BatchingQueueListener(log_queue, console_handler, file_handler)
+    listener.start()
+    # Esvaziar a fila ao encerrar o processo
+    atexit.register(listener.stop)
+    return BoundedQueueHandler(log_queue), listener
+
+# Todos os loggers compartilham a mesma fila e a mesma thread de escrita
+queue_handler, queue_listener = _create_log_pipeline()
+
 # Configurar o logger
 def get_logger(name):
     logger = logging.getLogger(name)
@@ -26,73 +259,116 @@ def get_logger(name):
     
     # Evitar duplicação de handlers
     if not logger.handlers:
-        # Handler para console
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
-        logger.addHandler(console_handler)
-        
-        # Handler para arquivo com rotação
-        file_handler = RotatingFileHandler(
-            LOG_FILE, maxBytes=LOG_MAX_SIZE, backupCount=LOG_BACKUP_COUNT
-        )
-        file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
-        logger.addHandler(file_handler)
+        logger.addHandler(queue_handler)
     
     return logger
 
+def get_logging_stats():
+    """
+    Retorna os contadores da fila de logs (registros enfileirados, descartados e
+    que precisaram esperar por espaço) e a ocupação atual da fila.
+    """
+    with queue_handler._lock:
+        stats = dict(queue_handler.stats)
+    return {
+        **stats,
+        "queue_size": queue_handler.queue.qsize(),
+        "queue_capacity": LOG_QUEUE_SIZE,
+        "policy": queue_handler.policy,
+        "batches": queue_listener.batches,
+    }
+
 # Logger principal da aplicação
 app_logger = get_logger("codespark.app")
 
+def sample_rate(path: str) -> float:
+    """
+    Taxa de amostragem da rota: a do prefixo mais longo em LOG_ROUTE_SAMPLE_RATES
+    que corresponde ao caminho, ou LOG_SAMPLE_RATE.
+    """
+    for prefix, rate in LOG_ROUTE_SAMPLE_RATES:
+        if path.startswith(prefix):
+            return rate
+    return LOG_SAMPLE_RATE
+
+def filter_headers(raw_headers):
+    """
+    Converte apenas os cabeçalhos permitidos (lista de tuplas de bytes do ASGI) em
+    um dicionário, ocultando os sensíveis e truncando valores longos.
+    """
+    headers = {}
+    for key, value in raw_headers:
+        name = key.decode("latin-1").lower()
+        if name not in LOG_HEADER_ALLOWLIST:
+            continue
+        if name in LOG_REDACTED_HEADERS:
+            headers[name] = "[REDACTED]"
+        else:
+            headers[name] = value[:LOG_MAX_HEADER_LENGTH].decode("latin-1")
+    return headers
+
+def incoming_request_id(scope):
+    """
+    Retorna o `X-Request-ID` enviado pelo cliente, se presente e de tamanho razoável.
+    """
+    for key, value in scope.get("headers", []):
+        if key == REQUEST_ID_HEADER:
+            if 0 < len(value) <= REQUEST_ID_MAX_LENGTH and value.isascii() and value.decode("ascii").isprintable():
+                return value.decode("ascii")
+            return None
+    return None
+
 # Classe para registrar logs de requisições e respostas
 class RequestResponseLoggingMiddleware:
+    """
+    Registra requisições e respostas HTTP com amostragem por rota, exclusão de
+    caminhos (ex: health checks) e apenas os cabeçalhos permitidos. Toda resposta
+    recebe o cabeçalho `X-Request-ID`, reaproveitando o enviado pelo cliente quando válido.
+    Respostas 5xx e exceções são sempre registradas, independentemente da amostragem.
+    """
     def __init__(self, app):
         self.app = app
         
     async def __call__(self, scope, receive, send):
         if scope["type"] != "http":
             return await self.app(scope, receive, send)
-            
+        
+        path = scope.get("path", "")
+        method = scope.get("method", "")
+        excluded = path.startswith(LOG_EXCLUDED_PATHS)
+        sampled = not excluded and random.random() < sample_rate(path)
+        
         # Criar um contexto de requisição
-        request_id = None
-        start_time = datetime.now()
+        request_id = incoming_request_id(scope) or uuid.uuid4().hex
+        request_id_header = (REQUEST_ID_HEADER, request_id.encode("latin-1"))
+        start_time = time.perf_counter()
         
         # Função para interceptar a resposta
         async def send_wrapper(message):
             if message["type"] == "http.response.start":
-                # Log da resposta
-                process_time = (datetime.now() - start_time).total_seconds()
+                message["headers"] = [*message.get("headers", []), request_id_header]
+                status_code = message["status"]
                 
-                # Converter headers se existirem
-                response_headers = {}
-                if "headers" in message:
-                    for key, value in message["headers"]:
-                        response_headers[key.decode("utf-8")] = value.decode("utf-8")
-                
-                response_info = {
-                    "request_id": request_id,
-                    "status_code": message["status"],
-                    "process_time_seconds": process_time,
-                    "headers": response_headers,
-                }
-                
-                app_logger.info(f"Response sent: {json.dumps(response_info)}")
+                # Log da resposta
+                if sampled or (status_code >= 500 and not excluded):
+                    response_info = {
+                        "request_id": request_id,
+                        "method": method,
+                        "path": path,
+                        "status_code": status_code,
+                        "process_time_seconds": round(time.perf_counter() - start_time, 6),
+                        "headers": filter_headers(message["headers"]),
+                    }
+                    app_logger.info("Response sent", extra={"data": response_info})
                 
             await send(message)
         
+        # Disponibilizar o ID para todos os registros feitos durante a requisição
+        request_id_token = request_id_var.set(request_id)
+        
         # Log da requisição
-        if scope["type"] == "http":
-            path = scope.get("path", "")
-            method = scope.get("method", "")
-            
-            # Converter headers de lista de tuplas (bytes, bytes) para dicionário de strings
-            raw_headers = scope.get("headers", [])
-            headers = {}
-            for key, value in raw_headers:
-                headers[key.decode("utf-8")] = value.decode("utf-8")
-                
-            client = scope.get("client", ("unknown", 0))
-            
-            request_id = str(datetime.now().timestamp())
+        if sampled:
+            client = scope.get("client") or ("unknown", 0)
             
             # Preparar informações da requisição para logging
             request_info = {
@@ -100,10 +376,10 @@ class RequestResponseLoggingMiddleware:
                 "method": method,
                 "path": path,
                 "client_ip": f"{client[0]}:{client[1]}",
-                "headers": headers,
+                "headers": filter_headers(scope.get("headers", [])),
             }
             
-            app_logger.info(f"Request received: {json.dumps(request_info)}")
+            app_logger.info("Request received", extra={"data": request_info})
         
         # Processar a requisição
         try:
@@ -112,12 +388,18 @@ class RequestResponseLoggingMiddleware:
             # Log de erro
             error_info = {
                 "request_id": request_id,
-                "path": scope.get("path", ""),
+                "method": method,
+                "path": path,
                 "error": str(e),
-                "traceback": traceback.format_exc(),
+                "process_time_seconds": round(time.perf_counter() - start_time, 6),
             }
-            app_logger.error(f"Request failed: {json.dumps(error_info)}")
+            app_logger.error("Request failed", exc_info=True, extra={"data": error_info})
             raise
+        finally:
+            request_id_var.reset(request_id_token)
+
+# Logger de eventos, resolvido uma única vez
+event_logger = get_logger("codespark.events")
 
 # Função para registrar logs de eventos específicos
 def log_event(event_type, data, level="INFO"):
@@ -131,13 +413,5 @@ def log_event(event_type, data, level="INFO"):
     """
     log_level = getattr(logging, level.upper(), logging.INFO)
     
-    event_data = {
-        "timestamp": datetime.now().isoformat(),
-        "event_type": event_type,
-        "data": data
-    }
-    
-    event_logger = get_logger("codespark.events")
-    event_logger.log(log_level, json.dumps(event_data))
-    
-    return event_data 
\ No newline at end of file
+    # Os dados seguem estruturados no registro e são serializados uma única vez pelo formatter
+    event_logger.log(log_level, event_type, extra={"event_type": event_type, "data": data}) 
\ No newline at end of file
@@ -1,10 +1,14 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, HTTPException, status, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 import httpx
 import os
+import asyncio
+import json
+import hashlib
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from sqlalchemy.orm import Session
 
 # Caminho do projeto raiz
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -14,21 +18,61 @@ ENV_PATH = os.path.join(PROJECT_ROOT, '.env')
 load_dotenv(dotenv_path=ENV_PATH)
 
 # Importar dependência do cliente do banco de dados
-from db_client import get_db, engine, Base
+from db_client import engine, async_engine, Base, get_pool_stats, UnitOfWorkMiddleware
 import schemas
 from routers import users, projects, tasks
-from logger import get_logger, RequestResponseLoggingMiddleware, log_event
+from logger import get_logger, get_logging_stats, RequestResponseLoggingMiddleware, log_event
 from models import User, Project, Task  # Importar modelos SQLAlchemy
+from codespark_common.single_flight import SingleFlight
+from jobs import JobQueue, JobQueueFull, CallbackNotAllowed, create_job_store
+from crewai_client import CrewAIClient, CircuitOpenError
+from password_hasher import password_hasher
+from codespark_common.metrics import registry, MetricsMiddleware, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from codespark_common.tracing import init_tracing, shutdown_tracing, TracingMiddleware
+from xata_client import init_xata_client, close_xata_client, init_async_xata_client, close_async_xata_client, check_xata_health, get_xata_stats
 
 # Criar logger para aplicação principal
 logger = get_logger(__name__)
 
+# Agrupamento de solicitações idênticas simultâneas ao serviço CrewAI
+proposal_flight = SingleFlight()
+
 # Inicializar banco de dados
 Base.metadata.create_all(bind=engine)
 
+# Cliente HTTP compartilhado com o serviço CrewAI
+crewai_client = CrewAIClient()
+
+# Fila de jobs assíncronos de geração de projetos
+generation_jobs: Optional[JobQueue] = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global generation_jobs
+    init_tracing("codespark-backend")
+    init_xata_client()
+    await init_async_xata_client()
+    await crewai_client.start()
+    password_hasher.start()
+    generation_jobs = JobQueue(create_job_store(), generate_proposal)
+    generation_jobs.start()
+    yield
+    await generation_jobs.stop()
+    await crewai_client.close()
+    # Aguardar os processos do pool fora do event loop
+    await asyncio.to_thread(password_hasher.shutdown)
+    await close_async_xata_client()
+    close_xata_client()
+    await async_engine.dispose()
+    shutdown_tracing()
+
 # Criar aplicação FastAPI
 app = FastAPI(title="CodeSpark API", 
-              description="API para o CodeSpark, uma plataforma de desenvolvimento de projetos guiada por IA")
+              description="API para o CodeSpark, uma plataforma de desenvolvimento de projetos guiada por IA",
+              lifespan=lifespan)
+
+# Unidade de trabalho: um commit por solicitação, antes do envio da resposta (mais interno)
+app.add_middleware(UnitOfWorkMiddleware)
 
 # Configuração de CORS
 app.add_middleware(
@@ -37,11 +81,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
 
 # Adicionar middleware de logging
 app.add_middleware(RequestResponseLoggingMiddleware)
 
+# Adicionar middleware de métricas (mais externo, para medir também o logging)
+app.add_middleware(MetricsMiddleware)
+
+# Adicionar middleware de rastreamento (ativo apenas com TRACING_ENABLED=true)
+app.add_middleware(TracingMiddleware)
+
 # Incluir routers
 app.include_router(users.router, prefix="/api/users", tags=["Usuários"])
 app.include_router(projects.router, prefix="/api/projects", tags=["Projetos"])
@@ -57,11 +108,193 @@ def health_check():
     logger.info("Verificação de saúde realizada")
     return {"status": "healthy"}
 
+@app.get("/health/xata")
+async def xata_health_check(response: Response):
+    """
+    Verifica a conectividade com o Xata e retorna as métricas do cliente compartilhado.
+    """
+    health = await check_xata_health()
+    if not health["healthy"]:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {**health, "stats": get_xata_stats()}
+
+@app.get("/health/db")
+def db_pool_health():
+    """
+    Uso dos pools de conexões do PostgreSQL e tempo de espera no checkout.
+    """
+    return get_pool_stats()
+
+@app.get("/health/password-hasher")
+def password_hasher_stats():
+    """
+    Configuração e contadores do pool de processos de hash de senhas.
+    """
+    return password_hasher.get_stats()
+
+@app.get("/health/logging")
+def logging_stats():
+    """
+    Ocupação da fila de logs e registros descartados por falta de espaço.
+    """
+    return get_logging_stats()
+
+# Estatísticas já mantidas pelos componentes, expostas em /metrics no momento da coleta
+registry.register_stats("codespark_db_pool", get_pool_stats, "Pools de conexões do PostgreSQL", label="pool")
+registry.register_stats("codespark_xata", get_xata_stats, "Cliente compartilhado do Xata")
+registry.register_stats("codespark_crewai_client", crewai_client.get_stats, "Cliente HTTP do serviço CrewAI e circuit breaker")
+registry.register_stats("codespark_single_flight", proposal_flight.get_stats, "Agrupamento de solicitações de propostas")
+registry.register_stats("codespark_password_hasher", password_hasher.get_stats, "Pool de processos de hash de senhas")
+registry.register_stats("codespark_logging", get_logging_stats, "Fila de logs")
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """
+    Métricas no formato de texto do Prometheus.
+    """
+    return Response(registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+def proposal_request_key(request: schemas.ProjectRequest) -> str:
+    """
+    Gera uma chave normalizada para a solicitação, independente da ordem
+    e da capitalização das tecnologias.
+    """
+    normalized = {
+        "project_type": request.project_type.value,
+        "technologies": sorted({tech.strip().lower() for tech in request.technologies if tech.strip()}),
+        "additional_info": " ".join((request.additional_info or "").split()).lower(),
+        "bypass_cache": request.bypass_cache,
+    }
+    payload = json.dumps(normalized, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def crewai_payload(request: schemas.ProjectRequest) -> dict:
+    return {
+        "project_type": request.project_type.value,
+        "technologies": request.technologies,
+        "additional_info": request.additional_info,
+        "bypass_cache": request.bypass_cache
+    }
+
+async def request_project_proposal(request: schemas.ProjectRequest) -> dict:
+    """
+    Solicita uma proposta de projeto ao serviço CrewAI.
+    """
+    logger.debug("Enviando solicitação para o serviço CrewAI")
+    response = await crewai_client.post("/generate", crewai_payload(request))
+    
+    if response.status_code in (status.HTTP_429_TOO_MANY_REQUESTS, status.HTTP_503_SERVICE_UNAVAILABLE):
+        logger.error(f"Serviço CrewAI sobrecarregado: {response.status_code} - {response.text}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Serviço de geração de projetos sobrecarregado, tente novamente em instantes",
+            headers={"Retry-After": response.headers.get("Retry-After", "10")}
+        )
+    if response.status_code == status.HTTP_504_GATEWAY_TIMEOUT:
+        logger.error(f"Geração de projeto excedeu o prazo do serviço CrewAI: {response.text}")
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="A geração da proposta de projeto excedeu o tempo limite"
+        )
+    if response.status_code != 200:
+        logger.error(f"Erro ao gerar proposta de projeto: {response.status_code} - {response.text}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erro ao gerar proposta de projeto"
+        )
+    
+    return response.json()
+
+async def generate_proposal(request: schemas.ProjectRequest) -> dict:
+    """
+    Gera uma proposta via serviço CrewAI. Solicitações idênticas simultâneas
+    compartilham uma única chamada ao serviço.
+    """
+    result = await proposal_flight.do(
+        proposal_request_key(request),
+        lambda: request_project_proposal(request)
+    )
+    return {**result, "technologies": request.technologies}
+
+@app.post("/api/generate-project/stream")
+async def generate_project_stream(request: schemas.ProjectRequest):
+    """
+    Gera uma proposta de projeto transmitindo o progresso via Server-Sent Events.
+    Os eventos do serviço CrewAI são repassados ao cliente à medida que chegam.
+    """
+    logger.info(f"Solicitação de geração de projeto (streaming) recebida: {request.dict()}")
+    
+    async def proxy_events():
+        try:
+            async with crewai_client.stream("/generate/stream", crewai_payload(request)) as response:
+                if response.status_code != 200:
+                    body = await response.aread()
+                    logger.error(f"Erro ao gerar proposta de projeto: {response.status_code} - {body.decode('utf-8', 'replace')}")
+                    yield f"event: error\ndata: {json.dumps({'detail': 'Erro ao gerar proposta de projeto'})}\n\n"
+                    return
+                async for chunk in response.aiter_raw():
+                    yield chunk
+        except CircuitOpenError as e:
+            logger.warning(f"Geração de projeto (streaming) rejeitada: {str(e)}")
+            yield f"event: error\ndata: {json.dumps({'detail': str(e), 'retry_after': round(e.retry_after)})}\n\n"
+        except httpx.HTTPError as e:
+            logger.exception(f"Exceção ao comunicar com o serviço CrewAI: {str(e)}")
+            yield f"event: error\ndata: {json.dumps({'detail': f'Erro ao comunicar com o serviço CrewAI: {str(e)}'})}\n\n"
+    
+    return StreamingResponse(
+        proxy_events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/api/generate-project/stats")
+def generate_project_stats():
+    return {
+        "single_flight": proposal_flight.get_stats(),
+        "crewai_client": crewai_client.get_stats(),
+        "jobs_queued": generation_jobs.qsize() if generation_jobs else 0,
+    }
+
+@app.post("/api/generate-project/jobs", response_model=schemas.ProjectJob, status_code=status.HTTP_202_ACCEPTED)
+async def create_generation_job(request: schemas.ProjectJobRequest, response: Response):
+    """
+    Enfileira a geração de uma proposta de projeto e retorna imediatamente o job criado.
+    O resultado pode ser consultado em `GET /api/generate-project/jobs/{job_id}` ou
+    recebido via POST na `callback_url` informada.
+    """
+    project_request = schemas.ProjectRequest(**request.dict(exclude={"callback_url"}))
+    callback_url = str(request.callback_url) if request.callback_url else None
+    try:
+        job = await generation_jobs.submit(project_request, callback_url=callback_url)
+    except CallbackNotAllowed as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except JobQueueFull as e:
+        logger.warning(f"Job de geração rejeitado: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "30"}
+        )
+    
+    log_event("project_generation_job_created", {"job_id": job["id"], "project_type": request.project_type.value})
+    response.headers["Location"] = f"/api/generate-project/jobs/{job['id']}"
+    return job
+
+@app.get("/api/generate-project/jobs/{job_id}", response_model=schemas.ProjectJob)
+async def read_generation_job(job_id: str):
+    job = await generation_jobs.get(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job não encontrado"
+        )
+    return job
+
 @app.post("/api/generate-project", response_model=schemas.ProjectProposal)
-async def generate_project(
-    request: schemas.ProjectRequest,
-    db: Session = Depends(get_db)
-):
+async def generate_project(request: schemas.ProjectRequest):
     """
     Gera uma proposta de projeto baseada nas tecnologias e tipo de projeto solicitados.
     Utiliza o serviço CrewAI para criar uma proposta detalhada.
@@ -70,28 +303,26 @@ async def generate_project(
         logger.info(f"Solicitação de geração de projeto recebida: {request.dict()}")
         
         # Chamada para o serviço CrewAI
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            logger.debug(f"Enviando solicitação para o serviço CrewAI")
-            response = await client.post(
-                "http://crewai:8001/generate",
-                json={
-                    "project_type": request.project_type.value,
-                    "technologies": request.technologies,
-                    "additional_info": request.additional_info
-                }
-            )
-            
-            if response.status_code != 200:
-                logger.error(f"Erro ao gerar proposta de projeto: {response.status_code} - {response.text}")
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Erro ao gerar proposta de projeto"
-                )
-            
-            result = response.json()
-            log_event("project_proposal_generated", {"project_type": request.project_type.value, "technologies": request.technologies})
-            logger.info(f"Proposta de projeto gerada com sucesso: {result.get('title')}")
-            return result
+        result = await generate_proposal(request)
+        
+        log_event("project_proposal_generated", {"project_type": request.project_type.value, "technologies": request.technologies})
+        logger.info(f"Proposta de projeto gerada com sucesso: {result.get('title')}")
+        return result
+    except CircuitOpenError as e:
+        logger.warning(f"Geração de projeto rejeitada: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(max(1, round(e.retry_after)))}
+        )
+    except httpx.ReadTimeout:
+        logger.error("Serviço CrewAI não respondeu dentro do tempo limite")
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="A geração da proposta de projeto excedeu o tempo limite"
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception(f"Exceção ao comunicar com o serviço CrewAI: {str(e)}")
         raise HTTPException(
@@ -0,0 +1,28 @@
+"""Índices da paginação por cursor
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_users_created_at_id', 'users', ['created_at', 'id'], if_not_exists=True)
+    op.create_index('idx_projects_created_at_id', 'projects', ['created_at', 'id'], if_not_exists=True)
+    op.create_index('idx_tasks_created_at_id', 'tasks', ['created_at', 'id'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_tasks_created_at_id', table_name='tasks')
+    op.drop_index('idx_projects_created_at_id', table_name='projects')
+    op.drop_index('idx_users_created_at_id', table_name='users')
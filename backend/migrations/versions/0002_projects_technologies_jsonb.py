@@ -0,0 +1,48 @@
+"""Tecnologias dos projetos em JSONB com índice GIN
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.alter_column(
+        'projects',
+        'technologies',
+        type_=postgresql.JSONB(),
+        postgresql_using='technologies::jsonb',
+        server_default=sa.text("'[]'::jsonb"),
+        existing_nullable=False,
+    )
+    op.create_index(
+        'idx_projects_technologies',
+        'projects',
+        ['technologies'],
+        postgresql_using='gin',
+        postgresql_ops={'technologies': 'jsonb_path_ops'},
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_projects_technologies', table_name='projects')
+    op.alter_column(
+        'projects',
+        'technologies',
+        type_=sa.Text(),
+        postgresql_using='technologies::text',
+        server_default=None,
+        existing_nullable=False,
+    )
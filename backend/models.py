@@ -1,8 +1,8 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, DateTime, Enum, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 import enum
 from datetime import datetime
-import json
 from db_client import Base
 
 # Enums para compatibilidade com SQLAlchemy
@@ -19,6 +19,10 @@ class TaskStatus(enum.Enum):
 # Modelo de Usuário
 class User(Base):
     __tablename__ = "users"
+    # Índice da paginação por cursor (keyset em created_at, id)
+    __table_args__ = (Index("idx_users_created_at_id", "created_at", "id"),)
+    # Valores padrão gerados pelo banco retornados no próprio INSERT (RETURNING), sem refresh
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String(255), unique=True, index=True, nullable=False)
@@ -33,12 +37,23 @@ class User(Base):
 # Modelo de Projeto
 class Project(Base):
     __tablename__ = "projects"
+    __table_args__ = (
+        Index("idx_projects_created_at_id", "created_at", "id"),
+        # Índice GIN para buscas de tecnologias por contenção (@>)
+        Index(
+            "idx_projects_technologies",
+            "technologies",
+            postgresql_using="gin",
+            postgresql_ops={"technologies": "jsonb_path_ops"},
+        ),
+    )
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=False)
     project_type = Column(Enum(ProjectType), nullable=False)
-    technologies = Column(Text, nullable=False)  # Armazenado como JSON
+    technologies = Column(JSONB, nullable=False, default=list)  # Lista de tecnologias
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -47,18 +62,21 @@ class Project(Base):
     owner = relationship("User", back_populates="projects")
     tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan")
 
-    # Método para serializar/deserializar a lista de tecnologias
+    # Mantido por compatibilidade: a coluna JSONB já armazena a lista nativamente
     @property
     def technologies_list(self):
-        return json.loads(self.technologies)
+        return self.technologies
 
     @technologies_list.setter
     def technologies_list(self, value):
-        self.technologies = json.dumps(value)
+        self.technologies = list(value)
 
 # Modelo de Tarefa
 class Task(Base):
     __tablename__ = "tasks"
+    # Índice da paginação por cursor (keyset em created_at, id)
+    __table_args__ = (Index("idx_tasks_created_at_id", "created_at", "id"),)
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
@@ -0,0 +1,128 @@
+import os
+import asyncio
+import secrets
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# Configurações do hash de senhas
+# BCRYPT_ROUNDS: fator de custo; hashes com outro custo são refeitos no próximo login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+PASSWORD_HASH_MAX_CONCURRENCY = int(os.getenv("PASSWORD_HASH_MAX_CONCURRENCY", str(PASSWORD_HASH_WORKERS * 4)))
+PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", "5"))
+
+# Contexto usado nos processos do pool; min/max iguais ao custo configurado fazem
+# qualquer hash com outro custo ser marcado para atualização
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+def verify_password(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifica a senha e, se o hash usar outro custo, retorna também um novo hash.
+
+    Returns:
+        Tupla (senha válida, novo hash ou None)
+    """
+    return pwd_context.verify_and_update(password, hashed_password)
+
+class PasswordHasherBusy(Exception):
+    """Lançada quando o pool de hash está saturado por mais tempo que o permitido."""
+
+class PasswordHasher:
+    """
+    Executa hash e verificação de senhas bcrypt em um pool de processos dedicado,
+    fora do event loop e do threadpool das rotas, limitando as operações simultâneas.
+
+    Args:
+        workers: Quantidade de processos do pool
+        max_concurrency: Operações admitidas simultaneamente (em execução ou na fila do pool)
+        queue_timeout: Tempo máximo de espera por uma vaga antes de rejeitar a operação
+    """
+    def __init__(
+        self,
+        workers: int = PASSWORD_HASH_WORKERS,
+        max_concurrency: int = PASSWORD_HASH_MAX_CONCURRENCY,
+        queue_timeout: float = PASSWORD_HASH_QUEUE_TIMEOUT,
+    ):
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._dummy_hash: Optional[Future] = None
+        self.stats = {"hashes": 0, "verifications": 0, "rehashes": 0, "rejected": 0}
+
+    def start(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            # Hash fictício com o custo configurado, calculado em segundo plano (ver verify_dummy)
+            self._dummy_hash = self._pool.submit(hash_password, secrets.token_urlsafe(16))
+            logger.info(f"Pool de hash de senhas iniciado com {self.workers} processos (custo bcrypt {BCRYPT_ROUNDS})")
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    async def _run(self, fn, *args):
+        self.start()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.stats["rejected"] += 1
+            raise PasswordHasherBusy("Muitas operações de senha simultâneas, tente novamente em instantes")
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+        finally:
+            self._semaphore.release()
+
+    async def hash(self, password: str) -> str:
+        self.stats["hashes"] += 1
+        return await self._run(hash_password, password)
+
+    async def verify(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verifica a senha; quando o custo configurado mudou, retorna o hash refeito
+        para ser persistido no lugar do antigo.
+        """
+        self.stats["verifications"] += 1
+        valid, new_hash = await self._run(verify_password, password, hashed_password)
+        if new_hash:
+            self.stats["rehashes"] += 1
+        return valid, new_hash
+
+    async def verify_dummy(self, password: str):
+        """
+        Verifica a senha contra um hash fictício, para logins com e-mail não cadastrado:
+        a resposta leva o mesmo tempo de uma senha incorreta e não revela quais
+        e-mails existem.
+        """
+        self.start()
+        self.stats["verifications"] += 1
+        dummy_hash = await asyncio.wrap_future(self._dummy_hash)
+        await self._run(verify_password, password, dummy_hash)
+
+    def get_stats(self):
+        return {
+            **self.stats,
+            "workers": self.workers,
+            "max_concurrency": self.max_concurrency,
+            "rounds": BCRYPT_ROUNDS,
+        }
+
+password_hasher = PasswordHasher()
@@ -1,39 +1,84 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select, insert, update, tuple_, or_
+from sqlalchemy.orm import Session, selectinload, joinedload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 import logging
 from models import User, Project, Task, ProjectType, TaskStatus
 import json
+import base64
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Sequence, Tuple
 
 # Configurar o logger
 logger = logging.getLogger(__name__)
 
-# Base Repository para operações CRUD genéricas
+class InvalidCursor(ValueError):
+    """Lançada quando o cursor de paginação informado não pode ser decodificado."""
+
+def encode_cursor(item) -> str:
+    """
+    Cursor opaco com a chave (created_at, id) do último item de uma página.
+    """
+    payload = json.dumps([item.created_at.isoformat(), item.id])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Cursor de paginação inválido") from e
+
+# Base Repository para operações CRUD genéricas.
+# Unidade de trabalho: os métodos apenas enviam as alterações (flush); o commit é feito
+# uma única vez por quem controla a sessão (o UnitOfWorkMiddleware, ao fim de uma solicitação
+# que usa get_db, ou o escopo de get_db_session). Assim, operações compostas são atômicas.
 class BaseRepository:
     def __init__(self, db: Session, model):
         self.db = db
         self.model = model
 
-    def get_by_id(self, id: int):
-        return self.db.query(self.model).filter(self.model.id == id).first()
+    # Os métodos de consulta aceitam `options` com estratégias de carregamento
+    # (ex: selectinload(Project.tasks)), evitando consultas N+1 ao acessar relacionamentos
+    def get_by_id(self, id: int, options: Sequence = ()):
+        if not options:
+            # Session.get consulta primeiro o mapa de identidade da unidade de trabalho
+            return self.db.get(self.model, id)
+        # A consulta recarrega os objetos já presentes no mapa de identidade: enviar antes
+        # as alterações pendentes (autoflush desativado) para que não sejam descartadas
+        self.db.flush()
+        return self.db.execute(get_by_id_query(self.model, id, options)).unique().scalar_one_or_none()
+    
+    def list_all(self, skip: int = 0, limit: Optional[int] = None, options: Sequence = ()):
+        # Paginação por offset (modo legado): prefira list_page para páginas profundas
+        return self.db.query(self.model).options(*options).order_by(self.model.id).offset(skip).limit(limit).all()
     
-    def list_all(self):
-        return self.db.query(self.model).all()
+    def list_page(self, limit: int = 100, cursor: Optional[str] = None, options: Sequence = ()):
+        """
+        Lista uma página ordenada por (created_at, id) a partir do cursor informado.
+        O custo independe da profundidade da página e o resultado é estável sob inserções.
+        
+        Returns:
+            Tupla (itens, cursor da próxima página ou None)
+        """
+        query = keyset_query(self.model, cursor).options(*options).limit(limit + 1)
+        items = self.db.execute(query).scalars().all()
+        return page_result(items, limit)
     
-    def create(self, data: Dict[str, Any]):
+    def create(self, data: Dict[str, Any], refresh: bool = False):
         try:
             db_item = self.model(**data)
             self.db.add(db_item)
-            self.db.commit()
-            self.db.refresh(db_item)
+            self.db.flush()
+            if refresh:
+                self.db.refresh(db_item)
             return db_item
         except SQLAlchemyError as e:
-            self.db.rollback()
             logger.error(f"Erro ao criar {self.model.__name__}: {str(e)}")
             raise
     
-    def update(self, id: int, data: Dict[str, Any]):
+    def update(self, id: int, data: Dict[str, Any], refresh: bool = False):
         try:
             db_item = self.get_by_id(id)
             if not db_item:
@@ -42,11 +87,11 @@ class BaseRepository:
             for key, value in data.items():
                 setattr(db_item, key, value)
             
-            self.db.commit()
-            self.db.refresh(db_item)
+            self.db.flush()
+            if refresh:
+                self.db.refresh(db_item)
             return db_item
         except SQLAlchemyError as e:
-            self.db.rollback()
             logger.error(f"Erro ao atualizar {self.model.__name__}: {str(e)}")
             raise
     
@@ -57,12 +102,39 @@ class BaseRepository:
                 return False
             
             self.db.delete(db_item)
-            self.db.commit()
+            self.db.flush()
             return True
         except SQLAlchemyError as e:
-            self.db.rollback()
             logger.error(f"Erro ao excluir {self.model.__name__}: {str(e)}")
             raise
+    
+    def bulk_create(self, rows: List[Dict[str, Any]]):
+        """
+        Insere vários registros com um único INSERT ... RETURNING em lote, em vez de
+        um add/flush por registro.
+        """
+        if not rows:
+            return []
+        try:
+            items = self.db.scalars(insert(self.model).returning(self.model), rows).all()
+            return items
+        except SQLAlchemyError as e:
+            logger.error(f"Erro ao criar {self.model.__name__} em lote: {str(e)}")
+            raise
+    
+    def bulk_update(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Atualiza vários registros (cada dicionário contém o `id` e os campos alterados)
+        via executemany.
+        """
+        if not rows:
+            return 0
+        try:
+            self.db.execute(update(self.model), rows)
+            return len(rows)
+        except SQLAlchemyError as e:
+            logger.error(f"Erro ao atualizar {self.model.__name__} em lote: {str(e)}")
+            raise
 
 # Repositório específico para usuários
 class UserRepository(BaseRepository):
@@ -73,40 +145,81 @@ class UserRepository(BaseRepository):
         return self.db.query(User).filter(User.email == email).first()
     
     def get_with_projects(self, user_id: int):
-        return self.db.query(User).filter(User.id == user_id).first()
+        return self.get_by_id(user_id, options=(selectinload(User.projects),))
 
 # Repositório específico para projetos
 class ProjectRepository(BaseRepository):
     def __init__(self, db: Session):
         super().__init__(db, Project)
     
-    def get_by_owner(self, owner_id: int):
-        return self.db.query(Project).filter(Project.owner_id == owner_id).all()
+    def get_by_owner(self, owner_id: int, options: Sequence = ()):
+        return self.db.query(Project).options(*options).filter(Project.owner_id == owner_id).all()
+    
+    def get_by_owner_with_tasks(self, owner_id: int):
+        # Uma consulta para os projetos e uma para as tarefas de todos eles
+        return self.get_by_owner(owner_id, options=(selectinload(Project.tasks),))
     
     def get_with_tasks(self, project_id: int):
-        return self.db.query(Project).filter(Project.id == project_id).first()
+        return self.get_by_id(project_id, options=(selectinload(Project.tasks),))
     
-    def create(self, data: Dict[str, Any]):
-        # Processar a lista de tecnologias
+    def find_by_technologies(self, technologies: List[str], match_all: bool = True, limit: int = 100, cursor: Optional[str] = None):
+        """
+        Lista projetos que usam as tecnologias informadas (todas ou qualquer uma),
+        com consultas de contenção JSONB atendidas pelo índice GIN.
+        
+        Returns:
+            Tupla (projetos, cursor da próxima página ou None)
+        """
+        query = keyset_query(Project, cursor).where(technologies_filter(technologies, match_all)).limit(limit + 1)
+        return page_result(self.db.execute(query).scalars().all(), limit)
+    
+    def create(self, data: Dict[str, Any], refresh: bool = False):
+        # Aceitar a lista de tecnologias também pelo nome legado
+        if 'technologies_list' in data:
+            data['technologies'] = list(data.pop('technologies_list'))
+        return super().create(data, refresh)
+    
+    def update(self, id: int, data: Dict[str, Any], refresh: bool = False):
+        # Aceitar a lista de tecnologias também pelo nome legado
         if 'technologies_list' in data:
-            data['technologies'] = json.dumps(data.pop('technologies_list'))
-        return super().create(data)
+            data['technologies'] = list(data.pop('technologies_list'))
+        return super().update(id, data, refresh)
     
-    def update(self, id: int, data: Dict[str, Any]):
-        # Processar a lista de tecnologias
+    def create_with_tasks(self, data: Dict[str, Any], tasks: List[Dict[str, Any]]):
+        """
+        Cria um projeto e todas as suas tarefas com dois comandos: um INSERT ...
+        RETURNING para o projeto e um INSERT em lote para as tarefas.
+        
+        Returns:
+            O projeto criado, com `tasks` já carregado
+        """
         if 'technologies_list' in data:
-            data['technologies'] = json.dumps(data.pop('technologies_list'))
-        return super().update(id, data)
+            data['technologies'] = list(data.pop('technologies_list'))
+        try:
+            project = self.db.scalars(insert(Project).returning(Project), [data]).one()
+            created_tasks = []
+            if tasks:
+                rows = [{**task, "project_id": project.id} for task in tasks]
+                created_tasks = self.db.scalars(insert(Task).returning(Task), rows).all()
+            set_committed_value(project, "tasks", list(created_tasks))
+            return project
+        except SQLAlchemyError as e:
+            logger.error(f"Erro ao criar projeto com tarefas: {str(e)}")
+            raise
 
 # Repositório específico para tarefas
 class TaskRepository(BaseRepository):
     def __init__(self, db: Session):
         super().__init__(db, Task)
     
-    def get_by_project(self, project_id: int):
-        return self.db.query(Task).filter(Task.project_id == project_id).all()
+    def get_by_project(self, project_id: int, options: Sequence = ()):
+        return self.db.query(Task).options(*options).filter(Task.project_id == project_id).all()
+    
+    def get_with_project(self, task_id: int):
+        # Relacionamento muitos-para-um: um JOIN na mesma consulta
+        return self.get_by_id(task_id, options=(joinedload(Task.project),))
     
-    def complete_task(self, task_id: int):
+    def complete_task(self, task_id: int, refresh: bool = False):
         try:
             task = self.get_by_id(task_id)
             if not task:
@@ -115,10 +228,231 @@ class TaskRepository(BaseRepository):
             task.status = TaskStatus.COMPLETED
             task.completed_at = datetime.utcnow()
             
-            self.db.commit()
-            self.db.refresh(task)
+            self.db.flush()
+            if refresh:
+                self.db.refresh(task)
             return task
         except SQLAlchemyError as e:
-            self.db.rollback()
             logger.error(f"Erro ao completar tarefa: {str(e)}")
-            raise 
\ No newline at end of file
+            raise 
+
+def get_by_id_query(model, id: int, options: Sequence):
+    """
+    Consulta por id com estratégias de carregamento. Session.get ignora `options` quando
+    o objeto já está no mapa de identidade; `populate_existing` aplica as opções também
+    nesse caso, para que os relacionamentos sejam carregados na própria consulta.
+    
+    Como o objeto é sobrescrito com o estado do banco, a sessão deve receber um flush
+    antes da consulta (feito por `get_by_id`).
+    """
+    return select(model).where(model.id == id).options(*options).execution_options(populate_existing=True)
+
+def keyset_query(model, cursor: Optional[str] = None):
+    """
+    Consulta ordenada por (created_at, id), a partir da chave codificada no cursor.
+    """
+    query = select(model).order_by(model.created_at, model.id)
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        query = query.where(tuple_(model.created_at, model.id) > (created_at, id))
+    return query
+
+def technologies_filter(technologies: List[str], match_all: bool = True):
+    """
+    Filtro por tecnologias: `technologies @> '["a", "b"]'` para todas, ou um `@>` por
+    tecnologia combinados com OR para qualquer uma (ambos usam o índice jsonb_path_ops).
+    """
+    if match_all:
+        return Project.technologies.contains(list(technologies))
+    return or_(*[Project.technologies.contains([technology]) for technology in technologies])
+
+def page_result(items, limit: int):
+    if len(items) > limit:
+        return items[:limit], encode_cursor(items[limit - 1])
+    return items, None
+
+# Base Repository assíncrono, equivalente ao BaseRepository para sessões AsyncSession
+class AsyncBaseRepository:
+    def __init__(self, db: AsyncSession, model):
+        self.db = db
+        self.model = model
+
+    # Em sessões assíncronas o carregamento tardio não é permitido: relacionamentos
+    # acessados depois da consulta devem ser carregados via `options`
+    async def get_by_id(self, id: int, options: Sequence = ()):
+        if not options:
+            return await self.db.get(self.model, id)
+        await self.db.flush()
+        result = await self.db.execute(get_by_id_query(self.model, id, options))
+        return result.unique().scalar_one_or_none()
+    
+    async def list_all(self, skip: int = 0, limit: Optional[int] = None, options: Sequence = ()):
+        # Paginação por offset (modo legado): prefira list_page para páginas profundas
+        result = await self.db.execute(select(self.model).options(*options).order_by(self.model.id).offset(skip).limit(limit))
+        return result.scalars().all()
+    
+    async def list_page(self, limit: int = 100, cursor: Optional[str] = None, options: Sequence = ()):
+        """
+        Versão assíncrona de BaseRepository.list_page.
+        """
+        result = await self.db.execute(keyset_query(self.model, cursor).options(*options).limit(limit + 1))
+        return page_result(result.scalars().all(), limit)
+    
+    async def create(self, data: Dict[str, Any], refresh: bool = False):
+        try:
+            db_item = self.model(**data)
+            self.db.add(db_item)
+            await self.db.flush()
+            if refresh:
+                await self.db.refresh(db_item)
+            return db_item
+        except SQLAlchemyError as e:
+            logger.error(f"Erro ao criar {self.model.__name__}: {str(e)}")
+            raise
+    
+    async def update(self, id: int, data: Dict[str, Any], refresh: bool = False):
+        try:
+            db_item = await self.get_by_id(id)
+            if not db_item:
+                return None
+            
+            for key, value in data.items():
+                setattr(db_item, key, value)
+            
+            await self.db.flush()
+            if refresh:
+                await self.db.refresh(db_item)
+            return db_item
+        except SQLAlchemyError as e:
+            logger.error(f"Erro ao atualizar {self.model.__name__}: {str(e)}")
+            raise
+    
+    async def delete(self, id: int):
+        try:
+            db_item = await self.get_by_id(id)
+            if not db_item:
+                return False
+            
+            await self.db.delete(db_item)
+            await self.db.flush()
+            return True
+        except SQLAlchemyError as e:
+            logger.error(f"Erro ao excluir {self.model.__name__}: {str(e)}")
+            raise
+    
+    async def bulk_create(self, rows: List[Dict[str, Any]]):
+        if not rows:
+            return []
+        try:
+            result = await self.db.scalars(insert(self.model).returning(self.model), rows)
+            items = result.all()
+            return items
+        except SQLAlchemyError as e:
+            logger.error(f"Erro ao criar {self.model.__name__} em lote: {str(e)}")
+            raise
+    
+    async def bulk_update(self, rows: List[Dict[str, Any]]) -> int:
+        if not rows:
+            return 0
+        try:
+            await self.db.execute(update(self.model), rows)
+            return len(rows)
+        except SQLAlchemyError as e:
+            logger.error(f"Erro ao atualizar {self.model.__name__} em lote: {str(e)}")
+            raise
+
+# Repositório assíncrono para usuários
+class AsyncUserRepository(AsyncBaseRepository):
+    def __init__(self, db: AsyncSession):
+        super().__init__(db, User)
+    
+    async def get_by_email(self, email: str):
+        result = await self.db.execute(select(User).filter(User.email == email))
+        return result.scalars().first()
+    
+    async def get_with_projects(self, user_id: int):
+        return await self.get_by_id(user_id, options=(selectinload(User.projects),))
+
+# Repositório assíncrono para projetos
+class AsyncProjectRepository(AsyncBaseRepository):
+    def __init__(self, db: AsyncSession):
+        super().__init__(db, Project)
+    
+    async def get_by_owner(self, owner_id: int, options: Sequence = ()):
+        result = await self.db.execute(select(Project).options(*options).filter(Project.owner_id == owner_id))
+        return result.scalars().all()
+    
+    async def get_by_owner_with_tasks(self, owner_id: int):
+        return await self.get_by_owner(owner_id, options=(selectinload(Project.tasks),))
+    
+    async def get_with_tasks(self, project_id: int):
+        return await self.get_by_id(project_id, options=(selectinload(Project.tasks),))
+    
+    async def find_by_technologies(self, technologies: List[str], match_all: bool = True, limit: int = 100, cursor: Optional[str] = None):
+        """
+        Versão assíncrona de ProjectRepository.find_by_technologies.
+        """
+        query = keyset_query(Project, cursor).where(technologies_filter(technologies, match_all)).limit(limit + 1)
+        result = await self.db.execute(query)
+        return page_result(result.scalars().all(), limit)
+    
+    async def create(self, data: Dict[str, Any], refresh: bool = False):
+        # Aceitar a lista de tecnologias também pelo nome legado
+        if 'technologies_list' in data:
+            data['technologies'] = list(data.pop('technologies_list'))
+        return await super().create(data, refresh)
+    
+    async def update(self, id: int, data: Dict[str, Any], refresh: bool = False):
+        # Aceitar a lista de tecnologias também pelo nome legado
+        if 'technologies_list' in data:
+            data['technologies'] = list(data.pop('technologies_list'))
+        return await super().update(id, data, refresh)
+    
+    async def create_with_tasks(self, data: Dict[str, Any], tasks: List[Dict[str, Any]]):
+        """
+        Versão assíncrona de ProjectRepository.create_with_tasks.
+        """
+        if 'technologies_list' in data:
+            data['technologies'] = list(data.pop('technologies_list'))
+        try:
+            result = await self.db.scalars(insert(Project).returning(Project), [data])
+            project = result.one()
+            created_tasks = []
+            if tasks:
+                rows = [{**task, "project_id": project.id} for task in tasks]
+                result = await self.db.scalars(insert(Task).returning(Task), rows)
+                created_tasks = result.all()
+            set_committed_value(project, "tasks", list(created_tasks))
+            return project
+        except SQLAlchemyError as e:
+            logger.error(f"Erro ao criar projeto com tarefas: {str(e)}")
+            raise
+
+# Repositório assíncrono para tarefas
+class AsyncTaskRepository(AsyncBaseRepository):
+    def __init__(self, db: AsyncSession):
+        super().__init__(db, Task)
+    
+    async def get_by_project(self, project_id: int, options: Sequence = ()):
+        result = await self.db.execute(select(Task).options(*options).filter(Task.project_id == project_id))
+        return result.scalars().all()
+    
+    async def get_with_project(self, task_id: int):
+        return await self.get_by_id(task_id, options=(joinedload(Task.project),))
+    
+    async def complete_task(self, task_id: int, refresh: bool = False):
+        try:
+            task = await self.get_by_id(task_id)
+            if not task:
+                return None
+            
+            task.status = TaskStatus.COMPLETED
+            task.completed_at = datetime.utcnow()
+            
+            await self.db.flush()
+            if refresh:
+                await self.db.refresh(task)
+            return task
+        except SQLAlchemyError as e:
+            logger.error(f"Erro ao completar tarefa: {str(e)}")
+            raise
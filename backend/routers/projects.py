@@ -1,22 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
-from xata.client import XataClient
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List, Literal, Optional, Set
+from datetime import datetime
+import uuid
 
 import schemas
-from xata_client import get_db
+from xata_client import AsyncXataClient, get_async_db, page_params, next_page_cursor, reverse_link, link_id, record_exists
 
 router = APIRouter()
 
+def project_from_record(record) -> dict:
+    return {
+        "id": record["id"],
+        "title": record["title"],
+        "description": record["description"],
+        "projectType": record["projectType"],
+        "technologies": record["technologies"],
+        "ownerId": link_id(record["ownerId"]),
+        "isActive": record.get("isActive", True),
+        "createdAt": record["xata"]["createdAt"]
+    }
+
 @router.post("/", response_model=schemas.Project, status_code=status.HTTP_201_CREATED)
-def create_project(project: schemas.ProjectCreate, user_id: str, db: XataClient = Depends(get_db)):
-    # Verificar se o usuário existe
-    user_record = db.records().get("users", user_id)
-    if not user_record:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Usuário não encontrado"
-        )
-    
+async def create_project(project: schemas.ProjectCreate, user_id: str, db: AsyncXataClient = Depends(get_async_db)):
     # Criar o projeto com Xata
     project_data = {
         "title": project.title,
@@ -27,7 +32,20 @@ def create_project(project: schemas.ProjectCreate, user_id: str, db: XataClient
         "isActive": True
     }
     
-    result = db.records().insert("projects", project_data)
+    result = await db.records().insert("projects", project_data, columns=["*"])
+    
+    # O vínculo ownerId é validado pelo Xata na inserção; a existência do usuário
+    # só é consultada quando a inserção falha
+    if not result.is_success():
+        if not await record_exists(db, "users", user_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Usuário não encontrado"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erro ao criar projeto"
+        )
     
     # Adaptar o resultado para o formato esperado
     return {
@@ -36,61 +54,175 @@ def create_project(project: schemas.ProjectCreate, user_id: str, db: XataClient
         "description": result["description"],
         "projectType": result["projectType"],
         "technologies": result["technologies"],
-        "ownerId": result["ownerId"],
+        "ownerId": link_id(result["ownerId"]),
         "isActive": result["isActive"],
         "createdAt": result["xata"]["createdAt"]
     }
 
-@router.get("/", response_model=List[schemas.Project])
-def read_projects(skip: int = 0, limit: int = 100, db: XataClient = Depends(get_db)):
-    response = db.data().query("projects", {
-        "page": {
-            "size": limit,
-            "offset": skip
+@router.post("/with-tasks", response_model=schemas.ProjectWithTasks, status_code=status.HTTP_201_CREATED)
+async def create_project_with_tasks(project: schemas.ProjectCreateWithTasks, user_id: str, db: AsyncXataClient = Depends(get_async_db)):
+    """
+    Cria um projeto e todas as suas tarefas em uma única transação do Xata
+    (uma solicitação), por exemplo ao salvar uma proposta gerada.
+    """
+    # O ID do projeto é gerado aqui para que as tarefas possam referenciá-lo na mesma transação
+    project_id = f"rec_{uuid.uuid4().hex}"
+    project_data = {
+        "id": project_id,
+        "title": project.title,
+        "description": project.description,
+        "projectType": project.projectType.value,
+        "technologies": project.technologies,
+        "ownerId": user_id,
+        "isActive": True
+    }
+    tasks_data = [
+        {
+            "title": task.title,
+            "description": task.description,
+            "projectId": project_id,
+            "status": schemas.TaskStatus.PENDING.value
         }
-    })
+        for task in project.tasks
+    ]
     
-    projects = []
-    for record in response["records"]:
-        projects.append({
-            "id": record["id"],
-            "title": record["title"],
-            "description": record["description"],
-            "projectType": record["projectType"],
-            "technologies": record["technologies"],
-            "ownerId": record["ownerId"],
-            "isActive": record.get("isActive", True),
-            "createdAt": record["xata"]["createdAt"]
-        })
+    operations = [{"insert": {"table": "projects", "record": project_data, "createOnly": True, "columns": ["xata.createdAt"]}}]
+    operations += [{"insert": {"table": "tasks", "record": task_data, "columns": ["xata.createdAt"]}} for task_data in tasks_data]
+    response = await db.records().transaction(operations)
     
-    return projects
+    if not response.is_success():
+        if not await record_exists(db, "users", user_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Usuário não encontrado"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erro ao criar projeto"
+        )
+    
+    # Adaptar os resultados da transação (na ordem das operações) ao formato esperado
+    results = response.get("results", [])
+    created_at = [(result.get("columns") or {}).get("xata", {}).get("createdAt") or datetime.utcnow() for result in results]
+    tasks = [
+        {**task_data, "id": result["id"], "createdAt": task_created_at, "completedAt": None}
+        for task_data, result, task_created_at in zip(tasks_data, results[1:], created_at[1:])
+    ]
+    return {**project_data, "createdAt": created_at[0], "tasks": tasks}
 
-@router.get("/{project_id}", response_model=schemas.ProjectWithTasks)
-def read_project(project_id: str, db: XataClient = Depends(get_db)):
-    # Buscar projeto
-    project_record = db.records().get("projects", project_id)
+@router.get("/", response_model=List[schemas.Project])
+async def read_projects(skip: int = 0, limit: int = 100, db: AsyncXataClient = Depends(get_async_db)):
+    # Paginação por offset, mais lenta quanto mais profunda a página; `/page` pagina pelo cursor
+    response = await db.data().query("projects", {
+        "page": page_params(limit, skip=skip)
+    })
+    return [project_from_record(record) for record in response["records"]]
+
+@router.get("/page", response_model=schemas.ProjectPage)
+async def read_projects_page(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncXataClient = Depends(get_async_db)
+):
+    """
+    Lista projetos pelo cursor nativo do Xata: a próxima página é obtida enviando
+    o `next_cursor` da anterior, que é None na última página.
+    """
+    response = await db.data().query("projects", {
+        "page": page_params(limit, cursor)
+    })
+    if not response.is_success():
+        # O Xata rejeita cursores inválidos ou expirados
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginação inválido"
+        )
+    return {"items": [project_from_record(record) for record in response["records"]], "next_cursor": next_page_cursor(response)}
+
+def technology_tokens(technologies: str) -> Set[str]:
+    """
+    Tecnologias de um projeto, armazenadas no Xata como texto separado por vírgulas.
+    """
+    return {technology.strip().lower() for technology in technologies.split(",") if technology.strip()}
+
+@router.get("/search", response_model=schemas.ProjectPage)
+async def search_projects_by_technology(
+    technology: List[str] = Query(..., min_length=1),
+    match: Literal["all", "any"] = "all",
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncXataClient = Depends(get_async_db)
+):
+    """
+    Busca projetos que usam as tecnologias informadas (ex: `?technology=React&technology=Node`),
+    exigindo todas (`match=all`) ou qualquer uma (`match=any`).
     
-    if not project_record:
+    O Xata filtra por substring (`$iContains`, sem índice) e o resultado é refinado pelas
+    tecnologias exatas, descartando falsos positivos como "Java" em "JavaScript". Para que
+    a página tenha exatamente `limit` itens, as páginas seguintes do Xata são consultadas
+    apenas com o tamanho que falta, e o cursor devolvido continua exatamente após o último
+    registro examinado.
+    """
+    wanted = {value.strip().lower() for value in technology if value.strip()}
+    if not wanted:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Projeto não encontrado"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Informe ao menos uma tecnologia"
         )
     
-    # Buscar tarefas do projeto
-    tasks_response = db.data().query("tasks", {
+    conditions = [{"technologies": {"$iContains": value}} for value in sorted(wanted)]
+    items = []
+    next_cursor = cursor
+    while True:
+        response = await db.data().query("projects", {
+            "filter": {"$all" if match == "all" else "$any": conditions},
+            "page": page_params(limit - len(items), next_cursor)
+        })
+        if not response.is_success():
+            # O Xata rejeita cursores inválidos ou expirados
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor de paginação inválido"
+            )
+        
+        for record in response["records"]:
+            found = technology_tokens(record["technologies"]) & wanted
+            matched = found == wanted if match == "all" else bool(found)
+            if matched:
+                items.append(project_from_record(record))
+        next_cursor = next_page_cursor(response)
+        # Falsos positivos são raros, então quase sempre basta uma consulta
+        if len(items) == limit or next_cursor is None:
+            return {"items": items, "next_cursor": next_cursor}
+
+@router.get("/{project_id}", response_model=schemas.ProjectWithTasks)
+async def read_project(project_id: str, db: AsyncXataClient = Depends(get_async_db)):
+    # Buscar projeto e suas tarefas em uma única consulta
+    response = await db.data().query("projects", {
+        "columns": ["*", reverse_link("tasks", "projectId", "tasks")],
         "filter": {
-            "projectId": project_id
+            "id": project_id
+        },
+        "page": {
+            "size": 1
         }
     })
     
+    if not response.get("records"):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Projeto não encontrado"
+        )
+    project_record = response["records"][0]
+    
     tasks = []
-    for task in tasks_response.get("records", []):
+    for task in (project_record.get("tasks") or {}).get("records", []):
         tasks.append({
             "id": task["id"],
             "title": task["title"],
             "description": task["description"],
             "status": task["status"],
-            "projectId": task["projectId"],
+            "projectId": project_id,
             "createdAt": task["xata"]["createdAt"],
             "completedAt": task.get("completedAt")
         })
@@ -102,38 +234,40 @@ def read_project(project_id: str, db: XataClient = Depends(get_db)):
         "description": project_record["description"],
         "projectType": project_record["projectType"],
         "technologies": project_record["technologies"],
-        "ownerId": project_record["ownerId"],
+        "ownerId": link_id(project_record["ownerId"]),
         "isActive": project_record.get("isActive", True),
         "createdAt": project_record["xata"]["createdAt"],
         "tasks": tasks
     }
 
 @router.get("/user/{user_id}", response_model=List[schemas.Project])
-def read_user_projects(user_id: str, db: XataClient = Depends(get_db)):
-    # Verificar se o usuário existe
-    user_record = db.records().get("users", user_id)
-    if not user_record:
+async def read_user_projects(user_id: str, db: AsyncXataClient = Depends(get_async_db)):
+    # Buscar usuário e seus projetos em uma única consulta
+    response = await db.data().query("users", {
+        "columns": ["id", reverse_link("projects", "ownerId", "projects")],
+        "filter": {
+            "id": user_id
+        },
+        "page": {
+            "size": 1
+        }
+    })
+    
+    if not response.get("records"):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Usuário não encontrado"
         )
     
-    # Buscar projetos do usuário
-    projects_response = db.data().query("projects", {
-        "filter": {
-            "ownerId": user_id
-        }
-    })
-    
     projects = []
-    for record in projects_response.get("records", []):
+    for record in (response["records"][0].get("projects") or {}).get("records", []):
         projects.append({
             "id": record["id"],
             "title": record["title"],
             "description": record["description"],
             "projectType": record["projectType"],
             "technologies": record["technologies"],
-            "ownerId": record["ownerId"],
+            "ownerId": user_id,
             "isActive": record.get("isActive", True),
             "createdAt": record["xata"]["createdAt"]
         })
@@ -1,23 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
-from xata.client import XataClient
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List, Optional
 from datetime import datetime
 
 import schemas
-from xata_client import get_db
+from xata_client import AsyncXataClient, get_async_db, page_params, next_page_cursor, reverse_link, link_id, record_exists
 
 router = APIRouter()
 
+def task_from_record(record) -> dict:
+    return {
+        "id": record["id"],
+        "title": record["title"],
+        "description": record["description"],
+        "status": record["status"],
+        "projectId": link_id(record["projectId"]),
+        "createdAt": record["xata"]["createdAt"],
+        "completedAt": record.get("completedAt")
+    }
+
 @router.post("/", response_model=schemas.Task, status_code=status.HTTP_201_CREATED)
-def create_task(task: schemas.TaskCreate, db: XataClient = Depends(get_db)):
-    # Verificar se o projeto existe
-    project_record = db.records().get("projects", task.projectId)
-    if not project_record:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Projeto não encontrado"
-        )
-    
+async def create_task(task: schemas.TaskCreate, db: AsyncXataClient = Depends(get_async_db)):
     # Criar a tarefa com Xata
     task_data = {
         "title": task.title,
@@ -26,7 +28,20 @@ def create_task(task: schemas.TaskCreate, db: XataClient = Depends(get_db)):
         "status": schemas.TaskStatus.PENDING.value
     }
     
-    result = db.records().insert("tasks", task_data)
+    result = await db.records().insert("tasks", task_data, columns=["*"])
+    
+    # O vínculo projectId é validado pelo Xata na inserção; a existência do projeto
+    # só é consultada quando a inserção falha
+    if not result.is_success():
+        if not await record_exists(db, "projects", task.projectId):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Projeto não encontrado"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erro ao criar tarefa"
+        )
     
     # Adaptar o resultado para o formato esperado
     return {
@@ -34,38 +49,44 @@ def create_task(task: schemas.TaskCreate, db: XataClient = Depends(get_db)):
         "title": result["title"],
         "description": result["description"],
         "status": result["status"],
-        "projectId": result["projectId"],
+        "projectId": link_id(result["projectId"]),
         "createdAt": result["xata"]["createdAt"],
         "completedAt": None
     }
 
 @router.get("/", response_model=List[schemas.Task])
-def read_tasks(skip: int = 0, limit: int = 100, db: XataClient = Depends(get_db)):
-    response = db.data().query("tasks", {
-        "page": {
-            "size": limit,
-            "offset": skip
-        }
+async def read_tasks(skip: int = 0, limit: int = 100, db: AsyncXataClient = Depends(get_async_db)):
+    # Paginação por offset, mais lenta quanto mais profunda a página; `/page` pagina pelo cursor
+    response = await db.data().query("tasks", {
+        "page": page_params(limit, skip=skip)
     })
-    
-    tasks = []
-    for record in response["records"]:
-        tasks.append({
-            "id": record["id"],
-            "title": record["title"],
-            "description": record["description"],
-            "status": record["status"],
-            "projectId": record["projectId"],
-            "createdAt": record["xata"]["createdAt"],
-            "completedAt": record.get("completedAt")
-        })
-    
-    return tasks
+    return [task_from_record(record) for record in response["records"]]
+
+@router.get("/page", response_model=schemas.TaskPage)
+async def read_tasks_page(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncXataClient = Depends(get_async_db)
+):
+    """
+    Lista tarefas pelo cursor nativo do Xata: a próxima página é obtida enviando
+    o `next_cursor` da anterior, que é None na última página.
+    """
+    response = await db.data().query("tasks", {
+        "page": page_params(limit, cursor)
+    })
+    if not response.is_success():
+        # O Xata rejeita cursores inválidos ou expirados
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginação inválido"
+        )
+    return {"items": [task_from_record(record) for record in response["records"]], "next_cursor": next_page_cursor(response)}
 
 @router.get("/{task_id}", response_model=schemas.Task)
-def read_task(task_id: str, db: XataClient = Depends(get_db)):
-    task_record = db.records().get("tasks", task_id)
-    if not task_record:
+async def read_task(task_id: str, db: AsyncXataClient = Depends(get_async_db)):
+    task_record = await db.records().get("tasks", task_id)
+    if not task_record.is_success():
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Tarefa não encontrada"
@@ -77,21 +98,13 @@ def read_task(task_id: str, db: XataClient = Depends(get_db)):
         "title": task_record["title"],
         "description": task_record["description"],
         "status": task_record["status"],
-        "projectId": task_record["projectId"],
+        "projectId": link_id(task_record["projectId"]),
         "createdAt": task_record["xata"]["createdAt"],
         "completedAt": task_record.get("completedAt")
     }
 
 @router.put("/{task_id}", response_model=schemas.Task)
-def update_task_status(task_id: str, task_update: schemas.TaskUpdate, db: XataClient = Depends(get_db)):
-    # Verificar se a tarefa existe
-    task_record = db.records().get("tasks", task_id)
-    if not task_record:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Tarefa não encontrada"
-        )
-    
+async def update_task_status(task_id: str, task_update: schemas.TaskUpdate, db: AsyncXataClient = Depends(get_async_db)):
     # Preparar dados de atualização
     update_data = {"status": task_update.status.value}
     
@@ -99,8 +112,13 @@ def update_task_status(task_id: str, task_update: schemas.TaskUpdate, db: XataCl
     if task_update.status == schemas.TaskStatus.COMPLETED:
         update_data["completedAt"] = datetime.now().isoformat()
     
-    # Atualizar a tarefa
-    result = db.records().update("tasks", task_id, update_data)
+    # Atualizar a tarefa (o Xata responde 404 se ela não existir)
+    result = await db.records().update("tasks", task_id, update_data, columns=["*"])
+    if not result.is_success():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tarefa não encontrada"
+        )
     
     # Adaptar o resultado para o formato esperado
     return {
@@ -108,36 +126,38 @@ def update_task_status(task_id: str, task_update: schemas.TaskUpdate, db: XataCl
         "title": result["title"],
         "description": result["description"],
         "status": result["status"],
-        "projectId": result["projectId"],
+        "projectId": link_id(result["projectId"]),
         "createdAt": result["xata"]["createdAt"],
         "completedAt": result.get("completedAt")
     }
 
 @router.get("/project/{project_id}", response_model=List[schemas.Task])
-def read_project_tasks(project_id: str, db: XataClient = Depends(get_db)):
-    # Verificar se o projeto existe
-    project_record = db.records().get("projects", project_id)
-    if not project_record:
+async def read_project_tasks(project_id: str, db: AsyncXataClient = Depends(get_async_db)):
+    # Buscar projeto e suas tarefas em uma única consulta
+    response = await db.data().query("projects", {
+        "columns": ["id", reverse_link("tasks", "projectId", "tasks")],
+        "filter": {
+            "id": project_id
+        },
+        "page": {
+            "size": 1
+        }
+    })
+    
+    if not response.get("records"):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Projeto não encontrado"
         )
     
-    # Buscar tarefas do projeto
-    tasks_response = db.data().query("tasks", {
-        "filter": {
-            "projectId": project_id
-        }
-    })
-    
     tasks = []
-    for record in tasks_response.get("records", []):
+    for record in (response["records"][0].get("tasks") or {}).get("records", []):
         tasks.append({
             "id": record["id"],
             "title": record["title"],
             "description": record["description"],
             "status": record["status"],
-            "projectId": record["projectId"],
+            "projectId": project_id,
             "createdAt": record["xata"]["createdAt"],
             "completedAt": record.get("completedAt")
         })
@@ -1,24 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
-from passlib.context import CryptContext
-from xata.client import XataClient
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List, Optional
 
 import schemas
-from xata_client import get_db
+from logger import get_logger
+from password_hasher import password_hasher, PasswordHasherBusy
+from xata_client import AsyncXataClient, get_async_db, page_params, next_page_cursor, reverse_link
 
 router = APIRouter()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+logger = get_logger(__name__)
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+def password_hasher_busy(e: PasswordHasherBusy) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(e),
+        headers={"Retry-After": "1"}
+    )
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+def user_from_record(record) -> dict:
+    return {
+        "id": record["id"],
+        "email": record["email"],
+        "name": record["name"],
+        "isActive": record.get("isActive", True),
+        "createdAt": record["xata"]["createdAt"]
+    }
 
 @router.post("/", response_model=schemas.User, status_code=status.HTTP_201_CREATED)
-def create_user(user: schemas.UserCreate, db: XataClient = Depends(get_db)):
+async def create_user(user: schemas.UserCreate, db: AsyncXataClient = Depends(get_async_db)):
     # Verificar se o e-mail já está em uso
-    existing_user = db.data().query("users", {
+    existing_user = await db.data().query("users", {
         "filter": {
             "email": user.email
         }
@@ -30,7 +40,11 @@ def create_user(user: schemas.UserCreate, db: XataClient = Depends(get_db)):
             detail="Email já está em uso"
         )
     
-    hashed_password = get_password_hash(user.password)
+    # O hash bcrypt consome CPU; executá-lo no pool de processos dedicado
+    try:
+        hashed_password = await password_hasher.hash(user.password)
+    except PasswordHasherBusy as e:
+        raise password_hasher_busy(e)
     
     # Criar o usuário com Xata
     user_data = {
@@ -40,7 +54,7 @@ def create_user(user: schemas.UserCreate, db: XataClient = Depends(get_db)):
         "isActive": True
     }
     
-    result = db.records().insert("users", user_data)
+    result = await db.records().insert("users", user_data, columns=["*"])
     
     # Adaptar o resultado para o formato esperado pelo schema
     return {
@@ -51,54 +65,116 @@ def create_user(user: schemas.UserCreate, db: XataClient = Depends(get_db)):
         "createdAt": result["xata"]["createdAt"]
     }
 
-@router.get("/", response_model=List[schemas.User])
-def read_users(skip: int = 0, limit: int = 100, db: XataClient = Depends(get_db)):
-    response = db.data().query("users", {
+@router.post("/login", response_model=schemas.User)
+async def login_user(credentials: schemas.UserLogin, db: AsyncXataClient = Depends(get_async_db)):
+    """
+    Verifica e-mail e senha do usuário. Se o hash armazenado usar um custo bcrypt
+    diferente do configurado (BCRYPT_ROUNDS), ele é refeito e salvo neste login.
+    """
+    response = await db.data().query("users", {
+        "filter": {
+            "email": credentials.email
+        },
         "page": {
-            "size": limit,
-            "offset": skip
+            "size": 1
         }
     })
     
-    users = []
-    for record in response["records"]:
-        users.append({
-            "id": record["id"],
-            "email": record["email"],
-            "name": record["name"],
-            "isActive": record.get("isActive", True),
-            "createdAt": record["xata"]["createdAt"]
-        })
+    invalid_credentials = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="E-mail ou senha inválidos"
+    )
+    if not response.get("records"):
+        try:
+            await password_hasher.verify_dummy(credentials.password)
+        except PasswordHasherBusy as e:
+            raise password_hasher_busy(e)
+        raise invalid_credentials
+    user_record = response["records"][0]
+    
+    try:
+        verified, new_hash = await password_hasher.verify(credentials.password, user_record.get("hashedPassword") or "")
+    except PasswordHasherBusy as e:
+        raise password_hasher_busy(e)
+    except ValueError:
+        # Hash ausente ou em formato desconhecido
+        verified, new_hash = False, None
+    
+    if not verified or not user_record.get("isActive", True):
+        raise invalid_credentials
+    
+    if new_hash:
+        result = await db.records().update("users", user_record["id"], {"hashedPassword": new_hash})
+        if not result.is_success():
+            # O login não depende da atualização; o hash é refeito no próximo login
+            logger.warning(f"Erro ao atualizar o hash da senha do usuário {user_record['id']}: {result.status_code}")
     
-    return users
+    return {
+        "id": user_record["id"],
+        "email": user_record["email"],
+        "name": user_record["name"],
+        "isActive": user_record.get("isActive", True),
+        "createdAt": user_record["xata"]["createdAt"]
+    }
+
+@router.get("/", response_model=List[schemas.User])
+async def read_users(skip: int = 0, limit: int = 100, db: AsyncXataClient = Depends(get_async_db)):
+    # Paginação por offset, mais lenta quanto mais profunda a página; `/page` pagina pelo cursor
+    response = await db.data().query("users", {
+        "page": page_params(limit, skip=skip)
+    })
+    return [user_from_record(record) for record in response["records"]]
+
+@router.get("/page", response_model=schemas.UserPage)
+async def read_users_page(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncXataClient = Depends(get_async_db)
+):
+    """
+    Lista usuários pelo cursor nativo do Xata: a próxima página é obtida enviando
+    o `next_cursor` da anterior, que é None na última página.
+    """
+    response = await db.data().query("users", {
+        "page": page_params(limit, cursor)
+    })
+    if not response.is_success():
+        # O Xata rejeita cursores inválidos ou expirados
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginação inválido"
+        )
+    return {"items": [user_from_record(record) for record in response["records"]], "next_cursor": next_page_cursor(response)}
 
 @router.get("/{user_id}", response_model=schemas.UserWithProjects)
-def read_user(user_id: str, db: XataClient = Depends(get_db)):
-    # Buscar usuário
-    user_record = db.records().get("users", user_id)
+async def read_user(user_id: str, db: AsyncXataClient = Depends(get_async_db)):
+    # Buscar usuário e seus projetos em uma única consulta
+    response = await db.data().query("users", {
+        "columns": ["*", reverse_link("projects", "ownerId", "projects")],
+        "filter": {
+            "id": user_id
+        },
+        "page": {
+            "size": 1
+        }
+    })
     
-    if not user_record:
+    if not response.get("records"):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Usuário não encontrado"
         )
-    
-    # Buscar projetos do usuário
-    projects_response = db.data().query("projects", {
-        "filter": {
-            "ownerId": user_id
-        }
-    })
+    user_record = response["records"][0]
     
     projects = []
-    for project in projects_response.get("records", []):
+    for project in (user_record.get("projects") or {}).get("records", []):
         projects.append({
             "id": project["id"],
             "title": project["title"],
             "description": project["description"],
             "projectType": project["projectType"],
             "technologies": project["technologies"],
-            "ownerId": project["ownerId"],
+            "ownerId": user_id,
             "isActive": project.get("isActive", True),
             "createdAt": project["xata"]["createdAt"]
         })
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, HttpUrl
 from typing import List, Optional
 from datetime import datetime
 from enum import Enum
@@ -14,6 +14,12 @@ class TaskStatus(str, Enum):
     COMPLETED = "COMPLETED"
     SKIPPED = "SKIPPED"
 
+class JobStatus(str, Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+
 # Schemas para usuários
 class UserBase(BaseModel):
     email: EmailStr
@@ -22,6 +28,10 @@ class UserBase(BaseModel):
 class UserCreate(UserBase):
     password: str
 
+class UserLogin(BaseModel):
+    email: EmailStr
+    password: str
+
 class User(UserBase):
     id: str  # Xata usa string como ID
     isActive: bool
@@ -36,6 +46,7 @@ class ProjectRequest(BaseModel):
     project_type: ProjectType
     technologies: List[str]
     additional_info: Optional[str] = None
+    bypass_cache: bool = False
 
 class ProjectTask(BaseModel):
     title: str
@@ -48,6 +59,19 @@ class ProjectProposal(BaseModel):
     tasks: List[ProjectTask]
     technologies: List[str]
 
+# Schemas para jobs assíncronos de geração
+class ProjectJobRequest(ProjectRequest):
+    # O destino também precisa estar em JOB_CALLBACK_ALLOWED_HOSTS (ver jobs.py)
+    callback_url: Optional[HttpUrl] = None
+
+class ProjectJob(BaseModel):
+    id: str
+    status: JobStatus
+    created_at: datetime
+    updated_at: datetime
+    result: Optional[ProjectProposal] = None
+    error: Optional[str] = None
+
 class ProjectBase(BaseModel):
     title: str
     description: str
@@ -97,9 +121,25 @@ class ProjectWithTasks(Project):
         orm_mode = True
         from_attributes = True
 
+class ProjectCreateWithTasks(ProjectCreate):
+    tasks: List[TaskBase] = Field(default_factory=list, max_length=100)
+
 class UserWithProjects(User):
     projects: List[Project] = []
     
     class Config:
         orm_mode = True
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True 
+
+# Schemas para paginação por cursor
+class UserPage(BaseModel):
+    items: List[User]
+    next_cursor: Optional[str] = None
+
+class ProjectPage(BaseModel):
+    items: List[Project]
+    next_cursor: Optional[str] = None
+
+class TaskPage(BaseModel):
+    items: List[Task]
+    next_cursor: Optional[str] = None
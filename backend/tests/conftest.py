@@ -0,0 +1,19 @@
+import atexit
+import os
+import sys
+
+# Os módulos do serviço são importados pelo nome (ex: `import jobs`), como no app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Pacote compartilhado entre os serviços (`codespark_common`), na raiz do repositório
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+# O módulo xata_client exige as credenciais na importação; os testes não acessam o Xata real
+os.environ.setdefault("XATA_API_KEY", "xau_test")
+os.environ.setdefault("XATA_DATABASE_URL", "https://test.local.xata.sh/db/codespark:main")
+
+def pytest_sessionfinish(session, exitstatus):
+    # Esvaziar a fila de logs enquanto a saída capturada pelo pytest ainda está aberta
+    logger = sys.modules.get("logger")
+    if logger is not None:
+        atexit.unregister(logger.queue_listener.stop)
+        logger.queue_listener.stop()
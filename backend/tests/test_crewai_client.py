@@ -0,0 +1,74 @@
+import asyncio
+
+import httpx
+
+import crewai_client
+from crewai_client import CircuitBreaker, CrewAIClient
+
+def make_client(handler, failure_threshold: int = 2) -> CrewAIClient:
+    client = CrewAIClient(base_url="http://crewai.test", max_retries=0)
+    client.breaker = CircuitBreaker(failure_threshold=failure_threshold, reset_timeout=30)
+    client._client = httpx.AsyncClient(base_url=client.base_url, transport=httpx.MockTransport(handler))
+    return client
+
+def test_read_timeout_follows_crewai_deadline_with_margin():
+    assert crewai_client.CREWAI_TIMEOUT > crewai_client.CREW_REQUEST_TIMEOUT
+
+def test_slow_generations_do_not_open_the_breaker():
+    def handler(request):
+        if request.url.path == "/slow":
+            raise httpx.ReadTimeout("sem resposta", request=request)
+        return httpx.Response(504, json={"detail": "prazo excedido"})
+
+    async def scenario():
+        client = make_client(handler)
+        for _ in range(3):
+            try:
+                await client.post("/slow", {})
+            except httpx.ReadTimeout:
+                pass
+            response = await client.post("/deadline", {})
+            assert response.status_code == 504
+        await client.close()
+        return client
+
+    client = asyncio.run(scenario())
+    stats = client.get_stats()
+    assert stats["timeouts"] == 6
+    assert stats["failures"] == 0
+    assert stats["breaker"]["state"] == CircuitBreaker.CLOSED
+
+def test_connection_failures_open_the_breaker():
+    def handler(request):
+        raise httpx.ConnectError("recusada", request=request)
+
+    async def scenario():
+        client = make_client(handler)
+        for _ in range(2):
+            try:
+                await client.post("/generate", {})
+            except httpx.ConnectError:
+                pass
+        await client.close()
+        return client
+
+    client = asyncio.run(scenario())
+    assert client.get_stats()["breaker"]["state"] == CircuitBreaker.OPEN
+
+def test_stream_read_timeout_is_not_a_breaker_failure():
+    def handler(request):
+        raise httpx.ReadTimeout("sem eventos", request=request)
+
+    async def scenario():
+        client = make_client(handler, failure_threshold=1)
+        try:
+            async with client.stream("/generate/stream", {}):
+                pass
+        except httpx.ReadTimeout:
+            pass
+        await client.close()
+        return client
+
+    client = asyncio.run(scenario())
+    assert client.in_flight == 0
+    assert client.get_stats()["breaker"]["state"] == CircuitBreaker.CLOSED
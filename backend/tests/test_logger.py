@@ -0,0 +1,23 @@
+import logging
+import queue
+
+from logger import BoundedQueueHandler
+
+def test_queued_record_keeps_the_data_as_it_was_logged():
+    log_queue = queue.Queue()
+    handler = BoundedQueueHandler(log_queue)
+    test_logger = logging.getLogger("codespark.tests.queue")
+    test_logger.setLevel(logging.INFO)
+    test_logger.propagate = False
+    test_logger.addHandler(handler)
+    try:
+        data = {"status": "started", "attempt": 1}
+        test_logger.info("job_updated", extra={"event_type": "job_updated", "data": data})
+        # Quem registrou continua usando o dicionário antes de a thread de escrita serializá-lo
+        data["status"] = "finished"
+        data["attempt"] += 1
+    finally:
+        test_logger.removeHandler(handler)
+
+    record = log_queue.get_nowait()
+    assert record.data == {"status": "started", "attempt": 1}
@@ -0,0 +1,40 @@
+import threading
+
+from codespark_common.metrics import MetricsRegistry
+
+def run_in_threads(fn, count: int):
+    threads = [threading.Thread(target=fn) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+def test_shards_of_finished_threads_are_folded_into_the_totals():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requisições", ("route",))
+    latency = registry.histogram("latency_seconds", "Latência", ("route",), buckets=(0.1, 1.0))
+
+    def record():
+        requests.inc("/api/users")
+        latency.observe(0.05, "/api/users")
+
+    run_in_threads(record, 50)
+    record()
+
+    # Apenas a partição da thread atual continua registrada
+    assert len(requests._shards) == 1 and len(latency._shards) == 1
+    assert requests.collect() == ['requests_total{route="/api/users"} 51.0']
+    assert 'latency_seconds_bucket{route="/api/users",le="0.1"} 51' in latency.collect()
+    assert 'latency_seconds_count{route="/api/users"} 51' in latency.collect()
+
+def test_retiring_a_shard_keeps_a_live_shard_with_equal_counts():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requisições", ("route",))
+
+    requests.inc("/a")
+    # A partição da thread encerrada é igual (mesmas contagens) à da thread atual
+    run_in_threads(lambda: requests.inc("/a"), 1)
+    requests.inc("/a")
+
+    assert len(requests._shards) == 1 and requests._shards[0] is requests._shard()
+    assert requests.collect() == ['requests_total{route="/a"} 3.0']
@@ -0,0 +1,19 @@
+import asyncio
+
+from password_hasher import PasswordHasher, hash_password
+
+def test_verify_dummy_runs_a_full_bcrypt_verification():
+    async def scenario():
+        hasher = PasswordHasher(workers=1, max_concurrency=2, queue_timeout=30)
+        try:
+            await hasher.verify_dummy("senha-qualquer")
+            await hasher.verify_dummy("outra-senha")
+            # O hash fictício é calculado uma única vez, ao iniciar o pool
+            dummy_hash = hasher._dummy_hash.result()
+            return hasher.get_stats(), dummy_hash
+        finally:
+            await asyncio.to_thread(hasher.shutdown)
+
+    stats, dummy_hash = asyncio.run(scenario())
+    assert stats["verifications"] == 2
+    assert dummy_hash.startswith("$2b$") and len(dummy_hash) == len(hash_password("x"))
@@ -0,0 +1,242 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+
+from db_client import Base
+from models import Project, ProjectType, Task, TaskStatus, User
+from repositories import (
+    AsyncProjectRepository, AsyncTaskRepository, ProjectRepository, TaskRepository,
+)
+
+@compiles(JSONB, "sqlite")
+def compile_jsonb_sqlite(type_, compiler, **kw):
+    # Os testes usam SQLite; as tecnologias ficam em uma coluna JSON comum
+    return "JSON"
+
+class StatementCounter:
+    """Registra os comandos SQL enviados ao banco (evento before_cursor_execute)."""
+    def __init__(self, engine):
+        self.statements = []
+        event.listen(engine, "before_cursor_execute", self.record)
+
+    def record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def count(self, operation):
+        start = len(self.statements)
+        result = operation()
+        return result, len(self.statements) - start
+
+def seed(session: Session):
+    owner = User(email="ana@example.com", name="Ana", password_hash="x")
+    for i in range(3):
+        project = Project(title=f"Projeto {i}", description="Descrição", project_type=ProjectType.BACKEND, technologies=["Python"], owner=owner)
+        project.tasks = [Task(title=f"Tarefa {j}", description="Descrição") for j in range(4)]
+        session.add(project)
+    session.commit()
+    return owner.id
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        seed(session)
+    yield engine
+    engine.dispose()
+
+def test_get_with_tasks_loads_the_collection_in_two_statements(engine):
+    counter = StatementCounter(engine)
+    with Session(engine) as session:
+        project, statements = counter.count(lambda: ProjectRepository(session).get_with_tasks(1))
+        assert statements == 2
+        _, statements = counter.count(lambda: [task.title for task in project.tasks])
+        assert statements == 0
+
+def test_get_by_owner_with_tasks_does_not_query_per_project(engine):
+    counter = StatementCounter(engine)
+    with Session(engine) as session:
+        projects, statements = counter.count(lambda: ProjectRepository(session).get_by_owner_with_tasks(1))
+        assert len(projects) == 3
+        _, accessed = counter.count(lambda: sum(len(project.tasks) for project in projects))
+        assert (statements, accessed) == (2, 0)
+
+def test_get_with_project_joins_in_one_statement(engine):
+    counter = StatementCounter(engine)
+    with Session(engine) as session:
+        task, statements = counter.count(lambda: TaskRepository(session).get_with_project(1))
+        _, accessed = counter.count(lambda: task.project.title)
+        assert (statements, accessed) == (1, 0)
+
+def test_loader_options_apply_to_objects_already_in_the_identity_map(engine):
+    counter = StatementCounter(engine)
+    with Session(engine) as session:
+        repository = TaskRepository(session)
+        task = repository.get_by_id(1)
+        _, statements = counter.count(lambda: repository.get_with_project(1))
+        _, accessed = counter.count(lambda: task.project.title)
+        assert (statements, accessed) == (1, 0)
+
+def test_async_loader_options_apply_to_objects_already_in_the_identity_map(tmp_path):
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'codespark.db'}")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        async with AsyncSession(engine) as session:
+            await session.run_sync(seed)
+        counter = StatementCounter(engine.sync_engine)
+
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            projects = AsyncProjectRepository(session)
+            project = await projects.get_by_id(1)
+            start = len(counter.statements)
+            # Com Session.get as opções seriam ignoradas e o acesso a `tasks` levantaria MissingGreenlet
+            await projects.get_with_tasks(1)
+            titles = [task.title for task in project.tasks]
+            project_statements = len(counter.statements) - start
+
+            tasks = AsyncTaskRepository(session)
+            task = await tasks.get_by_id(1)
+            start = len(counter.statements)
+            await tasks.get_with_project(task.id)
+            project_title = task.project.title
+            task_statements = len(counter.statements) - start
+        await engine.dispose()
+        return titles, project_statements, project_title, task_statements
+
+    titles, project_statements, project_title, task_statements = asyncio.run(scenario())
+    assert len(titles) == 4 and project_statements == 2
+    assert project_title == "Projeto 0" and task_statements == 1
+
+def test_get_with_options_keeps_unflushed_changes(engine):
+    # Como em SessionLocal: sem autoflush, as alterações ficam pendentes até o commit
+    with Session(engine, autoflush=False) as session:
+        projects = ProjectRepository(session)
+        project = projects.get_by_id(1)
+        project.title = "Título alterado"
+        task = TaskRepository(session).get_by_id(1)
+        task.title = "Tarefa alterada"
+
+        assert projects.get_with_tasks(1).title == "Título alterado"
+        assert TaskRepository(session).get_with_project(1).title == "Tarefa alterada"
+        session.commit()
+    with Session(engine) as session:
+        assert session.get(Project, 1).title == "Título alterado"
+        assert session.get(Task, 1).title == "Tarefa alterada"
+
+def test_async_get_with_options_keeps_unflushed_changes(tmp_path):
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'codespark.db'}")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        async with AsyncSession(engine) as session:
+            await session.run_sync(seed)
+
+        async with AsyncSession(engine, autoflush=False, expire_on_commit=False) as session:
+            projects = AsyncProjectRepository(session)
+            project = await projects.get_by_id(1)
+            project.title = "Título alterado"
+            reloaded = await projects.get_with_tasks(1)
+            await session.commit()
+        async with AsyncSession(engine) as session:
+            stored = await session.get(Project, 1)
+            title = stored.title
+        await engine.dispose()
+        return reloaded.title, title
+
+    assert asyncio.run(scenario()) == ("Título alterado", "Título alterado")
+
+def test_create_flushes_one_insert_and_leaves_the_commit_to_the_caller(engine):
+    counter = StatementCounter(engine)
+    with Session(engine) as session:
+        data = {"title": "Tarefa", "description": "Descrição", "project_id": 1}
+        task, statements = counter.count(lambda: TaskRepository(session).create(data))
+        # Os valores padrão do banco voltam no próprio INSERT (RETURNING), sem refresh
+        assert statements == 1
+        assert task.id is not None and task.created_at is not None
+        assert session.in_transaction()
+    with Session(engine) as session:
+        assert session.get(Task, task.id) is None
+
+def project_data() -> dict:
+    return {"title": "Loja", "description": "Descrição", "project_type": ProjectType.FULLSTACK, "technologies": ["React"], "owner_id": 1}
+
+def test_bulk_create_returns_ids_and_defaults_in_one_statement(engine):
+    counter = StatementCounter(engine)
+    with Session(engine) as session:
+        rows = [{"title": f"Nova {i}", "description": "Descrição", "project_id": 1} for i in range(3)]
+        tasks, statements = counter.count(lambda: TaskRepository(session).bulk_create(rows))
+        assert statements == 1
+        assert [task.title for task in tasks] == ["Nova 0", "Nova 1", "Nova 2"]
+        assert len({task.id for task in tasks}) == 3
+        assert all(task.status == TaskStatus.PENDING and task.created_at is not None for task in tasks)
+        session.commit()
+
+def test_bulk_update_applies_each_row(engine):
+    with Session(engine) as session:
+        updated = TaskRepository(session).bulk_update([
+            {"id": 1, "status": TaskStatus.COMPLETED},
+            {"id": 2, "title": "Renomeada"},
+        ])
+        session.commit()
+    assert updated == 2
+    with Session(engine) as session:
+        assert session.get(Task, 1).status == TaskStatus.COMPLETED
+        assert session.get(Task, 2).title == "Renomeada"
+        assert session.get(Task, 3).status == TaskStatus.PENDING
+
+def test_create_with_tasks_links_the_tasks_in_two_statements(engine):
+    counter = StatementCounter(engine)
+    with Session(engine) as session:
+        tasks = [{"title": f"Etapa {i}", "description": "Descrição"} for i in range(4)]
+        project, statements = counter.count(lambda: ProjectRepository(session).create_with_tasks(project_data(), tasks))
+        assert statements == 2
+        # As tarefas já vêm carregadas, sem nova consulta
+        _, accessed = counter.count(lambda: [task.project_id for task in project.tasks])
+        assert accessed == 0
+        assert [task.project_id for task in project.tasks] == [project.id] * 4
+        project_id = project.id
+        session.commit()
+    with Session(engine) as session:
+        assert [task.title for task in ProjectRepository(session).get_with_tasks(project_id).tasks] == [f"Etapa {i}" for i in range(4)]
+
+def test_create_with_tasks_rolls_back_when_a_task_fails(engine):
+    with Session(engine) as session:
+        before = session.scalar(select(func.count()).select_from(Project))
+        tasks = [{"title": "Válida", "description": "Descrição"}, {"title": None, "description": "Sem título"}]
+        with pytest.raises(IntegrityError):
+            ProjectRepository(session).create_with_tasks(project_data(), tasks)
+        session.rollback()
+        assert session.scalar(select(func.count()).select_from(Project)) == before
+        assert session.scalar(select(func.count()).select_from(Task).where(Task.title == "Válida")) == 0
+
+def test_async_bulk_methods(tmp_path):
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'codespark.db'}")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        async with AsyncSession(engine) as session:
+            await session.run_sync(seed)
+
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            tasks = [{"title": f"Etapa {i}", "description": "Descrição"} for i in range(2)]
+            project = await AsyncProjectRepository(session).create_with_tasks(project_data(), tasks)
+            task_repository = AsyncTaskRepository(session)
+            created = await task_repository.bulk_create([{"title": "Extra", "description": "Descrição", "project_id": project.id}])
+            updated = await task_repository.bulk_update([{"id": created[0].id, "status": TaskStatus.COMPLETED}])
+            await session.commit()
+        async with AsyncSession(engine) as session:
+            stored = await AsyncProjectRepository(session).get_with_tasks(project.id)
+            result = sorted((task.title, task.status) for task in stored.tasks)
+        await engine.dispose()
+        return [task.project_id for task in project.tasks], project.id, updated, result
+
+    linked, project_id, updated, result = asyncio.run(scenario())
+    assert linked == [project_id, project_id] and updated == 1
+    assert result == [("Etapa 0", TaskStatus.PENDING), ("Etapa 1", TaskStatus.PENDING), ("Extra", TaskStatus.COMPLETED)]
@@ -0,0 +1,62 @@
+import asyncio
+
+from codespark_common.single_flight import SingleFlight
+
+def test_concurrent_identical_calls_run_once():
+    async def scenario():
+        flight = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"title": "API"}
+
+        results = await asyncio.gather(*(flight.do("chave", work) for _ in range(10)))
+        return flight, calls, results
+
+    flight, calls, results = asyncio.run(scenario())
+    assert calls == 1
+    assert all(result is results[0] for result in results)
+    assert flight.get_stats() == {"executions": 1, "coalesced": 9, "in_flight": 0, "coalesced_ratio": 0.9}
+
+def test_exception_reaches_every_waiter_and_clears_the_key():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("falha na geração")
+
+        results = await asyncio.gather(*(flight.do("chave", failing) for _ in range(3)), return_exceptions=True)
+        in_flight = flight.get_stats()["in_flight"]
+        # Com a chave liberada, a próxima chamada executa novamente
+        retried = await flight.do("chave", lambda: asyncio.sleep(0, result="ok"))
+        return results, in_flight, retried, flight.stats["executions"]
+
+    results, in_flight, retried, executions = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert in_flight == 0
+    assert (retried, executions) == ("ok", 2)
+
+def test_cancelling_one_waiter_does_not_cancel_the_shared_call():
+    async def scenario():
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return "pronto"
+
+        first = asyncio.create_task(flight.do("chave", work))
+        second = asyncio.create_task(flight.do("chave", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        return first, await second
+
+    first, result = asyncio.run(scenario())
+    assert first.cancelled()
+    assert result == "pronto"
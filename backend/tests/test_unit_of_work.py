@@ -0,0 +1,100 @@
+import pytest
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+import db_client
+from db_client import Base, UnitOfWorkMiddleware, get_async_db, get_db
+from models import Project, ProjectType, Task
+from repositories import AsyncProjectRepository, ProjectRepository, TaskRepository
+from test_repositories import StatementCounter, seed
+
+def project_data() -> dict:
+    return {"title": "Loja", "description": "Descrição", "project_type": ProjectType.FULLSTACK, "technologies": ["React"], "owner_id": 1}
+
+TASKS = [{"title": f"Etapa {i}", "description": "Descrição"} for i in range(3)]
+
+def create_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(UnitOfWorkMiddleware)
+
+    @app.post("/projects")
+    def create_project(fail: bool = False, db: Session = Depends(get_db)):
+        # Operação composta: só é confirmada inteira, ao fim da solicitação
+        project = ProjectRepository(db).create_with_tasks(project_data(), TASKS)
+        TaskRepository(db).complete_task(project.tasks[0].id)
+        if fail:
+            raise HTTPException(status_code=422, detail="Dados inválidos")
+        return {"id": project.id}
+
+    @app.post("/projects/invalid")
+    def create_invalid_project(db: Session = Depends(get_db)):
+        # Sem flush no handler: o erro só aparece no commit do escopo da solicitação
+        db.add(Task(title=None, description="Sem título", project_id=1))
+        return {"ok": True}
+
+    @app.post("/async/projects")
+    async def create_project_async(db=Depends(get_async_db)):
+        project = await AsyncProjectRepository(db).create_with_tasks(project_data(), TASKS)
+        return {"id": project.id}
+
+    return app
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    url = tmp_path / "codespark.db"
+    engine = create_engine(f"sqlite:///{url}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        seed(session)
+    monkeypatch.setattr(db_client, "SessionLocal", sessionmaker(bind=engine, autoflush=False, expire_on_commit=False))
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{url}")
+    monkeypatch.setattr(db_client, "AsyncSessionLocal", async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False))
+    yield engine
+    engine.dispose()
+
+def count(engine, model) -> int:
+    with Session(engine) as session:
+        return session.scalar(select(func.count()).select_from(model))
+
+def commits(engine) -> list:
+    recorded = []
+    event.listen(engine, "commit", lambda connection: recorded.append(connection))
+    return recorded
+
+def test_request_commits_once_before_the_response(engine):
+    committed = commits(engine)
+    counter = StatementCounter(engine)
+    with TestClient(create_app()) as client:
+        response = client.post("/projects")
+    assert response.status_code == 200
+    assert len(committed) == 1
+    # INSERT do projeto, INSERT das tarefas e UPDATE de complete_task (a tarefa já está na sessão)
+    assert len(counter.statements) == 3
+    with Session(engine) as session:
+        project = ProjectRepository(session).get_with_tasks(response.json()["id"])
+        assert [task.status.value for task in project.tasks] == ["COMPLETED", "PENDING", "PENDING"]
+
+def test_error_response_rolls_back_the_whole_request(engine):
+    committed = commits(engine)
+    projects = count(engine, Project)
+    with TestClient(create_app()) as client:
+        assert client.post("/projects", params={"fail": True}).status_code == 422
+    assert committed == []
+    assert count(engine, Project) == projects
+
+def test_commit_failure_reaches_the_client(engine):
+    tasks = count(engine, Task)
+    with TestClient(create_app(), raise_server_exceptions=False) as client:
+        response = client.post("/projects/invalid")
+    assert response.status_code == 500
+    assert count(engine, Task) == tasks
+
+def test_async_session_is_committed_by_the_middleware(engine):
+    with TestClient(create_app()) as client:
+        response = client.post("/async/projects")
+    assert response.status_code == 200
+    with Session(engine) as session:
+        assert len(session.get(Project, response.json()["id"]).tasks) == 3
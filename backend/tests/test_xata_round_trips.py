@@ -0,0 +1,217 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from xata.client import XataClient
+
+from routers import projects, tasks, users
+from xata_client import AsyncXataClient, get_async_db
+
+CREATED_AT = "2024-01-01T00:00:00.000Z"
+LINKS = {"projects": ("ownerId", "users"), "tasks": ("projectId", "projects")}
+
+class FakeXata:
+    """
+    Xata em memória atrás de um `httpx.MockTransport`, que registra cada solicitação
+    (round trip) feita pelas rotas.
+    """
+    def __init__(self):
+        self.tables = {"users": {}, "projects": {}, "tasks": {}}
+        self.requests = []
+
+    def add(self, table_name: str, record_id: str, **fields):
+        self.tables[table_name][record_id] = {"id": record_id, "xata": {"createdAt": CREATED_AT}, **fields}
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(f"{request.method} {request.url.path}")
+        parts = request.url.path.split("/tables/", 1)[1].split("/")
+        table = self.tables[parts[0]]
+        if request.method == "GET":
+            record = table.get(parts[2])
+            return httpx.Response(200, json=record) if record else httpx.Response(404, json={"message": "not found"})
+        body = httpx.Response(200, content=request.content).json()
+        if parts[1] == "query":
+            if "id" not in body.get("filter", {}):
+                return httpx.Response(200, json=self.page(parts[0], body["page"], body.get("filter")))
+            return httpx.Response(200, json={"records": self.query(parts[0], body), "meta": {"page": {"more": False}}})
+        # Inserção: o Xata rejeita vínculos para registros inexistentes
+        link_column, linked_table = LINKS[parts[0]]
+        if body[link_column] not in self.tables[linked_table]:
+            return httpx.Response(400, json={"message": f"invalid link: {link_column}"})
+        record_id = f"rec_{len(table) + 1}"
+        self.add(parts[0], record_id, **body)
+        return httpx.Response(201, json={**table[record_id], link_column: {"id": body[link_column]}})
+
+    def page(self, table_name: str, page: dict, filter: dict = None):
+        records = [record for record in self.tables[table_name].values() if self.matches(record, filter)]
+        start = int(page.get("after") or page.get("offset") or 0)
+        end = start + page["size"]
+        more = end < len(records)
+        return {"records": records[start:end], "meta": {"page": {"cursor": str(end) if more else None, "more": more}}}
+
+    def matches(self, record: dict, filter: dict = None) -> bool:
+        if not filter:
+            return True
+        combine, conditions = next(iter(filter.items()))
+        results = [
+            value["$iContains"].lower() in record[column].lower()
+            for condition in conditions
+            for column, value in condition.items()
+        ]
+        return all(results) if combine == "$all" else any(results)
+
+    def query(self, table_name: str, body: dict):
+        record = self.tables[table_name].get(body["filter"]["id"])
+        if record is None:
+            return []
+        result = dict(record)
+        for column in body.get("columns", []):
+            if isinstance(column, dict):
+                # Coluna de vínculo reverso: "<-tabela.coluna"
+                child_table, link_column = column["name"][2:].split(".")
+                children = [
+                    {**child, link_column: {"id": child[link_column]}}
+                    for child in self.tables[child_table].values()
+                    if child[link_column] == record["id"]
+                ]
+                result[column["as"]] = {"records": children}
+        return [result]
+
+@pytest.fixture
+def xata():
+    return FakeXata()
+
+@pytest.fixture
+def client(xata):
+    db = AsyncXataClient(XataClient(api_key="xau_test", db_url="https://test.local.xata.sh/db/codespark:main"))
+    db._http = httpx.AsyncClient(base_url="https://xata.test/db/codespark:main", transport=httpx.MockTransport(xata.handle))
+    app = FastAPI()
+    app.include_router(users.router, prefix="/api/users")
+    app.include_router(projects.router, prefix="/api/projects")
+    app.include_router(tasks.router, prefix="/api/tasks")
+    app.dependency_overrides[get_async_db] = lambda: db
+    return TestClient(app)
+
+PROJECT = {"title": "Projeto", "description": "Descrição", "projectType": "BACKEND", "technologies": "Python"}
+STORED_PROJECT = {**PROJECT, "isActive": True}
+
+def test_create_project_uses_one_round_trip(client, xata):
+    xata.add("users", "rec_user")
+    response = client.post("/api/projects/", params={"user_id": "rec_user"}, json=PROJECT)
+    assert response.status_code == 201
+    assert response.json()["ownerId"] == "rec_user"
+    assert xata.requests == ["POST /db/codespark:main/tables/projects/data"]
+
+def test_create_project_for_missing_user_returns_404(client, xata):
+    response = client.post("/api/projects/", params={"user_id": "rec_missing"}, json=PROJECT)
+    assert response.status_code == 404
+    # A existência do usuário só é consultada depois da falha na inserção
+    assert len(xata.requests) == 2
+
+def test_read_user_projects_uses_one_round_trip(client, xata):
+    xata.add("users", "rec_user")
+    xata.add("projects", "rec_project", ownerId="rec_user", **STORED_PROJECT)
+    response = client.get("/api/projects/user/rec_user")
+    assert response.status_code == 200
+    assert [project["id"] for project in response.json()] == ["rec_project"]
+    assert len(xata.requests) == 1
+
+def test_read_user_projects_for_missing_user_returns_404(client, xata):
+    assert client.get("/api/projects/user/rec_missing").status_code == 404
+    assert len(xata.requests) == 1
+
+def test_create_task_uses_one_round_trip(client, xata):
+    xata.add("projects", "rec_project", ownerId="rec_user", **STORED_PROJECT)
+    response = client.post("/api/tasks/", json={"title": "Tarefa", "description": "Descrição", "projectId": "rec_project"})
+    assert response.status_code == 201
+    assert response.json()["status"] == "PENDING"
+    assert len(xata.requests) == 1
+
+def test_create_task_for_missing_project_returns_404(client, xata):
+    response = client.post("/api/tasks/", json={"title": "Tarefa", "description": "Descrição", "projectId": "rec_missing"})
+    assert response.status_code == 404
+    assert len(xata.requests) == 2
+
+def test_read_project_tasks_uses_one_round_trip(client, xata):
+    xata.add("projects", "rec_project", ownerId="rec_user", **STORED_PROJECT)
+    xata.add("tasks", "rec_task", projectId="rec_project", title="Tarefa", description="Descrição", status="PENDING")
+    response = client.get("/api/tasks/project/rec_project")
+    assert response.status_code == 200
+    assert [task["id"] for task in response.json()] == ["rec_task"]
+    assert len(xata.requests) == 1
+
+def test_read_project_tasks_for_missing_project_returns_404(client, xata):
+    assert client.get("/api/tasks/project/rec_missing").status_code == 404
+    assert len(xata.requests) == 1
+
+@pytest.mark.parametrize("path, table_name, fields", [
+    ("/api/users/", "users", {"email": "ana@example.com", "name": "Ana", "isActive": True}),
+    ("/api/projects/", "projects", {"ownerId": {"id": "rec_user"}, **STORED_PROJECT}),
+    ("/api/tasks/", "tasks", {"projectId": {"id": "rec_project"}, "title": "Tarefa", "description": "Descrição", "status": "PENDING"}),
+])
+def test_list_endpoints_keep_the_list_shape_and_page_by_cursor(client, xata, path, table_name, fields):
+    for i in range(3):
+        xata.add(table_name, f"rec_{i}", **fields)
+
+    # Sem parâmetros a resposta continua sendo uma lista simples
+    assert [item["id"] for item in client.get(path).json()] == ["rec_0", "rec_1", "rec_2"]
+    assert [item["id"] for item in client.get(path, params={"limit": 2, "skip": 1}).json()] == ["rec_1", "rec_2"]
+
+    first = client.get(f"{path}page", params={"limit": 2}).json()
+    assert [item["id"] for item in first["items"]] == ["rec_0", "rec_1"]
+    second = client.get(f"{path}page", params={"limit": 2, "cursor": first["next_cursor"]}).json()
+    assert [item["id"] for item in second["items"]] == ["rec_2"]
+    assert second["next_cursor"] is None
+
+def test_list_endpoints_have_one_response_schema(client):
+    paths = client.get("/openapi.json").json()["paths"]
+    for resource in ("users", "projects", "tasks"):
+        listed = paths[f"/api/{resource}/"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+        paged = paths[f"/api/{resource}/page"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+        assert listed["type"] == "array"
+        assert paged["$ref"].endswith("Page")
+
+@pytest.mark.parametrize("match, technologies, expected", [
+    ("all", ["react", "Node"], ["rec_fullstack"]),
+    ("any", ["Go", "React"], ["rec_fullstack", "rec_frontend"]),
+    # "Java" está contido em "JavaScript", mas não é uma das tecnologias do projeto
+    ("all", ["Java"], []),
+])
+def test_search_by_technology_queries_xata_once(client, xata, match, technologies, expected):
+    xata.add("projects", "rec_fullstack", **{**STORED_PROJECT, "ownerId": {"id": "rec_user"}, "technologies": "React, Node, JavaScript"})
+    xata.add("projects", "rec_frontend", **{**STORED_PROJECT, "ownerId": {"id": "rec_user"}, "technologies": "React,TypeScript"})
+    xata.add("projects", "rec_backend", **{**STORED_PROJECT, "ownerId": {"id": "rec_user"}, "technologies": "Python"})
+
+    response = client.get("/api/projects/search", params={"technology": technologies, "match": match})
+    assert response.status_code == 200
+    assert [project["id"] for project in response.json()["items"]] == expected
+    assert len(xata.requests) == 1
+
+def test_search_by_technology_fills_the_page_past_false_positives(client, xata):
+    for i, technologies in enumerate(["JavaScript", "Java", "JavaScript", "Java, Spring", "JavaScript", "Java"]):
+        xata.add("projects", f"rec_{i}", **{**STORED_PROJECT, "ownerId": {"id": "rec_user"}, "technologies": technologies})
+
+    pages, cursor = [], None
+    while True:
+        params = {"technology": "Java", "limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/projects/search", params=params).json()
+        pages.append([project["id"] for project in page["items"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    # Cada página tem exatamente `limit` itens, exceto a última, e nenhum projeto se repete
+    assert pages == [["rec_1", "rec_3"], ["rec_5"]]
+    # As consultas seguintes de uma página pedem apenas os itens que faltam
+    assert len(xata.requests) == 4
+
+def test_login_with_unknown_email_still_verifies_a_password(client, xata, monkeypatch):
+    verified = []
+
+    async def verify_dummy(password):
+        verified.append(password)
+
+    monkeypatch.setattr(users.password_hasher, "verify_dummy", verify_dummy)
+    response = client.post("/api/users/login", json={"email": "ninguem@example.com", "password": "segredo123"})
+    # Sem a verificação, o 401 imediato revelaria que o e-mail não está cadastrado
+    assert response.status_code == 401
+    assert verified == ["segredo123"]
@@ -1,7 +1,15 @@
 import os
+import time
+import threading
 from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
 from dotenv import load_dotenv
+import httpx
+from requests.adapters import HTTPAdapter
 from xata.client import XataClient
+from xata.errors import RateLimitError, UnauthorizedError, XataServerError
+
+from codespark_common.metrics import registry
 
 # Caminho do projeto raiz (um nível acima do diretório atual)
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -17,20 +25,311 @@ XATA_DATABASE_URL = os.getenv("XATA_DATABASE_URL")
 if not XATA_API_KEY or not XATA_DATABASE_URL:
     raise ValueError("As variáveis de ambiente XATA_API_KEY e XATA_DATABASE_URL são obrigatórias")
 
-# Função para obter cliente Xata
-@contextmanager
-def get_xata_client():
+# Configurações do pool de conexões HTTP do Xata (o padrão acompanha o tamanho do
+# threadpool do FastAPI, onde as rotas síncronas são executadas)
+XATA_POOL_CONNECTIONS = int(os.getenv("XATA_POOL_CONNECTIONS", "4"))
+XATA_POOL_MAXSIZE = int(os.getenv("XATA_POOL_MAXSIZE", "40"))
+XATA_MAX_RETRIES = int(os.getenv("XATA_MAX_RETRIES", "0"))
+XATA_CONNECT_TIMEOUT = float(os.getenv("XATA_CONNECT_TIMEOUT", "5"))
+XATA_READ_TIMEOUT = float(os.getenv("XATA_READ_TIMEOUT", "30"))
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """
+    Adaptador HTTP que aplica um timeout padrão, já que o SDK do Xata não informa
+    timeout nas suas solicitações.
+    """
+    def __init__(self, *args, timeout=None, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+xata_request_duration = registry.histogram("xata_request_duration_seconds", "Latência das solicitações ao Xata", ("status",))
+
+class XataMetrics:
+    """
+    Métricas das solicitações HTTP feitas ao Xata, registradas por um hook das sessões.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+
+    def record_response(self, response, *args, **kwargs):
+        self.record(response.status_code, response.elapsed.total_seconds())
+
+    def record(self, status_code: int, seconds: float):
+        xata_request_duration.observe(seconds, f"{status_code // 100}xx")
+        with self._lock:
+            self.requests += 1
+            self.total_seconds += seconds
+            if status_code >= 500 or status_code == 429:
+                self.errors += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "avg_latency_ms": round(self.total_seconds / self.requests * 1000, 2) if self.requests else 0.0,
+            }
+
+xata_metrics = XataMetrics()
+
+# Clientes compartilhados por todo o processo, criados no ciclo de vida da aplicação
+_xata_client: Optional[XataClient] = None
+_async_xata_client: Optional["AsyncXataClient"] = None
+_xata_client_lock = threading.Lock()
+
+def _namespace_sessions(client: XataClient):
+    """
+    Sessões HTTP de cada namespace do SDK (records, data, table, ...).
+    """
+    return [value.session for value in vars(client).values() if hasattr(value, "session")]
+
+def create_xata_client() -> XataClient:
+    """
+    Cria um cliente Xata com pool de conexões keep-alive, timeouts e métricas
+    configurados em todas as sessões HTTP dos namespaces.
+    """
     client = XataClient(
         api_key=XATA_API_KEY,
         db_url=XATA_DATABASE_URL
     )
+    for session in _namespace_sessions(client):
+        adapter = TimeoutHTTPAdapter(
+            pool_connections=XATA_POOL_CONNECTIONS,
+            pool_maxsize=XATA_POOL_MAXSIZE,
+            max_retries=XATA_MAX_RETRIES,
+            timeout=(XATA_CONNECT_TIMEOUT, XATA_READ_TIMEOUT),
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.hooks["response"].append(xata_metrics.record_response)
+    return client
+
+def init_xata_client() -> XataClient:
+    """
+    Inicializa o cliente compartilhado (idempotente).
+    """
+    global _xata_client
+    with _xata_client_lock:
+        if _xata_client is None:
+            _xata_client = create_xata_client()
+        return _xata_client
+
+def close_xata_client():
+    """
+    Fecha as conexões do cliente compartilhado.
+    """
+    global _xata_client
+    with _xata_client_lock:
+        if _xata_client is not None:
+            for session in _namespace_sessions(_xata_client):
+                session.close()
+            _xata_client = None
+
+class XataResponse(dict):
+    """
+    Resposta do cliente assíncrono, compatível com o `ApiResponse` do SDK: o corpo
+    JSON como dicionário, mais o status e os dados de paginação.
+    """
+    def __init__(self, response: httpx.Response):
+        super().__init__(response.json() if response.content else {})
+        self.status_code = response.status_code
+
+    def is_success(self) -> bool:
+        return 200 <= self.status_code < 300
+
+    def get_cursor(self) -> Optional[str]:
+        return (self.get("meta") or {}).get("page", {}).get("cursor")
+
+    def has_more_results(self) -> bool:
+        return (self.get("meta") or {}).get("page", {}).get("more", False)
+
+class AsyncRecords:
+    """
+    Operações de registros (equivalente assíncrono de `XataClient.records()`).
+    """
+    def __init__(self, client: "AsyncXataClient"):
+        self.client = client
+
+    async def get(self, table_name: str, record_id: str, columns: Optional[List[str]] = None) -> XataResponse:
+        return await self.client.request("GET", f"/tables/{table_name}/data/{record_id}", columns=columns)
+
+    async def insert(self, table_name: str, record: Dict[str, Any], columns: Optional[List[str]] = None) -> XataResponse:
+        return await self.client.request("POST", f"/tables/{table_name}/data", record, columns=columns)
+
+    async def update(self, table_name: str, record_id: str, record: Dict[str, Any], columns: Optional[List[str]] = None) -> XataResponse:
+        return await self.client.request("PATCH", f"/tables/{table_name}/data/{record_id}", record, columns=columns)
+
+    async def delete(self, table_name: str, record_id: str) -> XataResponse:
+        return await self.client.request("DELETE", f"/tables/{table_name}/data/{record_id}")
+
+    async def transaction(self, operations: List[Dict[str, Any]]) -> XataResponse:
+        """
+        Executa várias operações atomicamente em uma única solicitação. Em caso de
+        falha, nenhuma é aplicada e `errors` indica o índice da operação que falhou.
+        """
+        return await self.client.request("POST", "/transaction", {"operations": operations})
+
+class AsyncSearchAndFilter:
+    """
+    Consultas (equivalente assíncrono de `XataClient.data()`).
+    """
+    def __init__(self, client: "AsyncXataClient"):
+        self.client = client
+
+    async def query(self, table_name: str, payload: Optional[Dict[str, Any]] = None) -> XataResponse:
+        return await self.client.request("POST", f"/tables/{table_name}/query", payload or {})
+
+class AsyncXataClient:
+    """
+    Cliente assíncrono do Xata sobre um `httpx.AsyncClient` com pool de conexões,
+    para uso nas rotas `async def` sem bloquear o event loop. Reutiliza a configuração
+    (workspace, região, banco, branch e cabeçalhos) do cliente síncrono.
+    """
+    def __init__(self, sync_client: XataClient):
+        config = sync_client.get_config()
+        db_branch_name = sync_client.get_db_branch_name()
+        self._http = httpx.AsyncClient(
+            base_url=f"https://{config['workspaceId']}.{config['region']}.{config['domain_workspace']}/db/{db_branch_name}",
+            headers=sync_client.get_headers(),
+            timeout=httpx.Timeout(XATA_READ_TIMEOUT, connect=XATA_CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=XATA_POOL_MAXSIZE, max_keepalive_connections=XATA_POOL_MAXSIZE),
+        )
+        self._records = AsyncRecords(self)
+        self._search_and_filter = AsyncSearchAndFilter(self)
+
+    def records(self) -> AsyncRecords:
+        return self._records
+
+    def data(self) -> AsyncSearchAndFilter:
+        return self._search_and_filter
+
+    async def request(self, method: str, url_path: str, payload: Optional[Dict[str, Any]] = None, columns: Optional[List[str]] = None) -> XataResponse:
+        """
+        Executa uma solicitação ao Xata, levantando as mesmas exceções do SDK síncrono.
+        """
+        params = {"columns": ",".join(columns)} if columns is not None else None
+        start = time.perf_counter()
+        response = await self._http.request(method, url_path, json=payload, params=params)
+        xata_metrics.record(response.status_code, time.perf_counter() - start)
+
+        if response.status_code == 429:
+            raise RateLimitError(f"code: {response.status_code}, rate limited: {response.text}")
+        if response.status_code == 401:
+            raise UnauthorizedError(f"code: {response.status_code}, unauthorized: {response.text}")
+        elif response.status_code >= 500:
+            raise XataServerError(response.status_code, response.text)
+
+        return XataResponse(response)
+
+    async def close(self):
+        await self._http.aclose()
+
+# Quantidade de registros vinculados retornados junto ao registro pai (mesmo padrão
+# de tamanho de página das consultas do Xata)
+XATA_LINKED_RECORDS_LIMIT = int(os.getenv("XATA_LINKED_RECORDS_LIMIT", "20"))
+
+def reverse_link(table_name: str, link_column: str, alias: str, limit: int = XATA_LINKED_RECORDS_LIMIT) -> Dict[str, Any]:
+    """
+    Coluna de consulta que expande os registros de `table_name` que apontam para o
+    registro consultado via `link_column`, evitando uma segunda consulta.
+    O resultado fica em `record[alias]["records"]`.
+    """
+    return {"name": f"<-{table_name}.{link_column}", "columns": ["*"], "as": alias, "limit": limit}
+
+def link_id(value) -> Optional[str]:
+    """
+    Identificador de uma coluna de vínculo, retornada pelo Xata como `{"id": ...}`.
+    """
+    return value.get("id") if isinstance(value, dict) else value
+
+def page_params(limit: int, cursor: Optional[str] = None, skip: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Parâmetros de paginação de uma consulta: cursor nativo do Xata quando informado,
+    ou offset (modo legado, mais lento quanto mais profunda a página).
+    """
+    if cursor:
+        return {"size": limit, "after": cursor}
+    if skip:
+        return {"size": limit, "offset": skip}
+    return {"size": limit}
+
+def next_page_cursor(response: XataResponse) -> Optional[str]:
+    """
+    Cursor da próxima página, ou None se esta for a última.
+    """
+    return response.get_cursor() if response.has_more_results() else None
+
+async def record_exists(db: AsyncXataClient, table_name: str, record_id: str) -> bool:
+    """
+    Verifica se um registro existe. Usado apenas no caminho de falha, para
+    diferenciar um vínculo inválido de outros erros.
+    """
+    response = await db.records().get(table_name, record_id, columns=["id"])
+    return response.is_success()
+
+async def init_async_xata_client() -> AsyncXataClient:
+    """
+    Inicializa o cliente assíncrono compartilhado (idempotente).
+    """
+    global _async_xata_client
+    if _async_xata_client is None:
+        _async_xata_client = AsyncXataClient(init_xata_client())
+    return _async_xata_client
+
+async def close_async_xata_client():
+    global _async_xata_client
+    if _async_xata_client is not None:
+        await _async_xata_client.close()
+        _async_xata_client = None
+
+# Função para obter cliente Xata
+@contextmanager
+def get_xata_client():
+    yield _xata_client or init_xata_client()
+
+async def check_xata_health() -> Dict[str, Any]:
+    """
+    Verifica a conectividade com o Xata com uma consulta mínima.
+    """
+    start = time.perf_counter()
     try:
-        yield client
-    finally:
-        # O cliente Xata não tem um método de desconexão explícito
-        pass
+        xata = await init_async_xata_client()
+        response = await xata.data().query("users", {"columns": ["id"], "page": {"size": 1}})
+        healthy = response.is_success()
+        error = None if healthy else f"status {response.status_code}"
+    except Exception as e:
+        healthy, error = False, str(e)
+    return {
+        "healthy": healthy,
+        "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+        "error": error,
+    }
+
+def get_xata_stats() -> Dict[str, Any]:
+    return {
+        **xata_metrics.get_stats(),
+        "pool_maxsize": XATA_POOL_MAXSIZE,
+        "connect_timeout": XATA_CONNECT_TIMEOUT,
+        "read_timeout": XATA_READ_TIMEOUT,
+        "initialized": _xata_client is not None,
+        "async_initialized": _async_xata_client is not None,
+    }
 
 # Função para utilizar como dependência no FastAPI
 def get_db():
     with get_xata_client() as xata:
-        yield xata 
\ No newline at end of file
+        yield xata
+
+async def get_async_db():
+    """
+    Dependência que injeta o cliente assíncrono compartilhado do Xata.
+    """
+    yield await init_async_xata_client()
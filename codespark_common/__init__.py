@@ -0,0 +1,4 @@
+"""
+Módulos compartilhados pelo backend e pelo serviço CrewAI: métricas, rastreamento e
+agrupamento de chamadas concorrentes.
+"""
@@ -0,0 +1,300 @@
+import re
+import time
+import threading
+import weakref
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Limites padrão dos buckets de latência, em segundos
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_INVALID_NAME_CHARS = re.compile(r"[^a-zA-Z0-9_:]")
+
+def metric_name(name: str) -> str:
+    return _INVALID_NAME_CHARS.sub("_", name)
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels: Sequence[Tuple[str, Any]]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+class _ShardOwner:
+    """Vive no thread-local da thread dona da partição; é coletado quando ela termina."""
+    __slots__ = ("__weakref__",)
+
+class ShardedMetric:
+    """
+    Base das métricas: cada thread escreve apenas na sua própria partição (sem lock
+    no caminho de registro) e a leitura soma as partições de todas as threads.
+
+    Quando uma thread termina, sua partição é somada a um acumulado das threads
+    encerradas, para que threads de curta duração não acumulem partições.
+    """
+    type_name = "untyped"
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = ()):
+        self.name = metric_name(name)
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: List[Dict[Tuple, Any]] = []
+        self._retired: Dict[Tuple, Any] = {}
+        # Reentrante: o finalizador de uma thread encerrada pode rodar durante uma coleta
+        self._lock = threading.RLock()
+
+    def _shard(self) -> Dict[Tuple, Any]:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            owner = self._local.owner = _ShardOwner()
+            with self._lock:
+                self._shards.append(shard)
+            weakref.finalize(owner, self._retire, shard)
+        return shard
+
+    def _retire(self, shard: Dict[Tuple, Any]):
+        with self._lock:
+            # Pela identidade: `remove` compara por igualdade e poderia retirar a
+            # partição de outra thread, viva, com as mesmas contagens
+            index = next(i for i, s in enumerate(self._shards) if s is shard)
+            del self._shards[index]
+            self._merge(self._retired, shard)
+
+    def _merge(self, totals: Dict[Tuple, Any], shard: Dict[Tuple, Any]):
+        raise NotImplementedError
+
+    def _totals(self) -> Dict[Tuple, Any]:
+        totals: Dict[Tuple, Any] = {}
+        with self._lock:
+            shards = [self._retired.copy()] + [shard.copy() for shard in self._shards]
+        for shard in shards:
+            self._merge(totals, shard)
+        return totals
+
+    def _labels(self, values: Tuple) -> List[Tuple[str, Any]]:
+        return list(zip(self.labelnames, values))
+
+    def collect(self) -> List[str]:
+        raise NotImplementedError
+
+class Counter(ShardedMetric):
+    """Contador monotônico, ex: `requests.inc("GET", "/api/users")`."""
+    type_name = "counter"
+
+    def inc(self, *labelvalues, amount: float = 1.0):
+        shard = self._shard()
+        shard[labelvalues] = shard.get(labelvalues, 0.0) + amount
+
+    def _merge(self, totals: Dict[Tuple, float], shard: Dict[Tuple, float]):
+        for labels, value in shard.items():
+            totals[labels] = totals.get(labels, 0.0) + value
+
+    def collect(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self._labels(labels))} {_format_value(value)}" for labels, value in self._totals().items()]
+
+class Gauge(Counter):
+    """Valor que sobe e desce, ex: requisições em andamento."""
+    type_name = "gauge"
+
+    def dec(self, *labelvalues, amount: float = 1.0):
+        self.inc(*labelvalues, amount=-amount)
+
+class Histogram(ShardedMetric):
+    """
+    Histograma com buckets cumulativos (`le`), soma e contagem por combinação de labels.
+    """
+    type_name = "histogram"
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labelvalues):
+        shard = self._shard()
+        # Contagens por bucket (o último é +Inf) seguidas da soma dos valores
+        counts = shard.get(labelvalues)
+        if counts is None:
+            counts = shard[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def time(self, *labelvalues):
+        return _Timer(self, labelvalues)
+
+    def _merge(self, totals: Dict[Tuple, List[float]], shard: Dict[Tuple, List[float]]):
+        for labels, counts in shard.items():
+            current = totals.get(labels)
+            totals[labels] = list(counts) if current is None else [a + b for a, b in zip(current, counts)]
+
+    def collect(self) -> List[str]:
+        lines = []
+        for labels, counts in self._totals().items():
+            base = self._labels(labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts[:-1]):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(base + [('le', _format_value(bound))])} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(base)} {_format_value(counts[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(base)} {cumulative}")
+        return lines
+
+class _Timer:
+    __slots__ = ("histogram", "labelvalues", "start")
+
+    def __init__(self, histogram: Histogram, labelvalues: Tuple):
+        self.histogram = histogram
+        self.labelvalues = labelvalues
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labelvalues)
+
+class StatsCollector:
+    """
+    Expõe como métricas os valores numéricos de uma função `get_stats()` já existente,
+    lida apenas no momento da coleta. Dicionários aninhados viram sufixos do nome (ou
+    o valor de `label`, no primeiro nível) e textos viram `nome{value="..."} 1`.
+    """
+    def __init__(self, prefix: str, get_stats: Callable[[], Dict[str, Any]], description: str, label: Optional[str] = None):
+        self.prefix = metric_name(prefix)
+        self.get_stats = get_stats
+        self.description = description
+        self.label = label
+
+    def _flatten(self, stats: Dict[str, Any], name: str, labels: List[Tuple[str, Any]], samples: Dict[str, List], depth: int = 0):
+        for key, value in stats.items():
+            if isinstance(value, dict):
+                if self.label and depth == 0:
+                    self._flatten(value, name, labels + [(self.label, key)], samples, depth + 1)
+                else:
+                    self._flatten(value, f"{name}_{metric_name(key)}", labels, samples, depth + 1)
+            elif isinstance(value, (bool, int, float)):
+                samples.setdefault(f"{name}_{metric_name(key)}", []).append((labels, float(value)))
+            elif isinstance(value, str):
+                samples.setdefault(f"{name}_{metric_name(key)}", []).append((labels + [("value", value)], 1.0))
+
+    def collect(self) -> List[str]:
+        samples: Dict[str, List] = {}
+        self._flatten(self.get_stats(), self.prefix, [], samples)
+        lines = []
+        for name, values in samples.items():
+            lines.append(f"# HELP {name} {self.description}")
+            lines.append(f"# TYPE {name} untyped")
+            lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in values)
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[ShardedMetric] = []
+        self._collectors: List[StatsCollector] = []
+
+    def counter(self, name: str, description: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, description, labelnames))
+
+    def gauge(self, name: str, description: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._add(Gauge(name, description, labelnames))
+
+    def histogram(self, name: str, description: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, description, labelnames, buckets))
+
+    def register_stats(self, prefix: str, get_stats: Callable[[], Dict[str, Any]], description: str, label: Optional[str] = None):
+        self._collectors.append(StatsCollector(prefix, get_stats, description, label))
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """
+        Gera todas as métricas no formato de texto do Prometheus.
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.collect())
+        for collector in self._collectors:
+            try:
+                lines.extend(collector.collect())
+            except Exception as e:
+                # Uma fonte indisponível (ex: cliente ainda não iniciado) não impede as demais
+                lines.append(f"# Erro ao coletar {collector.prefix}: {_escape(e)}")
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+# Métricas HTTP, registradas pelo MetricsMiddleware
+http_requests = registry.counter("http_requests_total", "Requisições HTTP concluídas", ("method", "route", "status"))
+http_request_duration = registry.histogram("http_request_duration_seconds", "Latência das requisições HTTP", ("method", "route"))
+http_requests_in_flight = registry.gauge("http_requests_in_flight", "Requisições HTTP em andamento", ("method",))
+
+class RouteResolver:
+    """
+    Identifica a rota de uma requisição pelo seu modelo (ex: `/api/users/{user_id}`),
+    não pelo caminho concreto, para manter limitada a cardinalidade de métricas e spans.
+    """
+    def __init__(self):
+        self._route_paths: Dict[Any, str] = {}
+
+    def __call__(self, scope) -> str:
+        route = scope.get("route")
+        if route is not None:
+            return route.path
+        # O roteador registra no escopo apenas o endpoint; o modelo da rota é obtido
+        # das rotas da aplicação e guardado para as próximas requisições
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        path = self._route_paths.get(endpoint)
+        if path is None:
+            app = scope.get("app")
+            for candidate in getattr(app, "routes", ()):
+                if getattr(candidate, "endpoint", None) is endpoint:
+                    path = candidate.path
+                    break
+            path = self._route_paths[endpoint] = path or "unmatched"
+        return path
+
+class MetricsMiddleware:
+    """
+    Mede latência, status e requisições em andamento de cada rota.
+    """
+    def __init__(self, app):
+        self.app = app
+        self.route_path = RouteResolver()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope.get("method", "")
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc(method)
+        start_time = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = self.route_path(scope)
+            http_request_duration.observe(time.perf_counter() - start_time, method, route)
+            http_requests.inc(method, route, str(status_code))
+            http_requests_in_flight.dec(method)
@@ -0,0 +1,45 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+class SingleFlight:
+    """
+    Agrupa chamadas concorrentes com a mesma chave em uma única execução.
+
+    A primeira chamada para uma chave inicia o trabalho; as chamadas seguintes, enquanto
+    ele ainda estiver em andamento, aguardam o mesmo resultado (ou a mesma exceção).
+    O trabalho é protegido com `asyncio.shield`, então o cancelamento de um cliente
+    não interrompe a execução compartilhada pelos demais.
+    """
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.stats = {
+            "executions": 0,
+            "coalesced": 0,
+        }
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+            self.stats["executions"] += 1
+        else:
+            self.stats["coalesced"] += 1
+
+        return await asyncio.shield(future)
+
+    def _forget(self, key: str, future: asyncio.Future):
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+        # Evitar avisos de exceção não recuperada quando todos os clientes cancelaram
+        if not future.cancelled():
+            future.exception()
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.stats["executions"] + self.stats["coalesced"]
+        return {
+            **self.stats,
+            "in_flight": len(self._in_flight),
+            "coalesced_ratio": self.stats["coalesced"] / total if total else 0.0,
+        }
@@ -0,0 +1,193 @@
+import os
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from codespark_common.metrics import RouteResolver
+
+try:
+    from opentelemetry import context as otel_context, trace
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+    from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
+except ImportError:  # OpenTelemetry é opcional: sem ele, o rastreamento fica desativado
+    trace = None
+
+# Configurações do rastreamento
+# TRACING_EXPORTER: "file" grava um span JSON por linha em TRACING_FILE; "console" escreve no stdout
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "file").lower()
+TRACING_FILE = os.getenv("TRACING_FILE", "logs/traces.jsonl")
+
+# Provedor próprio (e não o global do OpenTelemetry, que bibliotecas como a CrewAI
+# configuram para a sua própria telemetria)
+_provider = None
+_tracer = None
+_propagator = TraceContextTextMapPropagator() if trace is not None else None
+
+def init_tracing(service_name: str):
+    """
+    Inicializa o rastreamento, se habilitado e com o OpenTelemetry instalado. Chamadas
+    repetidas (ex: em cada worker) não têm efeito.
+    """
+    global _provider, _tracer
+    if _provider is not None or not TRACING_ENABLED or trace is None:
+        return
+    if TRACING_EXPORTER == "console":
+        exporter = ConsoleSpanExporter()
+    else:
+        os.makedirs(os.path.dirname(TRACING_FILE) or ".", exist_ok=True)
+        exporter = ConsoleSpanExporter(
+            out=open(TRACING_FILE, "a", encoding="utf-8"),
+            formatter=lambda span: span.to_json(indent=None) + "\n",
+        )
+    _provider = TracerProvider(resource=Resource.create({"service.name": os.getenv("OTEL_SERVICE_NAME", service_name)}))
+    _provider.add_span_processor(BatchSpanProcessor(exporter))
+    _tracer = _provider.get_tracer("codespark")
+
+def flush_tracing():
+    if _provider is not None:
+        _provider.force_flush()
+
+def shutdown_tracing():
+    global _provider, _tracer
+    if _provider is not None:
+        _provider.shutdown()
+        _provider = None
+        _tracer = None
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Executa o bloco dentro de um span filho do contexto atual. Exceções são
+    registradas no span. Sem rastreamento ativo, não faz nada.
+    """
+    if _tracer is None:
+        yield None
+        return
+    with _tracer.start_as_current_span(name, attributes=attributes) as current:
+        yield current
+
+@contextmanager
+def client_span(name: str, **attributes):
+    """
+    Abre um span de cliente para uma chamada HTTP de saída.
+
+    Returns:
+        Tupla (span ou None, cabeçalhos `traceparent`/`tracestate` a enviar na chamada)
+    """
+    if _tracer is None:
+        yield None, {}
+        return
+    current = _tracer.start_span(name, kind=SpanKind.CLIENT, attributes=attributes)
+    headers: Dict[str, str] = {}
+    _propagator.inject(headers, context=trace.set_span_in_context(current))
+    try:
+        yield current, headers
+    except BaseException as e:
+        end_span(current, e)
+        raise
+    else:
+        current.end()
+
+def start_span(name: str, context=None, **attributes):
+    """
+    Inicia um span encerrado manualmente com `end_span`, para operações cujo início e
+    fim ocorrem em callbacks distintos (ex: chamadas ao LLM).
+    """
+    if _tracer is None:
+        return None
+    return _tracer.start_span(name, context=context, attributes=attributes)
+
+def end_span(current, error: Optional[BaseException] = None, **attributes):
+    if current is None:
+        return
+    if attributes:
+        current.set_attributes(attributes)
+    if error is not None:
+        current.record_exception(error)
+        current.set_status(Status(StatusCode.ERROR, str(error)))
+    current.end()
+
+def record_span(name: str, start_time: float, end_time: float, context=None, **attributes):
+    """
+    Registra um span já concluído a partir dos instantes (em `time.time()`) de início e
+    fim, ex: o tempo de espera na fila do executor, medido em outro processo.
+    """
+    if _tracer is None:
+        return
+    current = _tracer.start_span(name, context=context, attributes=attributes, start_time=int(start_time * 1e9))
+    current.end(end_time=int(end_time * 1e9))
+
+def set_span_attributes(current, **attributes):
+    if current is not None:
+        current.set_attributes(attributes)
+
+def current_context():
+    """
+    Contexto de rastreamento atual, para ser usado como pai de spans criados em outras threads.
+    """
+    if _tracer is None:
+        return None
+    return otel_context.get_current()
+
+def inject_context() -> Dict[str, str]:
+    """
+    Serializa o contexto atual em um dicionário simples (`traceparent`), capaz de
+    atravessar fronteiras de processo, como o pool de processos das gerações.
+    """
+    carrier: Dict[str, str] = {}
+    if _tracer is not None:
+        _propagator.inject(carrier)
+    return carrier
+
+@contextmanager
+def use_context(carrier: Optional[Dict[str, str]]):
+    """
+    Torna atual o contexto serializado por `inject_context`, de forma que os spans
+    criados no bloco sejam filhos do span de origem.
+    """
+    if _tracer is None or not carrier:
+        yield
+        return
+    token = otel_context.attach(_propagator.extract(carrier))
+    try:
+        yield
+    finally:
+        otel_context.detach(token)
+
+class TracingMiddleware:
+    """
+    Cria um span de servidor por requisição HTTP, continuando o trace recebido no
+    cabeçalho `traceparent` quando presente.
+    """
+    def __init__(self, app):
+        self.app = app
+        self.route_path = RouteResolver()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or _tracer is None:
+            return await self.app(scope, receive, send)
+
+        method = scope.get("method", "")
+        carrier = {
+            key.decode("latin-1"): value.decode("latin-1")
+            for key, value in scope.get("headers", [])
+            if key in (b"traceparent", b"tracestate")
+        }
+        attributes = {"http.method": method, "http.target": scope.get("path", "")}
+        with _tracer.start_as_current_span(method, context=_propagator.extract(carrier), kind=SpanKind.SERVER, attributes=attributes) as server_span:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    server_span.set_attribute("http.status_code", message["status"])
+                    if message["status"] >= 500:
+                        server_span.set_status(Status(StatusCode.ERROR))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = self.route_path(scope)
+                server_span.update_name(f"{method} {route}")
+                server_span.set_attribute("http.route", route)
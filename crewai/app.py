@@ -1,18 +1,90 @@
 import os
+import queue
 import uvicorn
-from fastapi import FastAPI, HTTPException
+import time
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Optional
+from fastapi.responses import StreamingResponse
 import json
 import asyncio
 import multiprocessing
-from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
 
-from crew_manager import generate_project_proposal
+from crew_manager import generate_project_proposal_with_telemetry, init_worker
+from executor import GenerationExecutor, ExecutorRejected, ExecutorDraining, DeadlineExceeded, CREW_REQUEST_TIMEOUT
+from proposal_cache import create_proposal_cache, make_cache_key
+from codespark_common.single_flight import SingleFlight
+from schemas import ProjectRequest, ProjectResponse
+from codespark_common.metrics import registry, MetricsMiddleware, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from codespark_common.tracing import init_tracing, shutdown_tracing, inject_context, record_span, TracingMiddleware
+
+# Cache de propostas (LRU local + Redis compartilhado)
+proposal_cache = create_proposal_cache()
+
+# Agrupamento de gerações idênticas em andamento
+generation_flight = SingleFlight()
+
+# Executor gerenciado das gerações (processos ou threads, com fila limitada e prazos)
+# (cada worker pré-constrói o LLM, os agentes e a crew ao iniciar)
+executor = GenerationExecutor(initializer=init_worker)
+
+# Intervalo de verificação dos eventos de progresso no streaming
+STREAM_POLL_INTERVAL = float(os.getenv("STREAM_POLL_INTERVAL", "0.25"))
+
+# Gerenciador de filas compartilhadas com os processos de geração (criado sob demanda)
+progress_manager = None
+
+# Métricas das gerações, a partir da telemetria devolvida pelos workers
+crew_queue_wait = registry.histogram("crew_queue_wait_seconds", "Espera da geração por um worker do executor")
+crew_kickoff_duration = registry.histogram("crew_kickoff_duration_seconds", "Execução completa da crew", ("execution_mode",))
+crew_phase_duration = registry.histogram("crew_phase_duration_seconds", "Duração de cada tarefa da crew", ("task", "agent"))
+crew_parse_duration = registry.histogram("crew_parse_duration_seconds", "Validação e reparo da proposta gerada",
+                                         buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0))
+llm_calls = registry.counter("llm_calls_total", "Chamadas ao LLM por agente", ("agent", "outcome"))
+llm_call_duration = registry.histogram("llm_call_duration_seconds", "Latência das chamadas ao LLM", ("agent",))
+llm_tokens = registry.counter("llm_tokens_total", "Tokens consumidos segundo a CrewAI", ("type",))
+proposal_fallbacks = registry.counter("crew_proposal_fallbacks_total", "Propostas padrão devolvidas (não armazenadas em cache)")
+
+registry.register_stats("crewai_executor", executor.get_stats, "Executor das gerações")
+registry.register_stats("crewai_proposal_cache", proposal_cache.get_stats, "Cache de propostas")
+registry.register_stats("crewai_single_flight", generation_flight.get_stats, "Agrupamento de gerações idênticas")
+
+def record_generation_telemetry(telemetry, submitted_at: float):
+    """
+    Registra nas métricas a telemetria de uma geração concluída no worker.
+    """
+    crew_queue_wait.observe(max(telemetry["started_at"] - submitted_at, 0.0))
+    record_span("executor.queue_wait", submitted_at, max(telemetry["started_at"], submitted_at))
+    if telemetry["kickoff_seconds"] is not None:
+        crew_kickoff_duration.observe(telemetry["kickoff_seconds"], telemetry["execution_mode"])
+    if telemetry["parse_seconds"] is not None:
+        crew_parse_duration.observe(telemetry["parse_seconds"])
+    for phase in telemetry["phases"]:
+        crew_phase_duration.observe(phase["seconds"], phase["task"], phase["agent"])
+    for call in telemetry["llm_calls"]:
+        llm_calls.inc(call["agent"], "success" if call["success"] else "error")
+        llm_call_duration.observe(call["seconds"], call["agent"])
+    for token_type in ("prompt_tokens", "completion_tokens"):
+        if telemetry["usage"].get(token_type):
+            llm_tokens.inc(token_type.replace("_tokens", ""), amount=telemetry["usage"][token_type])
+    if telemetry["fallback"]:
+        proposal_fallbacks.inc()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_tracing("codespark-crewai")
+    executor.start()
+    yield
+    await executor.shutdown()
+    await proposal_cache.close()
+    if progress_manager is not None:
+        progress_manager.shutdown()
+    shutdown_tracing()
 
 app = FastAPI(title="CodeSpark CrewAI Service",
-              description="Serviço de IA para o CodeSpark, utilizando CrewAI para gerar propostas de projeto")
+              description="Serviço de IA para o CodeSpark, utilizando CrewAI para gerar propostas de projeto",
+              lifespan=lifespan)
 
 # Configuração de CORS
 app.add_middleware(
@@ -23,21 +95,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-class ProjectRequest(BaseModel):
-    project_type: str
-    technologies: List[str]
-    additional_info: Optional[str] = None
-
-class ProjectTask(BaseModel):
-    title: str
-    description: str
+# Adicionar middleware de métricas
+app.add_middleware(MetricsMiddleware)
 
-class ProjectResponse(BaseModel):
-    title: str
-    description: str
-    goals: List[str]
-    tasks: List[ProjectTask]
-    technologies: List[str]
+# Adicionar middleware de rastreamento (ativo apenas com TRACING_ENABLED=true)
+app.add_middleware(TracingMiddleware)
 
 @app.get("/")
 async def read_root():
@@ -47,28 +109,171 @@ async def read_root():
 async def health_check():
     return {"status": "healthy"}
 
-# Utilizando ProcessPoolExecutor para processamento paralelo
-executor = ProcessPoolExecutor(max_workers=4)
+@app.get("/cache/stats")
+async def cache_stats():
+    return proposal_cache.get_stats()
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Métricas no formato de texto do Prometheus.
+    """
+    return Response(registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+@app.get("/stats")
+async def stats():
+    return {
+        "cache": proposal_cache.get_stats(),
+        "single_flight": generation_flight.get_stats(),
+        "executor": executor.get_stats(),
+    }
+
+def rejection_error(e: Exception) -> HTTPException:
+    """
+    Converte falhas de admissão e de prazo do executor em respostas HTTP.
+    """
+    if isinstance(e, ExecutorRejected):
+        status_code = 503 if isinstance(e, ExecutorDraining) else 429
+        return HTTPException(status_code=status_code, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    return HTTPException(status_code=504, detail=str(e))
 
 @app.post("/generate", response_model=ProjectResponse)
 async def generate_project(request: ProjectRequest):
     """
     Gera uma proposta de projeto baseada no tipo de projeto e tecnologias especificadas.
+    Propostas já geradas para uma solicitação equivalente são servidas do cache,
+    a menos que `bypass_cache` seja informado. Solicitações equivalentes simultâneas
+    compartilham uma única execução da crew.
     """
-    try:
-        # Executando a geração do projeto em um processo separado para não bloquear
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(
-            executor,
-            generate_project_proposal,
+    cache_key = make_cache_key(request.project_type, request.technologies, request.additional_info)
+    
+    if request.bypass_cache:
+        proposal_cache.record_bypass()
+    else:
+        cached = await proposal_cache.get(cache_key)
+        if cached is not None:
+            return {**cached, "technologies": request.technologies}
+    
+    async def run_generation():
+        # Executando a geração do projeto no executor gerenciado para não bloquear
+        submitted_at = time.time()
+        # O contexto do trace é serializado para atravessar o pool de processos
+        result, telemetry = await executor.run(
+            partial(generate_project_proposal_with_telemetry, trace_context=inject_context()),
             request.project_type,
             request.technologies,
             request.additional_info
         )
-        
+        record_generation_telemetry(telemetry, submitted_at)
+        # A proposta padrão de uma falha transitória não é servida do cache durante todo o TTL
+        if not telemetry["fallback"]:
+            await proposal_cache.set(cache_key, result)
         return result
+    
+    try:
+        result = await generation_flight.do(cache_key, run_generation)
+    except (ExecutorRejected, DeadlineExceeded) as e:
+        raise rejection_error(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao gerar proposta: {str(e)}")
+    
+    return {**result, "technologies": request.technologies}
+
+def format_sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def create_progress_queue():
+    """
+    Cria a fila de eventos de progresso: uma fila comum no modo "thread" ou uma fila
+    compartilhada entre processos no modo "process".
+    """
+    global progress_manager
+    if executor.mode == "thread":
+        return queue.Queue()
+    if progress_manager is None:
+        progress_manager = multiprocessing.Manager()
+    return progress_manager.Queue()
+
+def drain_progress(progress_queue):
+    events = []
+    while True:
+        try:
+            events.append(progress_queue.get_nowait())
+        except queue.Empty:
+            return events
+
+@app.post("/generate/stream")
+async def generate_project_stream(request: ProjectRequest):
+    """
+    Gera uma proposta de projeto transmitindo o progresso via Server-Sent Events.
+
+    Emite um evento `progress` a cada tarefa concluída da crew, com os campos da proposta
+    já disponíveis (título, objetivos, tarefas), seguido de um evento `result` com a
+    proposta completa ou de um evento `error` em caso de falha.
+    """
+    cache_key = make_cache_key(request.project_type, request.technologies, request.additional_info)
+    
+    if request.bypass_cache:
+        proposal_cache.record_bypass()
+        cached = None
+    else:
+        cached = await proposal_cache.get(cache_key)
+    
+    progress_queue = None
+    future = None
+    if cached is None:
+        progress_queue = create_progress_queue()
+        submitted_at = time.time()
+        try:
+            future = executor.submit(
+                partial(generate_project_proposal_with_telemetry, trace_context=inject_context()),
+                request.project_type,
+                request.technologies,
+                request.additional_info,
+                progress_queue
+            )
+        except ExecutorRejected as e:
+            raise rejection_error(e)
+    
+    async def event_stream():
+        if cached is not None:
+            yield format_sse("result", {**cached, "technologies": request.technologies})
+            return
+        
+        deadline = time.monotonic() + CREW_REQUEST_TIMEOUT
+        try:
+            while True:
+                done, _ = await asyncio.wait({future}, timeout=STREAM_POLL_INTERVAL)
+                for event in drain_progress(progress_queue):
+                    yield format_sse("progress", event)
+                if done:
+                    break
+                if time.monotonic() >= deadline:
+                    yield format_sse("error", {"detail": f"A geração excedeu o prazo de {CREW_REQUEST_TIMEOUT:.0f}s"})
+                    return
+        finally:
+            # Prazo expirado ou cliente desconectado (o gerador é cancelado ou fechado):
+            # cancelar a geração, que deixa a fila sem chegar a ocupar um worker
+            if not future.done():
+                future.cancel()
+        
+        try:
+            result, telemetry = future.result()
+        except Exception as e:
+            yield format_sse("error", {"detail": f"Erro ao gerar proposta: {str(e)}"})
+            return
+        
+        record_generation_telemetry(telemetry, submitted_at)
+        
+        if not telemetry["fallback"]:
+            await proposal_cache.set(cache_key, result)
+        yield format_sse("result", {**result, "technologies": request.technologies})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 if __name__ == "__main__":
     port = int(os.getenv("PORT", "8001"))
@@ -0,0 +1,72 @@
+"""
+Custo de preparação por solicitação: crew construída a cada geração (LLMs, agentes,
+tarefas e Crew) contra a crew pré-construída por worker, com o LLM local "fake".
+
+Uso (no diretório crewai/):
+    python benchmarks/bench_crew_setup.py [--iterations 50] [--execution-mode sequential]
+"""
+import io
+import os
+import sys
+import time
+import argparse
+import statistics
+from contextlib import redirect_stdout
+
+# O LLM local responde sem rede nem latência: o tempo medido é o da preparação e da CrewAI
+os.environ.setdefault("LLM_PROVIDER", "fake")
+os.environ.setdefault("FAKE_LLM_LATENCY", "0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Pacote compartilhado entre os serviços (`codespark_common`), na raiz do repositório
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import crew_manager
+from crew_manager import build_crew, generate_project_proposal, get_crew
+
+TECHNOLOGIES = ["Python", "FastAPI", "PostgreSQL"]
+
+def reset_worker():
+    """Descarta os LLMs e as crews do worker, como antes do inicializador dos workers."""
+    crew_manager._worker_state.__dict__.clear()
+
+def measure(operation, iterations: int, before=None):
+    samples = []
+    for _ in range(iterations):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        # A CrewAI escreve o progresso dos agentes no stdout (verbose)
+        with redirect_stdout(io.StringIO()):
+            operation()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def report(name: str, samples):
+    print(f"{name:<34} média {statistics.mean(samples) * 1000:>8.2f} ms   mediana {statistics.median(samples) * 1000:>8.2f} ms")
+
+def main(iterations: int, execution_mode: str):
+    def generate():
+        generate_project_proposal("BACKEND", TECHNOLOGIES, execution_mode=execution_mode)
+
+    # Apenas a preparação: construir tudo contra reutilizar a crew do worker
+    report("preparação (por solicitação)", measure(lambda: build_crew(execution_mode), iterations, before=reset_worker))
+    reset_worker()
+    get_crew(execution_mode)
+    report("preparação (crew pré-construída)", measure(lambda: get_crew(execution_mode), iterations))
+
+    # Geração completa com o LLM local
+    per_request = measure(generate, iterations, before=reset_worker)
+    reset_worker()
+    get_crew(execution_mode)
+    prebuilt = measure(generate, iterations)
+    report("geração (por solicitação)", per_request)
+    report("geração (crew pré-construída)", prebuilt)
+    saved = statistics.mean(per_request) - statistics.mean(prebuilt)
+    print(f"Economia por solicitação: {saved * 1000:.2f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--execution-mode", choices=crew_manager.EXECUTION_MODES, default="sequential")
+    args = parser.parse_args()
+    main(args.iterations, args.execution_mode)
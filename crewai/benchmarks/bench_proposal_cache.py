@@ -0,0 +1,77 @@
+"""
+Latência das consultas ao cache de propostas: chave normalizada, acerto local,
+acerto no Redis e ausência, em comparação com uma geração completa da crew.
+
+Uso (no diretório crewai/):
+    python benchmarks/bench_proposal_cache.py [--iterations 5000] [--redis-url redis://localhost:6379]
+
+Sem --redis-url, a camada compartilhada usa o fakeredis em memória.
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from proposal_cache import MemoryCacheBackend, ProposalCache, RedisCacheBackend, make_cache_key
+
+PROPOSAL = {
+    "title": "Plataforma de Cursos",
+    "description": "Plataforma para publicação e acompanhamento de cursos online.",
+    "goals": [f"Objetivo {i}" for i in range(5)],
+    "tasks": [{"title": f"Tarefa {i}", "description": "Descrição da tarefa " * 10} for i in range(8)],
+    "technologies": ["Python", "FastAPI", "PostgreSQL", "React"],
+}
+
+def shared_backend(redis_url):
+    if redis_url:
+        return RedisCacheBackend.from_url(redis_url, key_prefix="codespark:bench:")
+    import fakeredis.aioredis
+    return RedisCacheBackend(fakeredis.aioredis.FakeRedis(), key_prefix="codespark:bench:")
+
+async def measure(operation, iterations: int):
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        await operation(i)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def report(name: str, samples):
+    samples = sorted(samples)
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    print(f"{name:<22} média {statistics.mean(samples) * 1e6:>9.1f} µs   p99 {p99 * 1e6:>9.1f} µs")
+
+async def main(iterations: int, redis_url):
+    technologies = ["React", "python", " FastAPI", "PostgreSQL "]
+
+    async def key_only(i):
+        make_cache_key("fullstack", technologies, "Plataforma  de cursos")
+    report("chave normalizada", await measure(key_only, iterations))
+
+    local_cache = ProposalCache(local=MemoryCacheBackend(), ttl=3600)
+    key = make_cache_key("FULLSTACK", technologies, "Plataforma de cursos")
+    await local_cache.set(key, PROPOSAL)
+    report("acerto local", await measure(lambda i: local_cache.get(key), iterations))
+
+    shared = shared_backend(redis_url)
+    shared_cache = ProposalCache(shared=shared, ttl=3600)
+    await shared_cache.set(key, PROPOSAL)
+    report("acerto no Redis", await measure(lambda i: shared_cache.get(key), iterations))
+
+    two_tier = ProposalCache(local=MemoryCacheBackend(), shared=shared, ttl=3600)
+    report("ausência (2 camadas)", await measure(lambda i: two_tier.get(f"ausente-{i}"), iterations))
+
+    await shared.delete(key)
+    await shared.close()
+    print("Referência: uma geração completa da crew leva dezenas de segundos.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--redis-url", default=None)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations, args.redis_url))
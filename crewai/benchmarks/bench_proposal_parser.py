@@ -0,0 +1,91 @@
+"""
+Precisão e tempo de processamento do parser estruturado (JSON validado por campo)
+contra o parser de texto livre, sobre um corpus de saídas da crew.
+
+Uso (no diretório crewai/):
+    python benchmarks/bench_proposal_parser.py [--iterations 200] [--corpus tests/fixtures/crew_outputs]
+
+O corpus é um diretório com um arquivo `<caso>.txt` por saída e um `expected.json` com
+o título, os objetivos e os títulos das tarefas esperados de cada caso (null = valores
+padrão) e, opcionalmente, as respostas de reparo de cada campo em "repair".
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+from types import SimpleNamespace
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+# Pacote compartilhado entre os serviços (`codespark_common`), na raiz do repositório
+sys.path.insert(0, os.path.dirname(SERVICE_DIR))
+
+from crew_manager import DEFAULT_GOALS, DEFAULT_TASKS, parse_crew_results, parse_proposal
+
+TECHNOLOGIES = ["Python", "FastAPI"]
+FIELDS = ("title", "goals", "task_titles")
+
+class CorpusRepairLLM:
+    """Responde aos pedidos de reparo com as respostas registradas no corpus, sem rede."""
+    SECTION = re.compile(r'O campo "(\w+)"')
+
+    def __init__(self, responses):
+        self.responses = responses or {}
+
+    def invoke(self, prompt):
+        section = self.SECTION.search(prompt).group(1)
+        return SimpleNamespace(content=self.responses.get(section, ""))
+
+def load_corpus(directory: str):
+    with open(os.path.join(directory, "expected.json"), encoding="utf-8") as f:
+        expected = json.load(f)
+    cases = []
+    for name, fields in sorted(expected.items()):
+        with open(os.path.join(directory, f"{name}.txt"), encoding="utf-8") as f:
+            cases.append((name, f.read(), fields))
+    return cases
+
+def correct_fields(proposal, expected) -> int:
+    actual = {
+        "title": proposal["title"],
+        "goals": proposal["goals"],
+        "task_titles": [task["title"] for task in proposal["tasks"]],
+    }
+    defaults = {"title": None, "goals": DEFAULT_GOALS, "task_titles": [task["title"] for task in DEFAULT_TASKS]}
+    return sum(actual[field] == (expected[field] or defaults[field]) for field in FIELDS)
+
+def run_parser(name: str, parse, cases, iterations: int):
+    correct = 0
+    elapsed = 0.0
+    for _, raw, expected in cases:
+        proposal = parse(raw, expected)
+        correct += correct_fields(proposal, expected)
+        start = time.perf_counter()
+        for _ in range(iterations):
+            parse(raw, expected)
+        elapsed += time.perf_counter() - start
+    total = len(cases) * len(FIELDS)
+    per_output = elapsed / (len(cases) * iterations)
+    print(f"{name:<32} precisão {correct:>3}/{total} ({correct / total:6.1%})   {per_output * 1e6:>8.1f} µs por saída")
+
+def main(iterations: int, corpus: str):
+    cases = load_corpus(corpus)
+    print(f"Corpus: {len(cases)} saídas em {corpus}")
+    run_parser("texto livre", lambda raw, expected: parse_crew_results(raw, TECHNOLOGIES), cases, iterations)
+    run_parser("estruturado (sem reparo)", lambda raw, expected: parse_proposal(raw, TECHNOLOGIES), cases, iterations)
+    # O tempo com reparo exclui a latência do LLM, que domina na prática
+    run_parser(
+        "estruturado (com reparo)",
+        lambda raw, expected: parse_proposal(raw, TECHNOLOGIES, llm=CorpusRepairLLM(expected.get("repair"))),
+        cases,
+        iterations,
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--corpus", default=os.path.join(SERVICE_DIR, "tests", "fixtures", "crew_outputs"))
+    args = parser.parse_args()
+    main(args.iterations, args.corpus)
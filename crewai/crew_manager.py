@@ -1,26 +1,255 @@
 from crewai import Agent, Task, Crew, Process
-from langchain_openai import ChatOpenAI
-from typing import List, Dict, Any, Optional
+from langchain_core.callbacks import BaseCallbackHandler
+from pydantic import TypeAdapter, ValidationError
+from typing import List, Dict, Any, Optional, Annotated, Tuple
 import os
+import re
+import json
+import time
+import threading
+from functools import lru_cache
 
-# Configuração do modelo de linguagem
-llm = ChatOpenAI(
-    model="gpt-4-turbo-preview",
-    temperature=0.5,
-)
+from llm_providers import create_llm
+from schemas import StructuredProposal
+from codespark_common.tracing import init_tracing, flush_tracing, span, start_span, end_span, record_span, current_context, use_context
 
-def generate_project_proposal(project_type: str, technologies: List[str], additional_info: Optional[str] = None) -> Dict[str, Any]:
+# Estado pré-construído de cada processo/thread de geração (LLM, agentes, tarefas e crew)
+_worker_state = threading.local()
+
+# Modo de execução das tarefas da crew:
+# - "parallel": tarefas independentes (definição do projeto e análise tecnológica) rodam ao mesmo tempo
+#   e apenas a criação de tarefas aguarda suas dependências
+# - "sequential": todas as tarefas rodam uma após a outra
+EXECUTION_MODES = ("parallel", "sequential")
+CREW_EXECUTION_MODE = os.getenv("CREW_EXECUTION_MODE", "parallel").lower()
+
+# Modelos das tarefas; os campos entre chaves são preenchidos a cada solicitação via `Crew.kickoff(inputs=...)`
+PROJECT_DEFINITION_PROMPT = """
+        Crie uma proposta de projeto {project_type} utilizando as seguintes tecnologias: {tech_str}.
+        {additional_info_block}
+        
+        O projeto deve ser:
+        1. Desafiador mas realizável
+        2. Aplicável ao mundo real
+        3. Focado nas tecnologias solicitadas
+        
+        Entregue:
+        - Um título atraente para o projeto
+        - Uma descrição detalhada
+        - 3-5 objetivos principais
+        """
+
+TECHNOLOGY_ANALYSIS_PROMPT = """
+        Analise as tecnologias solicitadas ({tech_str}) e estruture como elas serão utilizadas no projeto.
+        
+        Considere:
+        1. Como as tecnologias se relacionam entre si
+        2. Quais são as funcionalidades chave que poderão ser implementadas
+        3. Arquitetura geral do sistema
+        
+        Entregue:
+        - Uma lista final das tecnologias principais e complementares necessárias
+        - Recomendações técnicas para a implementação
+        """
+
+TASK_CREATION_PROMPT = """
+        Com base na definição do projeto e na análise tecnológica, crie uma sequência de 5-8 tarefas 
+        de desenvolvimento para guiar o usuário a construir este projeto.
+        
+        Cada tarefa deve:
+        1. Ter um título claro
+        2. Incluir uma descrição detalhada do que deve ser feito
+        3. Ser sequencial e progressiva
+        
+        As tarefas devem começar do básico (configuração, estrutura) e evoluir até os 
+        recursos mais complexos do projeto.
+        
+        Responda apenas com um objeto JSON válido, sem texto adicional, no formato:
+        {{"title": "...", "description": "...", "goals": ["...", "..."],
+          "tasks": [{{"title": "...", "description": "..."}}]}}
+        Utilize o título, a descrição e os objetivos definidos para o projeto.
+        """
+
+# Prompt de reparo de um único campo inválido da proposta estruturada
+SECTION_REPAIR_PROMPT = """
+O campo "{section}" da proposta de projeto abaixo está ausente ou inválido.
+Com base no conteúdo da proposta, responda apenas com um objeto JSON válido no formato:
+{example}
+
+Proposta:
+{raw_output}
+"""
+
+SECTION_EXAMPLES = {
+    "title": '{"title": "Título do projeto"}',
+    "description": '{"description": "Descrição detalhada do projeto"}',
+    "goals": '{"goals": ["Objetivo 1", "Objetivo 2", "Objetivo 3"]}',
+    "tasks": '{"tasks": [{"title": "Título da tarefa", "description": "Descrição da tarefa"}]}',
+}
+
+# Campos da proposta estruturada, validados e reparados de forma independente
+STRUCTURED_SECTIONS = ("title", "description", "goals", "tasks")
+
+# Quantidade máxima de chamadas de reparo ao LLM por campo inválido
+STRUCTURED_REPAIR_ATTEMPTS = int(os.getenv("STRUCTURED_REPAIR_ATTEMPTS", "1"))
+
+# Nomes das tarefas da crew, na ordem de execução
+TASK_NAMES = ("project_definition", "technology_analysis", "task_creation")
+
+# Agente responsável por cada tarefa da crew
+TASK_AGENTS = {
+    "project_definition": "project_manager",
+    "technology_analysis": "tech_specialist",
+    "task_creation": "task_designer",
+}
+
+# Campos da proposta que cada tarefa da crew é capaz de preencher parcialmente
+PARTIAL_FIELDS = {
+    "project_definition": ("title", "description", "goals"),
+    "task_creation": ("title", "description", "goals", "tasks"),
+}
+
+class CrewTelemetry:
     """
-    Gera uma proposta de projeto utilizando CrewAI.
+    Telemetria de uma geração, coletada no worker e devolvida ao processo principal
+    como dicionário simples (`as_dict`), capaz de atravessar o pool de processos.
+    
+    Registra a duração de cada tarefa da crew (da primeira chamada ao LLM do seu agente
+    até a conclusão), cada chamada ao LLM por agente, o consumo de tokens informado
+    pela CrewAI e os tempos de execução da crew e de processamento do resultado.
+    """
+    def __init__(self, execution_mode: str = CREW_EXECUTION_MODE):
+        self.execution_mode = execution_mode
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        # As tarefas assíncronas da crew rodam em threads próprias
+        self._lock = threading.Lock()
+        self._agent_started: Dict[str, float] = {}
+        self.phases: List[Dict[str, Any]] = []
+        self.llm_calls: List[Dict[str, Any]] = []
+        self.kickoff_seconds: Optional[float] = None
+        self.parse_seconds: Optional[float] = None
+        self.usage: Dict[str, int] = {}
+        # Indica que a proposta é a padrão, devolvida quando a saída da crew não pôde ser processada
+        self.fallback = False
+        # Contexto do span da geração, pai dos spans criados nas threads das tarefas
+        self.trace_context = None
+    
+    def llm_call_started(self, agent_name: str):
+        with self._lock:
+            self._agent_started.setdefault(agent_name, time.perf_counter())
+    
+    def llm_call_finished(self, agent_name: str, seconds: float, success: bool):
+        with self._lock:
+            self.llm_calls.append({"agent": agent_name, "seconds": seconds, "success": success})
+    
+    def task_finished(self, task_name: str):
+        agent_name = TASK_AGENTS.get(task_name, "unknown")
+        now = time.perf_counter()
+        with self._lock:
+            started = self._agent_started.get(agent_name, self._start)
+            self.phases.append({"task": task_name, "agent": agent_name, "seconds": now - started})
+        end_time = time.time()
+        record_span("crew.task", end_time - (now - started), end_time, context=self.trace_context, task=task_name or "unknown", agent=agent_name)
+    
+    def record_usage(self, before: Optional[Dict[str, int]], after: Optional[Dict[str, int]]):
+        # `usage_metrics` da CrewAI acumula desde a criação da crew, reutilizada entre gerações
+        before = before or {}
+        self.usage = {key: value - before.get(key, 0) for key, value in (after or {}).items()}
+    
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "execution_mode": self.execution_mode,
+            "started_at": self.started_at,
+            "kickoff_seconds": self.kickoff_seconds,
+            "parse_seconds": self.parse_seconds,
+            "phases": list(self.phases),
+            "llm_calls": list(self.llm_calls),
+            "usage": dict(self.usage),
+            "fallback": self.fallback,
+        }
+
+class LLMInstrumentation(BaseCallbackHandler):
+    """
+    Callback do LangChain que mede as chamadas ao LLM de um agente e as registra na
+    telemetria da geração em andamento no worker (`telemetry`, atribuída a cada geração),
+    com um span por chamada quando o rastreamento está ativo.
+    """
+    def __init__(self, agent_name: str):
+        self.agent_name = agent_name
+        self.telemetry: Optional[CrewTelemetry] = None
+        self._started: Dict[Any, Tuple[float, Any]] = {}
+    
+    def _call_started(self, run_id):
+        context = None
+        if self.telemetry is not None:
+            self.telemetry.llm_call_started(self.agent_name)
+            context = self.telemetry.trace_context
+        self._started[run_id] = (time.perf_counter(), start_span("llm.call", context=context, agent=self.agent_name))
+    
+    def _call_finished(self, run_id, error: Optional[BaseException] = None, **attributes):
+        started, call_span = self._started.pop(run_id, (None, None))
+        end_span(call_span, error, **attributes)
+        if self.telemetry is not None and started is not None:
+            self.telemetry.llm_call_finished(self.agent_name, time.perf_counter() - started, error is None)
+    
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._call_started(run_id)
+    
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._call_started(run_id)
+    
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        # Consumo de tokens informado pelo provedor, quando disponível (ex: OpenAI)
+        token_usage = (getattr(response, "llm_output", None) or {}).get("token_usage") or {}
+        attributes = {f"llm.usage.{key}": value for key, value in token_usage.items() if isinstance(value, int)}
+        self._call_finished(run_id, **attributes)
+    
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._call_finished(run_id, error)
+
+def get_llm(agent_name: str):
+    """
+    Retorna o modelo de linguagem configurado para o agente, criado apenas uma vez por thread.
+    
+    O provedor e o modelo de cada agente são definidos em `llm_providers`
+    (ex: `LLM_PROVIDER=fake` ou `LLM_MODEL_TECH_SPECIALIST=gpt-3.5-turbo`).
+    """
+    llms = getattr(_worker_state, "llms", None)
+    if llms is None:
+        llms = _worker_state.llms = {}
+        _worker_state.instrumentation = {}
+    llm = llms.get(agent_name)
+    if llm is None:
+        llm = llms[agent_name] = create_llm(agent_name)
+        instrumentation = _worker_state.instrumentation[agent_name] = LLMInstrumentation(agent_name)
+        llm.callbacks = [*(llm.callbacks or []), instrumentation]
+    return llm
+
+def attach_telemetry(telemetry: Optional[CrewTelemetry]):
+    """
+    Direciona as medições das chamadas ao LLM desta thread para a geração informada.
+    """
+    for instrumentation in getattr(_worker_state, "instrumentation", {}).values():
+        instrumentation.telemetry = telemetry
+
+def build_crew(execution_mode: str = CREW_EXECUTION_MODE) -> Crew:
+    """
+    Constrói os agentes, as tarefas (a partir dos modelos de prompt) e a crew.
+    
+    A crew resultante é reutilizada por todas as solicitações atendidas pela mesma
+    thread; apenas as entradas das tarefas mudam a cada execução.
     
     Args:
-        project_type: Tipo de projeto (backend, frontend, fullstack)
-        technologies: Lista de tecnologias a serem utilizadas
-        additional_info: Informações adicionais sobre o projeto
-        
-    Returns:
-        Proposta de projeto formatada
+        execution_mode: "parallel" para executar as tarefas independentes simultaneamente,
+            ou "sequential" para executá-las uma após a outra
     """
+    if execution_mode not in EXECUTION_MODES:
+        raise ValueError(f"Modo de execução inválido: {execution_mode}")
+    
+    # No modo paralelo, as tarefas sem dependências rodam de forma assíncrona
+    # e a criação de tarefas aguarda ambas através do seu contexto
+    run_independent_async = execution_mode == "parallel"
     
     # Definição de agentes especializados
     project_manager = Agent(
@@ -30,7 +259,7 @@ def generate_project_proposal(project_type: str, technologies: List[str], additi
         em desenvolvimento de produtos digitais. Sua função é garantir que o projeto seja 
         bem estruturado, com escopo definido e metas claras.""",
         verbose=True,
-        llm=llm,
+        llm=get_llm("project_manager"),
     )
     
     tech_specialist = Agent(
@@ -40,7 +269,7 @@ def generate_project_proposal(project_type: str, technologies: List[str], additi
         solicitadas. Sua função é garantir que as tecnologias sejam aplicadas de forma adequada, 
         seguindo boas práticas e padrões modernos de desenvolvimento.""",
         verbose=True,
-        llm=llm,
+        llm=get_llm("tech_specialist"),
     )
     
     task_designer = Agent(
@@ -50,82 +279,187 @@ def generate_project_proposal(project_type: str, technologies: List[str], additi
         Sua função é criar uma sequência de tarefas que guie o desenvolvedor do básico até a 
         conclusão do projeto completo.""",
         verbose=True,
-        llm=llm,
+        llm=get_llm("task_designer"),
     )
     
-    # Descrição das tecnologias
-    tech_str = ", ".join(technologies)
-    
     # Tarefas
     project_definition = Task(
-        description=f"""
-        Crie uma proposta de projeto {project_type} utilizando as seguintes tecnologias: {tech_str}.
-        {f'Informações adicionais: {additional_info}' if additional_info else ''}
-        
-        O projeto deve ser:
-        1. Desafiador mas realizável
-        2. Aplicável ao mundo real
-        3. Focado nas tecnologias solicitadas
-        
-        Entregue:
-        - Um título atraente para o projeto
-        - Uma descrição detalhada
-        - 3-5 objetivos principais
-        """,
+        description=PROJECT_DEFINITION_PROMPT,
+        expected_output="Título, descrição detalhada e 3-5 objetivos principais do projeto.",
         agent=project_manager,
+        async_execution=run_independent_async,
     )
     
     technology_analysis = Task(
-        description=f"""
-        Analise as tecnologias solicitadas ({tech_str}) e estruture como elas serão utilizadas no projeto.
-        
-        Considere:
-        1. Como as tecnologias se relacionam entre si
-        2. Quais são as funcionalidades chave que poderão ser implementadas
-        3. Arquitetura geral do sistema
-        
-        Entregue:
-        - Uma lista final das tecnologias principais e complementares necessárias
-        - Recomendações técnicas para a implementação
-        """,
+        description=TECHNOLOGY_ANALYSIS_PROMPT,
+        expected_output="Lista das tecnologias necessárias e recomendações técnicas para a implementação.",
         agent=tech_specialist,
+        async_execution=run_independent_async,
     )
     
     task_creation = Task(
-        description=f"""
-        Com base na definição do projeto e na análise tecnológica, crie uma sequência de 5-8 tarefas 
-        de desenvolvimento para guiar o usuário a construir este projeto.
-        
-        Cada tarefa deve:
-        1. Ter um título claro
-        2. Incluir uma descrição detalhada do que deve ser feito
-        3. Ser sequencial e progressiva
-        
-        As tarefas devem começar do básico (configuração, estrutura) e evoluir até os 
-        recursos mais complexos do projeto.
-        """,
+        description=TASK_CREATION_PROMPT,
+        expected_output="Objeto JSON com título, descrição, objetivos e 5-8 tarefas (título e descrição).",
         agent=task_designer,
-        dependencies=[project_definition, technology_analysis]
+        context=[project_definition, technology_analysis],
     )
     
-    # Criação da crew e execução
-    crew = Crew(
+    return Crew(
         agents=[project_manager, tech_specialist, task_designer],
         tasks=[project_definition, technology_analysis, task_creation],
         verbose=2,
         process=Process.sequential,
     )
+
+def get_crew(execution_mode: str = CREW_EXECUTION_MODE) -> Crew:
+    """
+    Retorna a crew pré-construída da thread atual para o modo de execução informado,
+    construindo-a na primeira chamada.
+    """
+    crews = getattr(_worker_state, "crews", None)
+    if crews is None:
+        crews = _worker_state.crews = {}
+    crew = crews.get(execution_mode)
+    if crew is None:
+        crew = crews[execution_mode] = build_crew(execution_mode)
+    return crew
+
+def init_worker():
+    """
+    Inicializador dos processos do executor: pré-constrói o LLM, os agentes e a crew
+    para que as solicitações não paguem esse custo.
+    """
+    init_tracing("codespark-crewai")
+    try:
+        get_crew()
+    except Exception as e:
+        # A construção será tentada novamente na primeira solicitação
+        print(f"Erro ao pré-construir a crew: {e}")
+
+def parse_partial_result(task_name: str, raw_output: str, technologies: List[str]) -> Dict[str, Any]:
+    """
+    Extrai da saída de uma única tarefa os campos da proposta que ela produz.
     
-    result = crew.kickoff()
+    Apenas os campos efetivamente encontrados na saída são retornados: diferente da
+    proposta final, nenhum campo ausente é reparado ou preenchido com valores padrão.
+    """
+    fields = PARTIAL_FIELDS.get(task_name, ())
+    data = extract_json_object(raw_output)
+    if data is not None:
+        partial = {}
+        for field in fields:
+            try:
+                partial[field] = validate_section(field, data.get(field))
+            except ValidationError:
+                pass
+    else:
+        parser = LegacyProposalParser(technologies)
+        parser.feed_text(raw_output)
+        partial = {field: value for field, value in parser.parsed_fields().items() if field in fields}
+    if "goals" in partial:
+        partial["goals"] = partial["goals"][:5]
+    if "tasks" in partial:
+        partial["tasks"] = partial["tasks"][:8]
+    return partial
+
+def task_callback(crew: Crew, technologies: List[str], progress_queue=None, telemetry: Optional[CrewTelemetry] = None):
+    """
+    Cria o callback de tarefas da crew, que registra a conclusão da tarefa na telemetria
+    e publica o progresso na fila informada.
+    
+    A CrewAI sobrescreve os callbacks individuais das tarefas com `Crew.task_callback`,
+    por isso a tarefa concluída é identificada pela própria saída recebida.
+    """
+    def callback(output):
+        index, task_name = next(
+            ((index, name) for index, (name, task) in enumerate(zip(TASK_NAMES, crew.tasks), start=1) if task.output is output),
+            (None, None),
+        )
+        if telemetry is not None:
+            telemetry.task_finished(task_name)
+        if progress_queue is None:
+            return
+        raw_output = getattr(output, "raw_output", None) or str(output)
+        try:
+            partial = parse_partial_result(task_name, raw_output, technologies)
+        except Exception as e:
+            print(f"Erro ao processar resultado parcial: {e}")
+            partial = {}
+        progress_queue.put({
+            "task": task_name,
+            "index": index,
+            "total": len(TASK_NAMES),
+            "partial": partial,
+        })
+    return callback
+
+def generate_project_proposal(
+    project_type: str,
+    technologies: List[str],
+    additional_info: Optional[str] = None,
+    progress_queue=None,
+    execution_mode: Optional[str] = None,
+    telemetry: Optional[CrewTelemetry] = None,
+) -> Dict[str, Any]:
+    """
+    Gera uma proposta de projeto utilizando CrewAI.
+    
+    Args:
+        project_type: Tipo de projeto (backend, frontend, fullstack)
+        technologies: Lista de tecnologias a serem utilizadas
+        additional_info: Informações adicionais sobre o projeto
+        progress_queue: Fila (ex: `multiprocessing.Manager().Queue()`) que recebe um evento
+            a cada tarefa concluída, com os campos da proposta já disponíveis
+        execution_mode: Modo de execução das tarefas ("parallel" ou "sequential");
+            por padrão, utiliza `CREW_EXECUTION_MODE`
+        telemetry: Telemetria preenchida com as durações e chamadas ao LLM desta geração
+        
+    Returns:
+        Proposta de projeto formatada
+    """
+    crew = get_crew(execution_mode or CREW_EXECUTION_MODE)
+    
+    # Descrição das tecnologias
+    tech_str = ", ".join(technologies)
+    
+    # Limpar o estado da execução anterior
+    for task in crew.tasks:
+        task.tools = []
+        task.output = None
+    
+    # Telemetria e publicação do progresso a cada tarefa concluída
+    crew.task_callback = task_callback(crew, technologies, progress_queue, telemetry)
+    attach_telemetry(telemetry)
+    usage_before = dict(crew.usage_metrics or {})
+    
+    # Execução da crew com as entradas desta solicitação
+    started = time.perf_counter()
+    try:
+        with span("crew.kickoff", execution_mode=execution_mode or CREW_EXECUTION_MODE):
+            result = crew.kickoff(inputs={
+                "project_type": project_type,
+                "tech_str": tech_str,
+                "additional_info_block": f"Informações adicionais: {additional_info}" if additional_info else "",
+            })
+    except Exception:
+        attach_telemetry(None)
+        raise
+    if telemetry is not None:
+        telemetry.kickoff_seconds = time.perf_counter() - started
+        telemetry.record_usage(usage_before, crew.usage_metrics)
     
     # Processamento dos resultados
+    started = time.perf_counter()
     try:
-        # Extraindo informações dos resultados
-        final_result = parse_crew_results(result, technologies)
+        # Validando a saída estruturada e reparando apenas os campos inválidos
+        with span("crew.parse"):
+            final_result = parse_proposal(result, technologies, llm=get_llm("task_designer"))
         return final_result
     except Exception as e:
         print(f"Erro ao processar resultados: {e}")
-        # Fallback para resultado padrão em caso de erro
+        # Fallback para resultado padrão em caso de erro (não deve ser armazenado em cache)
+        if telemetry is not None:
+            telemetry.fallback = True
         return {
             "title": f"Projeto {project_type.capitalize()} com {technologies[0]}",
             "description": f"Desenvolva um projeto {project_type} utilizando {tech_str}.",
@@ -139,114 +473,157 @@ def generate_project_proposal(project_type: str, technologies: List[str], additi
             ],
             "technologies": technologies
         }
+    finally:
+        if telemetry is not None:
+            telemetry.parse_seconds = time.perf_counter() - started
+        attach_telemetry(None)
 
-def parse_crew_results(raw_result: str, technologies: List[str]) -> Dict[str, Any]:
+def generate_project_proposal_with_telemetry(*args, trace_context: Optional[Dict[str, str]] = None, **kwargs) -> Tuple[Dict[str, Any], Dict[str, Any]]:
     """
-    Processa os resultados da Crew e formata como proposta de projeto.
+    Executa `generate_project_proposal` coletando a telemetria da geração.
     
-    Na prática, seria necessário um parser mais robusto, mas este é um exemplo simplificado.
+    Args:
+        trace_context: Contexto de rastreamento da solicitação (`codespark_common.tracing.inject_context`),
+            do qual o span da geração é filho, inclusive em outro processo
+    
+    Returns:
+        Tupla (proposta, telemetria como dicionário)
     """
+    telemetry = CrewTelemetry(kwargs.get("execution_mode") or CREW_EXECUTION_MODE)
     try:
-        # Em um cenário real, usaríamos regex ou LLM para extrair informações estruturadas
-        # do texto de resposta da Crew. Esta é uma implementação simplificada.
-        
-        lines = raw_result.strip().split('\n')
-        
-        title = "Novo Projeto"
-        description = ""
-        goals = []
-        tasks = []
-        
-        # Encontrar título
-        for line in lines:
-            if line.strip() and not line.startswith('-') and not line.startswith('#') and len(line.strip()) < 100:
-                title = line.strip()
-                break
-        
-        # Extrair descrição (simplificado)
-        description_start = False
-        description_lines = []
-        for line in lines:
-            if "descrição" in line.lower() or "description" in line.lower():
-                description_start = True
-                continue
-            if description_start and line.strip() and not "objetivo" in line.lower() and not "goal" in line.lower():
-                if line.startswith('-') or line.startswith('#'):
-                    description_start = False
-                else:
-                    description_lines.append(line.strip())
-            elif description_start and ("objetivo" in line.lower() or "goal" in line.lower()):
-                description_start = False
-        
-        description = " ".join(description_lines)
-        
-        # Extrair objetivos
-        in_goals = False
-        for line in lines:
-            if "objetivo" in line.lower() or "goal" in line.lower() or "meta" in line.lower():
-                in_goals = True
-                continue
-            if in_goals and line.strip().startswith('-'):
-                goals.append(line.strip()[2:].strip())
-            elif in_goals and line.strip().startswith('1.'):
-                in_goals = False
-            
-        # Extrair tarefas
-        in_tasks = False
-        current_task = None
+        with use_context(trace_context), span("crew.generate", execution_mode=telemetry.execution_mode):
+            telemetry.trace_context = current_context()
+            result = generate_project_proposal(*args, telemetry=telemetry, **kwargs)
+    finally:
+        # Os workers podem ser encerrados sem aviso; exportar os spans a cada geração
+        flush_tracing()
+    return result, telemetry.as_dict()
+
+# Valores padrão utilizados quando a saída da crew não contém uma seção válida
+DEFAULT_GOALS = [
+    "Desenvolver um projeto completo e funcional",
+    "Implementar todas as tecnologias solicitadas de forma coerente",
+    "Seguir boas práticas de desenvolvimento"
+]
+
+DEFAULT_TASKS = [
+    {"title": "Configuração do projeto", "description": "Configurar ambiente de desenvolvimento e estrutura inicial."},
+    {"title": "Implementação básica", "description": "Implementar as funcionalidades básicas do projeto."},
+    {"title": "Funcionalidades avançadas", "description": "Adicionar recursos avançados e refinar o projeto."},
+    {"title": "Testes e documentação", "description": "Adicionar testes e documentar o projeto."},
+    {"title": "Finalização", "description": "Revisar o código, corrigir bugs e preparar para entrega."}
+]
+
+class LegacyProposalParser:
+    """
+    Parser de passagem única para a saída em texto livre da crew.
+    
+    Cada linha é examinada uma única vez, o que permite alimentá-lo à medida que a
+    saída chega (`feed`) e consultar o resultado parcial a qualquer momento (`result`).
+    """
+    LIST_ITEM = re.compile(r"^(?:[-*•]|\d+[.)])\s+")
+    TASK_HEADING = re.compile(r"^#*\s*(?:tarefa|task)\s*\d+", re.IGNORECASE)
+    TASK_PREFIX = re.compile(r"^#*\s*(?:tarefa|task)\s*\d+\s*[:.)-]?\s*", re.IGNORECASE)
+    TITLE_PREFIX = re.compile(r"^#*\s*(?:título|title)\s*:\s*", re.IGNORECASE)
+    SECTION_KEYWORDS = (
+        ("description", ("descrição", "description")),
+        ("goals", ("objetivo", "goal", "meta")),
+        ("tasks", ("tarefa", "task")),
+    )
+    
+    def __init__(self, technologies: List[str]):
+        self.technologies = technologies
+        self.title = None
+        self.description_lines = []
+        self.goals = []
+        self.tasks = []
+        self.section = None
+    
+    def feed(self, line: str):
+        text = line.replace("**", "").strip()
+        if not text:
+            return
         
-        for line in lines:
-            if "tarefa" in line.lower() or "task" in line.lower():
-                in_tasks = True
-                continue
-            
-            if in_tasks and line.strip():
-                if line.strip().startswith('-') or line.strip().startswith('Task') or any(str(i) in line[:5] for i in range(1, 10)):
-                    if current_task:
-                        tasks.append(current_task)
-                    
-                    parts = line.strip().split(':', 1)
-                    if len(parts) > 1:
-                        title = parts[0].strip('-: 0123456789TasktaskTarefa')
-                        desc = parts[1].strip()
-                    else:
-                        title = line.strip('-: 0123456789TasktaskTarefa')
-                        desc = ""
-                    
-                    current_task = {"title": title, "description": desc}
-                elif current_task:
-                    current_task["description"] += " " + line.strip()
+        is_item = bool(self.LIST_ITEM.match(text)) or (self.section == "tasks" and bool(self.TASK_HEADING.match(text)))
         
-        # Adicionar a última tarefa se existir
-        if current_task:
-            tasks.append(current_task)
+        if not is_item:
+            header = self._match_section(text)
+            if header:
+                self.section, inline = header
+                if inline:
+                    self._add_content(inline, False)
+                return
         
-        # Garantir que temos pelo menos algumas tarefas
-        if len(tasks) < 3:
-            tasks = [
-                {"title": "Configuração do projeto", "description": "Configurar ambiente de desenvolvimento e estrutura inicial."},
-                {"title": "Implementação básica", "description": "Implementar as funcionalidades básicas do projeto."},
-                {"title": "Funcionalidades avançadas", "description": "Adicionar recursos avançados e refinar o projeto."},
-                {"title": "Testes e documentação", "description": "Adicionar testes e documentar o projeto."},
-                {"title": "Finalização", "description": "Revisar o código, corrigir bugs e preparar para entrega."}
-            ]
+        if self.title is None and self.TITLE_PREFIX.match(text):
+            self.title = self.TITLE_PREFIX.sub("", text)
+            return
         
-        # Garantir que temos objetivos
-        if len(goals) < 2:
-            goals = [
-                "Desenvolver um projeto completo e funcional",
-                "Implementar todas as tecnologias solicitadas de forma coerente",
-                "Seguir boas práticas de desenvolvimento"
-            ]
+        if self.title is None and not is_item and not text.startswith("#") and len(text) < 100:
+            self.title = text
+            return
         
+        self._add_content(text, is_item)
+    
+    def feed_text(self, raw: str):
+        for line in raw.splitlines():
+            self.feed(line)
+    
+    def result(self) -> Dict[str, Any]:
+        description = " ".join(self.description_lines)
         return {
-            "title": title,
-            "description": description if description else f"Projeto utilizando {', '.join(technologies)}",
-            "goals": goals[:5],  # Limitando a 5 objetivos
-            "tasks": tasks[:8],  # Limitando a 8 tarefas
-            "technologies": technologies
+            "title": self.title or "Novo Projeto",
+            "description": description if description else f"Projeto utilizando {', '.join(self.technologies)}",
+            "goals": self.goals[:5] if len(self.goals) >= 2 else list(DEFAULT_GOALS),  # Limitando a 5 objetivos
+            "tasks": self.tasks[:8] if len(self.tasks) >= 3 else [dict(task) for task in DEFAULT_TASKS],  # Limitando a 8 tarefas
+            "technologies": self.technologies
         }
-        
+    
+    def parsed_fields(self) -> Dict[str, Any]:
+        """
+        Campos encontrados até o momento, sem os valores padrão de `result`.
+        """
+        fields = {}
+        if self.title:
+            fields["title"] = self.title
+        if self.description_lines:
+            fields["description"] = " ".join(self.description_lines)
+        if self.goals:
+            fields["goals"] = list(self.goals)
+        if self.tasks:
+            fields["tasks"] = [dict(task) for task in self.tasks]
+        return fields
+    
+    def _match_section(self, text: str):
+        key, _, inline = text.lstrip("#").partition(":")
+        key = key.strip().lower()
+        if len(key) > 40:
+            return None
+        for section, keywords in self.SECTION_KEYWORDS:
+            if any(keyword in key for keyword in keywords):
+                return section, inline.strip()
+        return None
+    
+    def _add_content(self, text: str, is_item: bool):
+        if self.section == "description" and not is_item:
+            self.description_lines.append(text)
+        elif self.section == "goals" and is_item:
+            self.goals.append(self.LIST_ITEM.sub("", text).strip())
+        elif self.section == "tasks":
+            if is_item:
+                item = self.TASK_PREFIX.sub("", self.LIST_ITEM.sub("", text))
+                title, _, description = item.partition(":")
+                self.tasks.append({"title": title.strip(), "description": description.strip()})
+            elif self.tasks:
+                self.tasks[-1]["description"] = f"{self.tasks[-1]['description']} {text}".strip()
+
+def parse_crew_results(raw_result: str, technologies: List[str]) -> Dict[str, Any]:
+    """
+    Processa a saída em texto livre da Crew e formata como proposta de projeto.
+    """
+    try:
+        parser = LegacyProposalParser(technologies)
+        parser.feed_text(raw_result)
+        return parser.result()
     except Exception as e:
         print(f"Erro ao analisar resultados: {e}")
         # Retornar uma resposta padrão em caso de erro
@@ -260,4 +637,94 @@ def parse_crew_results(raw_result: str, technologies: List[str]) -> Dict[str, An
                 {"title": "Finalização", "description": "Finalize o projeto e prepare para entrega"}
             ],
             "technologies": technologies
-        } 
\ No newline at end of file
+        }
+
+def extract_json_object(raw: str) -> Optional[Dict[str, Any]]:
+    """
+    Extrai o primeiro objeto JSON da saída do LLM, tolerando texto ou blocos de código ao redor.
+    """
+    start, end = raw.find("{"), raw.rfind("}")
+    if start == -1 or end <= start:
+        return None
+    try:
+        data = json.loads(raw[start:end + 1])
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+@lru_cache(maxsize=None)
+def section_adapter(section: str) -> TypeAdapter:
+    # Construir o validador custa mais que a própria validação: criá-lo uma vez por campo
+    field = StructuredProposal.model_fields[section]
+    return TypeAdapter(Annotated[field.annotation, field])
+
+def validate_section(section: str, value: Any) -> Any:
+    """
+    Valida um único campo da proposta estruturada, lançando `ValidationError` se inválido.
+    """
+    validated = section_adapter(section).validate_python(value)
+    if section == "tasks":
+        return [task.model_dump() for task in validated]
+    return validated
+
+def repair_section(section: str, raw_output: str, llm) -> Any:
+    """
+    Solicita ao LLM apenas o campo inválido da proposta, com base na saída original.
+    """
+    prompt = SECTION_REPAIR_PROMPT.format(
+        section=section,
+        example=SECTION_EXAMPLES[section],
+        raw_output=raw_output,
+    )
+    response = llm.invoke(prompt)
+    content = getattr(response, "content", str(response))
+    # Respostas no formato dos agentes da CrewAI trazem a resposta após "Final Answer:"
+    content = content.split("Final Answer:", 1)[-1]
+    data = extract_json_object(content)
+    if data is None or section not in data:
+        raise ValueError(f"Resposta de reparo sem o campo '{section}'")
+    return validate_section(section, data[section])
+
+def parse_proposal(raw_output: str, technologies: List[str], llm=None, repair_attempts: int = STRUCTURED_REPAIR_ATTEMPTS) -> Dict[str, Any]:
+    """
+    Converte a saída da última tarefa da crew em uma proposta de projeto.
+    
+    A saída JSON é validada campo a campo: apenas os campos inválidos são reparados
+    com uma nova chamada ao LLM (no máximo `repair_attempts` vezes cada) e, se ainda
+    assim falharem, preenchidos pelo parser de texto livre. Saídas sem JSON são
+    tratadas inteiramente pelo parser de texto livre.
+    
+    Args:
+        raw_output: Saída da última tarefa da crew
+        technologies: Lista de tecnologias solicitadas
+        llm: Modelo de linguagem usado no reparo; sem ele, nenhum reparo é tentado
+        repair_attempts: Quantidade máxima de tentativas de reparo por campo
+    """
+    data = extract_json_object(raw_output)
+    if data is None:
+        return parse_crew_results(raw_output, technologies)
+    
+    proposal = {}
+    legacy = None
+    for section in STRUCTURED_SECTIONS:
+        try:
+            proposal[section] = validate_section(section, data.get(section))
+            continue
+        except ValidationError:
+            pass
+        
+        for _ in range(repair_attempts if llm is not None else 0):
+            try:
+                proposal[section] = repair_section(section, raw_output, llm)
+                break
+            except Exception as e:
+                print(f"Erro ao reparar o campo '{section}': {e}")
+        else:
+            if legacy is None:
+                legacy = parse_crew_results(raw_output, technologies)
+            proposal[section] = legacy[section]
+    
+    proposal["goals"] = proposal["goals"][:5]  # Limitando a 5 objetivos
+    proposal["tasks"] = proposal["tasks"][:8]  # Limitando a 8 tarefas
+    proposal["technologies"] = technologies
+    return proposal
@@ -0,0 +1,181 @@
+import os
+import asyncio
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Set
+
+# Modo de execução das gerações:
+# - "process": um processo por geração simultânea (isola a CrewAI, mas custa memória)
+# - "thread": muitas gerações simultâneas em threads coordenadas pelo event loop; adequado
+#   porque o trabalho da crew é dominado pela espera das chamadas ao LLM
+CREW_EXECUTOR_MODE = os.getenv("CREW_EXECUTOR_MODE", "process").lower()
+CREW_MAX_WORKERS = int(os.getenv("CREW_MAX_WORKERS", "0"))
+CREW_MAX_QUEUE = int(os.getenv("CREW_MAX_QUEUE", "16"))
+CREW_REQUEST_TIMEOUT = float(os.getenv("CREW_REQUEST_TIMEOUT", "120"))
+CREW_DRAIN_TIMEOUT = float(os.getenv("CREW_DRAIN_TIMEOUT", "30"))
+CREW_RETRY_AFTER = int(os.getenv("CREW_RETRY_AFTER", "10"))
+
+EXECUTOR_MODES = ("process", "thread")
+
+def default_max_workers(mode: str) -> int:
+    """
+    Quantidade de workers derivada da CPU: um processo por núcleo no modo "process"
+    e várias threads por núcleo no modo "thread".
+    """
+    cpus = os.cpu_count() or 1
+    if mode == "thread":
+        return min(64, cpus * 8)
+    return cpus
+
+class ExecutorRejected(Exception):
+    """Base das rejeições de admissão; informa quando o cliente deve tentar novamente."""
+    def __init__(self, message: str, retry_after: int = CREW_RETRY_AFTER):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class ExecutorSaturated(ExecutorRejected):
+    """Lançada quando todos os workers estão ocupados e a fila está cheia."""
+
+class ExecutorDraining(ExecutorRejected):
+    """Lançada quando o serviço está encerrando e não aceita novas gerações."""
+
+class DeadlineExceeded(Exception):
+    """Lançada quando a geração não termina dentro do prazo da solicitação."""
+
+class GenerationExecutor:
+    """
+    Executor gerenciado das gerações de propostas.
+
+    Limita o trabalho admitido a `max_workers + max_queue` gerações, rejeitando o excesso
+    imediatamente, cancela gerações ainda na fila quando o prazo da solicitação expira
+    e aguarda as gerações em andamento ao encerrar.
+
+    Args:
+        mode: "process" ou "thread"
+        max_workers: Quantidade de gerações executadas simultaneamente (0 = derivada da CPU)
+        max_queue: Quantidade de gerações que podem aguardar por um worker
+        initializer: Função executada ao iniciar cada worker
+    """
+    def __init__(
+        self,
+        mode: str = CREW_EXECUTOR_MODE,
+        max_workers: int = CREW_MAX_WORKERS,
+        max_queue: int = CREW_MAX_QUEUE,
+        initializer: Optional[Callable[[], None]] = None,
+    ):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Modo de executor inválido: {mode}")
+        self.mode = mode
+        self.max_workers = max_workers or default_max_workers(mode)
+        self.max_queue = max_queue
+        self.initializer = initializer
+        self._pool = None
+        self._futures: Set[Future] = set()
+        self._draining = False
+        self._idle: Optional[asyncio.Event] = None
+        self.stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "timeouts": 0,
+            "cancelled_queued": 0,
+        }
+
+    def start(self):
+        if self.mode == "process":
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=self.initializer)
+        else:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="crew-worker",
+                initializer=self.initializer,
+            )
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    def submit(self, fn: Callable[..., Any], *args) -> asyncio.Future:
+        """
+        Admite uma geração e retorna um future do event loop com o seu resultado.
+
+        Raises:
+            ExecutorDraining: se o serviço estiver encerrando
+            ExecutorSaturated: se a capacidade de workers e fila estiver esgotada
+        """
+        if self._draining or self._pool is None:
+            self.stats["rejected"] += 1
+            raise ExecutorDraining("O serviço está encerrando e não aceita novas gerações")
+        if len(self._futures) >= self.max_workers + self.max_queue:
+            self.stats["rejected"] += 1
+            raise ExecutorSaturated("Capacidade de geração esgotada, tente novamente em instantes")
+
+        loop = asyncio.get_running_loop()
+        future = self._pool.submit(fn, *args)
+        self._futures.add(future)
+        self._idle.clear()
+        self.stats["submitted"] += 1
+        future.add_done_callback(lambda done: self._schedule_release(loop, done))
+        return asyncio.wrap_future(future, loop=loop)
+
+    async def run(self, fn: Callable[..., Any], *args, timeout: Optional[float] = CREW_REQUEST_TIMEOUT) -> Any:
+        """
+        Executa uma geração respeitando o prazo informado. Se o prazo expirar enquanto a
+        geração ainda estiver na fila, ela é cancelada sem chegar a ocupar um worker.
+
+        Raises:
+            DeadlineExceeded: se a geração não terminar dentro do prazo
+        """
+        future = self.submit(fn, *args)
+        try:
+            return await asyncio.wait_for(future, timeout=timeout or None)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise DeadlineExceeded(f"A geração excedeu o prazo de {timeout:.0f}s")
+
+    def _schedule_release(self, loop: asyncio.AbstractEventLoop, future: Future):
+        # Executado na thread do worker: a contabilidade é feita no event loop, que pode já
+        # ter sido encerrado se a geração terminou depois do prazo de drenagem
+        if loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._release, future)
+        except RuntimeError:
+            pass
+
+    def _release(self, future: Future):
+        self._futures.discard(future)
+        if future.cancelled():
+            self.stats["cancelled_queued"] += 1
+        elif future.exception() is not None:
+            self.stats["failed"] += 1
+        else:
+            self.stats["completed"] += 1
+        if not self._futures:
+            self._idle.set()
+
+    async def shutdown(self, drain_timeout: float = CREW_DRAIN_TIMEOUT):
+        """
+        Deixa de admitir gerações, aguarda as admitidas por até `drain_timeout` segundos
+        e então encerra os workers, cancelando o que ainda estiver na fila.
+        """
+        self._draining = True
+        if self._pool is None:
+            return
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        running = sum(1 for future in list(self._futures) if future.running())
+        return {
+            **self.stats,
+            "mode": self.mode,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "admitted": len(self._futures),
+            "running": running,
+            "queued": len(self._futures) - running,
+            "draining": self._draining,
+        }
@@ -0,0 +1,123 @@
+import os
+import json
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+# Configuração padrão do modelo de linguagem (pode ser sobrescrita por agente,
+# ex: LLM_MODEL_TECH_SPECIALIST=gpt-3.5-turbo ou LLM_PROVIDER_TASK_DESIGNER=fake)
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai")
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4-turbo-preview")
+LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.5"))
+
+# Configurações do provedor local "fake"
+FAKE_LLM_LATENCY = float(os.getenv("FAKE_LLM_LATENCY", "0"))
+FAKE_LLM_RESPONSES_FILE = os.getenv("FAKE_LLM_RESPONSES_FILE")
+
+# Respostas padrão do provedor "fake", escolhidas pelo papel do agente presente no prompt
+FAKE_RESPONSES = {
+    "Gerente de Projeto": """Plataforma de Trilhas de Estudo
+Descrição:
+Uma aplicação para organizar trilhas de estudo, acompanhar o progresso e compartilhar materiais.
+Objetivos:
+- Cadastrar trilhas e etapas de estudo
+- Acompanhar o progresso de cada usuário
+- Disponibilizar uma API documentada""",
+    "Especialista em Tecnologia": """Tecnologias principais e complementares:
+- Banco de dados relacional para trilhas, etapas e usuários
+- Camada de API com validação de dados
+- Testes automatizados e pipeline de integração contínua""",
+    "Designer de Tarefas": json.dumps({
+        "title": "Plataforma de Trilhas de Estudo",
+        "description": "Uma aplicação para organizar trilhas de estudo, acompanhar o progresso e compartilhar materiais.",
+        "goals": [
+            "Cadastrar trilhas e etapas de estudo",
+            "Acompanhar o progresso de cada usuário",
+            "Disponibilizar uma API documentada",
+        ],
+        "tasks": [
+            {"title": "Configuração inicial", "description": "Configure o repositório, as dependências e o ambiente de desenvolvimento."},
+            {"title": "Modelagem do domínio", "description": "Modele as entidades de trilhas, etapas e usuários."},
+            {"title": "Implementação da API", "description": "Implemente os endpoints de cadastro e consulta das trilhas."},
+            {"title": "Controle de progresso", "description": "Registre a conclusão das etapas por usuário."},
+            {"title": "Testes e validação", "description": "Escreva testes automatizados para os fluxos principais."},
+            {"title": "Publicação do projeto", "description": "Prepare a configuração de deploy e a documentação."},
+        ],
+    }, ensure_ascii=False),
+}
+
+class FakeChatModel(BaseChatModel):
+    """
+    Modelo de linguagem local e determinístico, para testes de carga e benchmarks sem rede.
+
+    Retorna a resposta cuja chave aparece primeiro no prompt (por padrão, o papel do
+    agente, que abre o prompt da CrewAI), após aguardar a latência configurada.
+    """
+    responses: Dict[str, str] = {}
+    default_response: str = "Sem resposta configurada."
+    latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "codespark-fake"
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+
+        prompt = "\n".join(str(message.content) for message in messages)
+        matches = [(prompt.find(key), response) for key, response in self.responses.items() if key in prompt]
+        answer = min(matches)[1] if matches else self.default_response
+        # Formato esperado pelo executor dos agentes da CrewAI
+        content = f"Thought: I now can give a great answer\nFinal Answer: {answer}"
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+# Registro de provedores de LLM: nome -> fábrica(model, temperature)
+_providers: Dict[str, Callable[[str, float], Any]] = {}
+
+def register_provider(name: str):
+    """
+    Decorador para registrar uma fábrica de modelos de linguagem sob um nome.
+    """
+    def decorator(factory: Callable[[str, float], Any]):
+        _providers[name] = factory
+        return factory
+    return decorator
+
+@register_provider("openai")
+def openai_provider(model: str, temperature: float):
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(model=model, temperature=temperature)
+
+@register_provider("fake")
+def fake_provider(model: str, temperature: float):
+    responses = dict(FAKE_RESPONSES)
+    if FAKE_LLM_RESPONSES_FILE:
+        with open(FAKE_LLM_RESPONSES_FILE, encoding="utf-8") as f:
+            responses.update(json.load(f))
+    return FakeChatModel(responses=responses, latency=FAKE_LLM_LATENCY)
+
+def get_llm_config(agent_name: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Resolve provedor, modelo e temperatura de um agente, considerando as variáveis
+    específicas do agente (ex: `LLM_MODEL_TECH_SPECIALIST`) antes das globais.
+    """
+    suffix = f"_{agent_name.upper()}" if agent_name else ""
+    return {
+        "provider": os.getenv(f"LLM_PROVIDER{suffix}", LLM_PROVIDER),
+        "model": os.getenv(f"LLM_MODEL{suffix}", LLM_MODEL),
+        "temperature": float(os.getenv(f"LLM_TEMPERATURE{suffix}", str(LLM_TEMPERATURE))),
+    }
+
+def create_llm(agent_name: Optional[str] = None):
+    """
+    Cria o modelo de linguagem configurado para o agente informado.
+    """
+    config = get_llm_config(agent_name)
+    factory = _providers.get(config["provider"])
+    if factory is None:
+        raise ValueError(f"Provedor de LLM desconhecido: {config['provider']}")
+    return factory(config["model"], config["temperature"])
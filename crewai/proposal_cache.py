@@ -0,0 +1,208 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+
+try:
+    import redis.asyncio as aioredis
+    from redis.exceptions import RedisError
+except ImportError:  # Redis é opcional: sem ele, apenas a camada local é usada
+    aioredis = None
+    RedisError = Exception
+
+# Configurações do cache de propostas
+CACHE_ENABLED = os.getenv("PROPOSAL_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+CACHE_TTL_SECONDS = int(os.getenv("PROPOSAL_CACHE_TTL_SECONDS", "3600"))
+CACHE_MAX_ENTRIES = int(os.getenv("PROPOSAL_CACHE_MAX_ENTRIES", "256"))
+CACHE_KEY_PREFIX = os.getenv("PROPOSAL_CACHE_KEY_PREFIX", "codespark:proposal:")
+REDIS_URL = os.getenv("REDIS_URL")
+
+def make_cache_key(project_type: str, technologies: List[str], additional_info: Optional[str] = None) -> str:
+    """
+    Gera uma chave determinística para uma solicitação de proposta.
+
+    A ordem das tecnologias, maiúsculas/minúsculas e espaços extras não alteram a chave,
+    de modo que solicitações equivalentes compartilham a mesma entrada do cache.
+    """
+    normalized = {
+        "project_type": project_type.strip().upper(),
+        "technologies": sorted({tech.strip().lower() for tech in technologies if tech.strip()}),
+        "additional_info": " ".join((additional_info or "").split()).lower(),
+    }
+    payload = json.dumps(normalized, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class MemoryCacheBackend:
+    """
+    Camada local do cache: LRU em memória com expiração por TTL.
+    """
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    async def set(self, key: str, value: Dict[str, Any], ttl: Optional[int] = None):
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    async def close(self):
+        pass
+
+    def __len__(self):
+        return len(self._entries)
+
+class RedisCacheBackend:
+    """
+    Camada compartilhada do cache, armazenada no Redis.
+
+    Aceita qualquer cliente compatível com `redis.asyncio.Redis`, o que permite usar
+    um Redis local ou um substituto em memória (ex: fakeredis) em testes.
+    """
+    def __init__(self, client, key_prefix: str = CACHE_KEY_PREFIX):
+        self.client = client
+        self.key_prefix = key_prefix
+
+    @classmethod
+    def from_url(cls, url: str, key_prefix: str = CACHE_KEY_PREFIX) -> "RedisCacheBackend":
+        if aioredis is None:
+            raise RuntimeError("O pacote 'redis' é necessário para utilizar o cache compartilhado")
+        return cls(aioredis.from_url(url), key_prefix=key_prefix)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        raw = await self.client.get(self.key_prefix + key)
+        if raw is None:
+            return None
+        return json.loads(raw)
+
+    async def set(self, key: str, value: Dict[str, Any], ttl: Optional[int] = None):
+        await self.client.set(self.key_prefix + key, json.dumps(value), ex=ttl or None)
+
+    async def delete(self, key: str):
+        await self.client.delete(self.key_prefix + key)
+
+    async def close(self):
+        await self.client.close()
+
+class ProposalCache:
+    """
+    Cache de propostas em duas camadas: LRU local (por processo) e Redis (compartilhado).
+
+    Falhas na camada compartilhada nunca interrompem a geração: são contabilizadas
+    e tratadas como ausência no cache.
+    """
+    def __init__(
+        self,
+        local: Optional[MemoryCacheBackend] = None,
+        shared: Optional[RedisCacheBackend] = None,
+        ttl: int = CACHE_TTL_SECONDS,
+        enabled: bool = True,
+    ):
+        self.local = local
+        self.shared = shared
+        self.ttl = ttl
+        self.enabled = enabled
+        self.stats = {
+            "local_hits": 0,
+            "shared_hits": 0,
+            "misses": 0,
+            "bypasses": 0,
+            "sets": 0,
+            "errors": 0,
+        }
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+
+        if self.local is not None:
+            value = await self.local.get(key)
+            if value is not None:
+                self.stats["local_hits"] += 1
+                return value
+
+        if self.shared is not None:
+            try:
+                value = await self.shared.get(key)
+            except (RedisError, OSError, ValueError):
+                self.stats["errors"] += 1
+                value = None
+            if value is not None:
+                self.stats["shared_hits"] += 1
+                # Promover para a camada local
+                if self.local is not None:
+                    await self.local.set(key, value, self.ttl)
+                return value
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: Dict[str, Any]):
+        if not self.enabled:
+            return
+
+        if self.local is not None:
+            await self.local.set(key, value, self.ttl)
+
+        if self.shared is not None:
+            try:
+                await self.shared.set(key, value, self.ttl)
+            except (RedisError, OSError):
+                self.stats["errors"] += 1
+                return
+
+        self.stats["sets"] += 1
+
+    def record_bypass(self):
+        self.stats["bypasses"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        hits = self.stats["local_hits"] + self.stats["shared_hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "enabled": self.enabled,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "local_entries": len(self.local) if self.local is not None else 0,
+            "shared_backend": self.shared is not None,
+            "ttl_seconds": self.ttl,
+        }
+
+    async def close(self):
+        for backend in (self.local, self.shared):
+            if backend is not None:
+                await backend.close()
+
+def create_proposal_cache() -> ProposalCache:
+    """
+    Cria o cache de propostas a partir das variáveis de ambiente.
+
+    A camada Redis só é ativada quando `REDIS_URL` está definida e o pacote `redis` está instalado.
+    """
+    local = MemoryCacheBackend(CACHE_MAX_ENTRIES) if CACHE_MAX_ENTRIES > 0 else None
+    shared = None
+    if REDIS_URL and aioredis is not None:
+        shared = RedisCacheBackend.from_url(REDIS_URL)
+    return ProposalCache(local=local, shared=shared, ttl=CACHE_TTL_SECONDS, enabled=CACHE_ENABLED)
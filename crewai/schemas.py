@@ -0,0 +1,28 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+# Schemas da API de geração
+class ProjectRequest(BaseModel):
+    project_type: str
+    technologies: List[str]
+    additional_info: Optional[str] = None
+    bypass_cache: bool = False
+
+class ProjectTask(BaseModel):
+    title: str
+    description: str
+
+class ProjectResponse(BaseModel):
+    title: str
+    description: str
+    goals: List[str]
+    tasks: List[ProjectTask]
+    technologies: List[str]
+
+# Formato JSON exigido da última tarefa da crew; cada campo é validado
+# (e, se necessário, reparado) de forma independente
+class StructuredProposal(BaseModel):
+    title: str = Field(min_length=1)
+    description: str = Field(min_length=1)
+    goals: List[str] = Field(min_length=2)
+    tasks: List[ProjectTask] = Field(min_length=3)
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Os módulos do serviço são importados pelo nome (ex: `import proposal_cache`), como no app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Pacote compartilhado entre os serviços (`codespark_common`), na raiz do repositório
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
@@ -0,0 +1,71 @@
+import io
+import threading
+import time
+from contextlib import redirect_stdout
+
+import pytest
+
+import crew_manager
+import llm_providers
+from crew_manager import CrewTelemetry, generate_project_proposal
+from llm_providers import FAKE_RESPONSES, FakeChatModel
+
+TECHNOLOGIES = ["Python", "FastAPI"]
+AGENTS = ("project_manager", "tech_specialist", "task_designer")
+
+class RecordingChatModel(FakeChatModel):
+    """LLM local que registra o intervalo de cada chamada do seu agente."""
+    agent: str = ""
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        started = time.perf_counter()
+        result = super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        calls.append((self.agent, started, time.perf_counter()))
+        return result
+
+calls = []
+
+@pytest.fixture(autouse=True)
+def recording_llm(monkeypatch):
+    # O nome do modelo de cada agente identifica as chamadas registradas
+    monkeypatch.setitem(llm_providers._providers, "recording", lambda model, temperature: RecordingChatModel(
+        responses=dict(FAKE_RESPONSES), latency=0.2, agent=model,
+    ))
+    monkeypatch.setattr(llm_providers, "LLM_PROVIDER", "recording")
+    for agent in AGENTS:
+        monkeypatch.setenv(f"LLM_MODEL_{agent.upper()}", agent)
+    # LLMs e crews pré-construídos de outros testes não são reaproveitados
+    monkeypatch.setattr(crew_manager, "_worker_state", threading.local())
+    calls.clear()
+
+def generate(execution_mode: str):
+    calls.clear()
+    telemetry = CrewTelemetry(execution_mode)
+    # A CrewAI escreve o progresso dos agentes no stdout (verbose)
+    with redirect_stdout(io.StringIO()):
+        proposal = generate_project_proposal("backend", TECHNOLOGIES, execution_mode=execution_mode, telemetry=telemetry)
+    intervals = {agent: (started, finished) for agent, started, finished in calls}
+    return proposal, telemetry, intervals
+
+def overlap(first, second) -> bool:
+    return first[0] < second[1] and second[0] < first[1]
+
+def test_parallel_and_sequential_modes_produce_the_same_proposal():
+    parallel, parallel_telemetry, _ = generate("parallel")
+    sequential, sequential_telemetry, _ = generate("sequential")
+    assert parallel == sequential
+    assert parallel["title"] == "Plataforma de Trilhas de Estudo"
+    assert len(parallel["tasks"]) == 6
+    assert not parallel_telemetry.fallback and not sequential_telemetry.fallback
+
+def test_parallel_mode_runs_independent_tasks_concurrently():
+    _, telemetry, intervals = generate("parallel")
+    assert overlap(intervals["project_manager"], intervals["tech_specialist"])
+    # A criação de tarefas aguarda as duas tarefas das quais depende
+    assert intervals["task_designer"][0] >= max(intervals["project_manager"][1], intervals["tech_specialist"][1])
+    assert telemetry.execution_mode == "parallel"
+
+def test_sequential_mode_runs_tasks_one_after_another():
+    _, _, intervals = generate("sequential")
+    assert not overlap(intervals["project_manager"], intervals["tech_specialist"])
+    assert intervals["project_manager"][1] <= intervals["tech_specialist"][0] <= intervals["task_designer"][0]
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import threading
+
+import pytest
+
+from app import rejection_error
+from executor import DeadlineExceeded, ExecutorDraining, ExecutorSaturated, GenerationExecutor
+
+class Generation:
+    """Geração falsa que ocupa o worker até ser liberada."""
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = []
+
+    def __call__(self, name):
+        self.started.append(name)
+        self.release.wait(5)
+        return name
+
+def test_admission_is_limited_to_workers_plus_queue():
+    generation = Generation()
+
+    async def scenario():
+        executor = GenerationExecutor(mode="thread", max_workers=1, max_queue=1)
+        executor.start()
+        admitted = [executor.submit(generation, "a"), executor.submit(generation, "b")]
+        with pytest.raises(ExecutorSaturated) as rejected:
+            executor.submit(generation, "c")
+        generation.release.set()
+        results = await asyncio.gather(*admitted)
+        # A capacidade liberada volta a admitir gerações
+        results.append(await executor.run(generation, "d"))
+        await executor.shutdown()
+        return executor.get_stats(), rejected.value, results
+
+    stats, rejected, results = asyncio.run(scenario())
+    assert results == ["a", "b", "d"]
+    assert (stats["submitted"], stats["rejected"], stats["completed"]) == (3, 1, 3)
+    error = rejection_error(rejected)
+    assert error.status_code == 429 and error.headers == {"Retry-After": str(rejected.retry_after)}
+
+def test_draining_executor_rejects_with_503():
+    async def scenario():
+        executor = GenerationExecutor(mode="thread", max_workers=1, max_queue=1)
+        executor.start()
+        await executor.shutdown()
+        with pytest.raises(ExecutorDraining) as rejected:
+            executor.submit(print)
+        return rejected.value
+
+    error = rejection_error(asyncio.run(scenario()))
+    assert error.status_code == 503 and "Retry-After" in error.headers
+
+def test_deadline_cancels_a_queued_generation_before_it_runs():
+    generation = Generation()
+
+    async def scenario():
+        executor = GenerationExecutor(mode="thread", max_workers=1, max_queue=1)
+        executor.start()
+        running = executor.submit(generation, "em execução")
+        with pytest.raises(DeadlineExceeded):
+            await executor.run(generation, "na fila", timeout=0.05)
+        generation.release.set()
+        await running
+        await executor.shutdown()
+        return executor.get_stats()
+
+    stats = asyncio.run(scenario())
+    assert generation.started == ["em execução"]
+    assert (stats["timeouts"], stats["cancelled_queued"], stats["completed"], stats["admitted"]) == (1, 1, 1, 0)
+    assert rejection_error(DeadlineExceeded("prazo")).status_code == 504
+
+def test_shutdown_waits_for_admitted_generations():
+    generation = Generation()
+
+    async def scenario():
+        executor = GenerationExecutor(mode="thread", max_workers=1, max_queue=1)
+        executor.start()
+        admitted = [executor.submit(generation, "a"), executor.submit(generation, "b")]
+        shutdown = asyncio.create_task(executor.shutdown(drain_timeout=5))
+        await asyncio.sleep(0.05)
+        draining = not shutdown.done()
+        generation.release.set()
+        await shutdown
+        return draining, [future.result() for future in admitted], executor.get_stats()
+
+    draining, results, stats = asyncio.run(scenario())
+    assert draining
+    assert results == ["a", "b"]
+    assert (stats["completed"], stats["admitted"], stats["draining"]) == (2, 0, True)
+
+def test_generation_finishing_after_the_loop_closed_is_ignored(caplog):
+    generation = Generation()
+    executor = GenerationExecutor(mode="thread", max_workers=1, max_queue=1)
+
+    async def scenario():
+        executor.start()
+        executor.submit(generation, "a")
+        # Prazo de drenagem expirado: a geração continua no worker após o fim do event loop
+        await executor.shutdown(drain_timeout=0.01)
+        return next(iter(executor._futures))
+
+    future = asyncio.run(scenario())
+    # Os callbacks rodam na ordem de registro: este indica que o do executor já terminou
+    callbacks_done = threading.Event()
+    future.add_done_callback(lambda done: callbacks_done.set())
+    with caplog.at_level(logging.ERROR, logger="concurrent.futures"):
+        generation.release.set()
+        assert callbacks_done.wait(5)
+    assert future.result() == "a"
+    assert not caplog.records
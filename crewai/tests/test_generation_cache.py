@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+import app
+from crew_manager import CrewTelemetry
+from proposal_cache import MemoryCacheBackend, ProposalCache
+from schemas import ProjectRequest
+
+PROPOSAL = {
+    "title": "API de Tarefas",
+    "description": "Uma API",
+    "goals": ["Aprender FastAPI"],
+    "tasks": [{"title": "Configuração", "description": "Configure o ambiente"}],
+    "technologies": ["Python"],
+}
+
+class FakeExecutor:
+    """Executor que devolve a proposta e a telemetria informadas, sem rodar a crew."""
+    def __init__(self, fallback: bool):
+        self.fallback = fallback
+        self.calls = 0
+
+    async def run(self, fn, *args):
+        self.calls += 1
+        telemetry = CrewTelemetry("sequential")
+        telemetry.fallback = self.fallback
+        return dict(PROPOSAL), telemetry.as_dict()
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ProposalCache(local=MemoryCacheBackend(16), ttl=60)
+    monkeypatch.setattr(app, "proposal_cache", cache)
+    return cache
+
+def generate_twice(monkeypatch, fallback: bool) -> int:
+    executor = FakeExecutor(fallback)
+    monkeypatch.setattr(app, "executor", executor)
+    request = ProjectRequest(project_type="backend", technologies=["Python"])
+
+    async def scenario():
+        await app.generate_project(request)
+        await app.generate_project(request)
+
+    asyncio.run(scenario())
+    return executor.calls
+
+def test_generated_proposal_is_served_from_cache(monkeypatch, cache):
+    assert generate_twice(monkeypatch, fallback=False) == 1
+
+def test_fallback_proposal_is_not_cached(monkeypatch, cache):
+    assert generate_twice(monkeypatch, fallback=True) == 2
+    assert cache.get_stats()["local_entries"] == 0
@@ -0,0 +1,38 @@
+import pytest
+from langchain_core.messages import HumanMessage
+
+import llm_providers
+from llm_providers import FakeChatModel, create_llm, get_llm_config
+
+@pytest.fixture(autouse=True)
+def global_config(monkeypatch):
+    # A configuração global é lida na importação; as variáveis por agente, a cada chamada
+    monkeypatch.setattr(llm_providers, "LLM_PROVIDER", "openai")
+    monkeypatch.setattr(llm_providers, "LLM_MODEL", "gpt-4-turbo-preview")
+    for name in ("LLM_PROVIDER_TASK_DESIGNER", "LLM_MODEL_TECH_SPECIALIST", "LLM_TEMPERATURE_TECH_SPECIALIST"):
+        monkeypatch.delenv(name, raising=False)
+
+def test_unknown_provider_raises(monkeypatch):
+    monkeypatch.setattr(llm_providers, "LLM_PROVIDER", "inexistente")
+    with pytest.raises(ValueError, match="inexistente"):
+        create_llm("project_manager")
+
+def test_agent_variables_take_precedence_over_global_config(monkeypatch):
+    monkeypatch.setenv("LLM_PROVIDER_TASK_DESIGNER", "fake")
+    monkeypatch.setenv("LLM_MODEL_TECH_SPECIALIST", "gpt-3.5-turbo")
+    monkeypatch.setenv("LLM_TEMPERATURE_TECH_SPECIALIST", "0")
+
+    assert get_llm_config("task_designer")["provider"] == "fake"
+    assert get_llm_config("tech_specialist") == {"provider": "openai", "model": "gpt-3.5-turbo", "temperature": 0.0}
+    assert get_llm_config("project_manager") == {"provider": "openai", "model": "gpt-4-turbo-preview", "temperature": llm_providers.LLM_TEMPERATURE}
+    # Apenas o agente configurado usa o provedor local, sem exigir a chave da OpenAI
+    assert isinstance(create_llm("task_designer"), FakeChatModel)
+
+def test_fake_model_is_deterministic():
+    model = FakeChatModel(responses={"Gerente de Projeto": "definição", "Designer de Tarefas": "tarefas"})
+    prompt = [HumanMessage(content="Você é Designer de Tarefas e responde ao Gerente de Projeto.")]
+
+    answers = {model.invoke(prompt).content for _ in range(3)}
+    # Vence a chave que aparece primeiro no prompt, no formato esperado pelos agentes da CrewAI
+    assert answers == {"Thought: I now can give a great answer\nFinal Answer: tarefas"}
+    assert model.invoke([HumanMessage(content="Outro prompt")]).content.endswith(model.default_response)
@@ -0,0 +1,37 @@
+import json
+
+from crew_manager import DEFAULT_GOALS, parse_partial_result
+
+TECHNOLOGIES = ["Python", "FastAPI"]
+
+def test_project_definition_text_emits_only_parsed_fields():
+    raw = "Título: Gerenciador de Estudos\\n\\nObjetivos:\\n- Praticar FastAPI\\n".replace("\\n", "\n")
+    partial = parse_partial_result("project_definition", raw, TECHNOLOGIES)
+    assert partial == {"title": "Gerenciador de Estudos", "goals": ["Praticar FastAPI"]}
+
+def test_output_without_sections_emits_nothing():
+    raw = "Analisei as tecnologias e elas são compatíveis entre si, sem ressalvas a fazer sobre a escolha feita. " * 2
+    assert parse_partial_result("project_definition", raw, TECHNOLOGIES) == {}
+
+def test_goals_are_never_filled_with_defaults():
+    partial = parse_partial_result("project_definition", "Título: API\nObjetivos:\n", TECHNOLOGIES)
+    assert "goals" not in partial
+    assert partial.get("goals") != DEFAULT_GOALS
+
+def test_technology_analysis_emits_no_proposal_fields():
+    raw = "Título: Análise\nDescrição: Python combina bem com FastAPI."
+    assert parse_partial_result("technology_analysis", raw, TECHNOLOGIES) == {}
+
+def test_json_output_keeps_only_valid_sections():
+    raw = json.dumps({
+        "title": "Agenda Compartilhada",
+        "description": "",
+        "goals": ["Aprender autenticação", "Praticar testes"],
+        "tasks": [{"title": f"Etapa {i}", "description": "Descrição"} for i in range(3)],
+    })
+    partial = parse_partial_result("task_creation", raw, TECHNOLOGIES)
+    assert partial["title"] == "Agenda Compartilhada"
+    assert partial["goals"] == ["Aprender autenticação", "Praticar testes"]
+    assert [task["title"] for task in partial["tasks"]] == ["Etapa 0", "Etapa 1", "Etapa 2"]
+    # Descrição vazia é inválida e não é substituída por um texto genérico
+    assert "description" not in partial
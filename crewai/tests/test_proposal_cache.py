@@ -0,0 +1,107 @@
+import asyncio
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+
+import proposal_cache
+from proposal_cache import MemoryCacheBackend, ProposalCache, RedisCacheBackend, make_cache_key
+
+PROPOSAL = {"title": "API de Tarefas", "description": "Uma API", "goals": ["Aprender"], "tasks": [], "technologies": ["Python"]}
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Relógio controlado, usado pela expiração por TTL da camada local."""
+    now = [1000.0]
+    monkeypatch.setattr(proposal_cache.time, "monotonic", lambda: now[0])
+    return now
+
+@pytest.fixture
+def redis_server():
+    return fakeredis.FakeServer()
+
+def redis_backend(server) -> RedisCacheBackend:
+    return RedisCacheBackend(fakeredis.aioredis.FakeRedis(server=server))
+
+def test_cache_key_ignores_technology_order_case_and_whitespace():
+    key = make_cache_key("BACKEND", ["Python", "FastAPI"], "API  de tarefas")
+    assert make_cache_key(" backend ", ["fastapi ", "PYTHON", "", "python"], "api de\ttarefas ") == key
+
+def test_cache_key_changes_with_request_content():
+    key = make_cache_key("BACKEND", ["Python"], None)
+    assert make_cache_key("BACKEND", ["Python"], "") == key
+    assert make_cache_key("FRONTEND", ["Python"], None) != key
+    assert make_cache_key("BACKEND", ["Python", "Redis"], None) != key
+    assert make_cache_key("BACKEND", ["Python"], "com autenticação") != key
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryCacheBackend(max_entries=2)
+    run(backend.set("a", {"v": 1}))
+    run(backend.set("b", {"v": 2}))
+    # Ler "a" o torna o mais recente; "b" passa a ser o próximo a sair
+    assert run(backend.get("a")) == {"v": 1}
+    run(backend.set("c", {"v": 3}))
+    assert run(backend.get("b")) is None
+    assert run(backend.get("a")) == {"v": 1}
+    assert run(backend.get("c")) == {"v": 3}
+    assert len(backend) == 2
+
+def test_memory_backend_expires_entries_after_ttl(clock):
+    backend = MemoryCacheBackend(max_entries=10)
+    run(backend.set("a", {"v": 1}, ttl=60))
+    run(backend.set("b", {"v": 2}))
+    clock[0] += 59
+    assert run(backend.get("a")) == {"v": 1}
+    clock[0] += 1
+    assert run(backend.get("a")) is None
+    assert len(backend) == 1
+    # Sem TTL a entrada não expira
+    assert run(backend.get("b")) == {"v": 2}
+
+def test_local_tier_hit_and_miss_counters():
+    cache = ProposalCache(local=MemoryCacheBackend(), ttl=60)
+    key = make_cache_key("BACKEND", ["Python"])
+    assert run(cache.get(key)) is None
+    run(cache.set(key, PROPOSAL))
+    assert run(cache.get(key)) == PROPOSAL
+    stats = cache.get_stats()
+    assert (stats["misses"], stats["local_hits"], stats["sets"]) == (1, 1, 1)
+    assert stats["hit_ratio"] == 0.5
+
+def test_shared_tier_hit_is_promoted_to_local(redis_server):
+    key = make_cache_key("BACKEND", ["Python"])
+    # Outra réplica do serviço gravou a proposta no Redis
+    run(ProposalCache(shared=redis_backend(redis_server), ttl=60).set(key, PROPOSAL))
+
+    cache = ProposalCache(local=MemoryCacheBackend(), shared=redis_backend(redis_server), ttl=60)
+    assert run(cache.get(key)) == PROPOSAL
+    assert run(cache.get(key)) == PROPOSAL
+    stats = cache.get_stats()
+    assert (stats["shared_hits"], stats["local_hits"], stats["misses"]) == (1, 1, 0)
+
+def test_shared_tier_entries_use_prefix_and_ttl(redis_server):
+    cache = ProposalCache(shared=redis_backend(redis_server), ttl=120)
+    run(cache.set("abc", PROPOSAL))
+    client = fakeredis.FakeRedis(server=redis_server)
+    assert client.ttl(proposal_cache.CACHE_KEY_PREFIX + "abc") == 120
+
+def test_unavailable_redis_falls_back_to_local_tier(redis_server):
+    redis_server.connected = False
+    cache = ProposalCache(local=MemoryCacheBackend(), shared=redis_backend(redis_server), ttl=60)
+    key = make_cache_key("BACKEND", ["Python"])
+
+    assert run(cache.get(key)) is None
+    run(cache.set(key, PROPOSAL))
+    assert run(cache.get(key)) == PROPOSAL
+    stats = cache.get_stats()
+    assert stats["errors"] == 2
+    assert (stats["misses"], stats["local_hits"]) == (1, 1)
+
+def test_disabled_cache_never_stores():
+    cache = ProposalCache(local=MemoryCacheBackend(), ttl=60, enabled=False)
+    run(cache.set("abc", PROPOSAL))
+    assert run(cache.get("abc")) is None
+    assert cache.get_stats()["local_entries"] == 0
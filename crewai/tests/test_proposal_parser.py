@@ -0,0 +1,115 @@
+import json
+import os
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from crew_manager import DEFAULT_GOALS, DEFAULT_TASKS, LegacyProposalParser, parse_crew_results, parse_proposal
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "crew_outputs")
+TECHNOLOGIES = ["Python", "FastAPI"]
+
+def load_corpus():
+    """Saídas reais e típicas da última tarefa da crew, com os campos esperados de cada uma."""
+    with open(os.path.join(CORPUS_DIR, "expected.json"), encoding="utf-8") as f:
+        expected = json.load(f)
+    cases = []
+    for name, fields in sorted(expected.items()):
+        with open(os.path.join(CORPUS_DIR, f"{name}.txt"), encoding="utf-8") as f:
+            cases.append(pytest.param(f.read(), fields, id=name))
+    return cases
+
+class RepairLLM:
+    """LLM de reparo que responde, por campo, com as respostas configuradas."""
+    SECTION = re.compile(r'O campo "(\w+)"')
+
+    def __init__(self, responses=None, error=None):
+        self.responses = responses or {}
+        self.error = error
+        self.calls = []
+
+    def invoke(self, prompt):
+        section = self.SECTION.search(prompt).group(1)
+        self.calls.append(section)
+        if self.error is not None:
+            raise self.error
+        return SimpleNamespace(content=self.responses.get(section, "Não sei."))
+
+def task_titles(proposal):
+    return [task["title"] for task in proposal["tasks"]]
+
+@pytest.mark.parametrize("raw, expected", load_corpus())
+def test_corpus_proposals_match_expected_fields(raw, expected):
+    llm = RepairLLM(expected.get("repair"))
+    proposal = parse_proposal(raw, TECHNOLOGIES, llm=llm)
+
+    assert proposal["title"] == expected["title"]
+    assert proposal["goals"] == (expected["goals"] or DEFAULT_GOALS)
+    assert task_titles(proposal) == (expected["task_titles"] or [task["title"] for task in DEFAULT_TASKS])
+    assert all(task["description"] for task in proposal["tasks"])
+    assert proposal["technologies"] == TECHNOLOGIES
+    # Apenas os campos inválidos da saída estruturada são reparados
+    assert sorted(llm.calls) == sorted(expected.get("repair", {}))
+
+def test_valid_output_makes_no_repair_calls():
+    raw = open(os.path.join(CORPUS_DIR, "valid_json.txt"), encoding="utf-8").read()
+    llm = RepairLLM()
+    proposal = parse_proposal(raw, TECHNOLOGIES, llm=llm)
+    assert llm.calls == []
+    assert proposal["description"].startswith("Aplicação para planejar")
+
+def test_failed_repair_is_bounded_and_falls_back_to_legacy_parser():
+    raw = open(os.path.join(CORPUS_DIR, "json_invalid_tasks.txt"), encoding="utf-8").read()
+    llm = RepairLLM(error=RuntimeError("LLM indisponível"))
+    proposal = parse_proposal(raw, TECHNOLOGIES, llm=llm, repair_attempts=2)
+
+    assert llm.calls == ["tasks", "tasks"]
+    # Os demais campos continuam vindo da saída estruturada
+    assert proposal["title"] == "Controle de Gastos"
+    assert proposal["tasks"] == DEFAULT_TASKS
+
+def test_unparseable_repair_response_falls_back_to_legacy_parser():
+    raw = open(os.path.join(CORPUS_DIR, "json_missing_title.txt"), encoding="utf-8").read()
+    llm = RepairLLM({"title": '{"titulo": "Sem o campo esperado"}'})
+    proposal = parse_proposal(raw, TECHNOLOGIES, llm=llm)
+    assert llm.calls == ["title"]
+    assert proposal["title"] == "Novo Projeto"
+    assert task_titles(proposal) == ["Configuração", "Salas", "Reservas"]
+
+def test_structured_output_is_capped_to_five_goals_and_eight_tasks():
+    raw = json.dumps({
+        "title": "Projeto",
+        "description": "Descrição",
+        "goals": [f"Objetivo {i}" for i in range(7)],
+        "tasks": [{"title": f"Tarefa {i}", "description": "Descrição"} for i in range(10)],
+    })
+    proposal = parse_proposal(raw, TECHNOLOGIES)
+    assert len(proposal["goals"]) == 5
+    assert len(proposal["tasks"]) == 8
+
+def test_legacy_parser_incremental_feed_matches_full_text():
+    raw = open(os.path.join(CORPUS_DIR, "legacy_markdown.txt"), encoding="utf-8").read()
+    parser = LegacyProposalParser(TECHNOLOGIES)
+    seen_tasks = []
+    for line in raw.splitlines():
+        parser.feed(line)
+        seen_tasks.append(len(parser.tasks))
+
+    assert parser.result() == parse_crew_results(raw, TECHNOLOGIES)
+    # O resultado parcial cresce à medida que as linhas chegam
+    assert seen_tasks[0] == 0 and seen_tasks[-1] == 4
+    assert parser.result()["description"].startswith("Painel que coleta leituras")
+
+def test_legacy_parser_does_not_treat_task_words_in_prose_as_sections():
+    raw = "\n".join([
+        "Título: Plataforma de Cursos",
+        "Descrição:",
+        "Cada aula termina com uma tarefa prática para fixar o conteúdo e a task list do aluno é atualizada.",
+        "Objetivos:",
+        "- Publicar cursos",
+        "- Acompanhar alunos",
+    ])
+    proposal = parse_crew_results(raw, TECHNOLOGIES)
+    assert "tarefa prática" in proposal["description"]
+    assert proposal["goals"] == ["Publicar cursos", "Acompanhar alunos"]
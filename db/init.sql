@@ -19,7 +19,7 @@ CREATE TABLE IF NOT EXISTS projects (
     title VARCHAR(255) NOT NULL,
     description TEXT NOT NULL,
     project_type project_type NOT NULL,
-    technologies TEXT NOT NULL, -- Lista de tecnologias em formato JSON
+    technologies JSONB NOT NULL DEFAULT '[]'::jsonb, -- Lista de tecnologias
     owner_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
     is_active BOOLEAN DEFAULT true,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
@@ -44,6 +44,12 @@ CREATE INDEX idx_users_email ON users(email);
 CREATE INDEX idx_projects_owner ON projects(owner_id);
 CREATE INDEX idx_tasks_project ON tasks(project_id);
 CREATE INDEX idx_tasks_status ON tasks(status);
+CREATE INDEX idx_projects_technologies ON projects USING GIN (technologies jsonb_path_ops);
+
+-- Índices da paginação por cursor (keyset em created_at, id)
+CREATE INDEX idx_users_created_at_id ON users(created_at, id);
+CREATE INDEX idx_projects_created_at_id ON projects(created_at, id);
+CREATE INDEX idx_tasks_created_at_id ON tasks(created_at, id);
 
 -- Permissões
 GRANT ALL PRIVILEGES ON ALL TABLES IN SCHEMA public TO postgres;